@@ -1,4 +1,4 @@
-from app.agents.master_agent import MasterAgent
+from app.agents.master_agent import MasterAgent, get_master_agent, reload_master_agent
 from app.agents.state import AMLAnalysisState
 
-__all__ = ["MasterAgent", "AMLAnalysisState"]
+__all__ = ["MasterAgent", "AMLAnalysisState", "get_master_agent", "reload_master_agent"]
@@ -3,8 +3,36 @@ import time
 from loguru import logger
 from pydantic import BaseModel
 
+from app.agents import local_scorer
+from app.agents.llm_gate import ainvoke_structured, invoke_structured
+from app.agents.prompt_format import fit_tables, format_record
 from app.agents.state import AMLAnalysisState
 
+_CUSTOMER_FIELDS = ("customer_type", "date_of_birth", "nationality", "residency_country", "risk_rating")
+_ACCOUNT_FIELDS = ("account_type", "account_status", "opened_date", "balance_amount", "balance_currency")
+_HISTORY_COLUMNS = (
+    "transaction_date",
+    "transaction_type",
+    "transaction_amount",
+    "transaction_currency",
+    "transaction_status",
+    "deposit_source_country",
+)
+_FEATURE_FIELDS = (
+    "history_count",
+    "amount_mean",
+    "amount_std",
+    "amount_p50",
+    "amount_p90",
+    "amount_p99",
+    "amount_max",
+    "current_amount_zscore",
+    "deposit_withdrawal_ratio",
+    "interarrival_median_seconds",
+    "interarrival_min_seconds",
+    "hour_histogram",
+)
+
 
 class BehavioralOutput(BaseModel):
     score: float
@@ -14,22 +42,53 @@ class BehavioralOutput(BaseModel):
 def analyze(state: AMLAnalysisState, llm) -> dict:
     logger.info("[TRACE] Agent:behavioral | analyze START")
     if llm is None:
-        logger.info("[TRACE] Agent:behavioral | LLM is None (stub mode) | skipped")
-        return {"behavioral_score": 50.0, "behavioral_summary": "LLM not configured"}
+        return _local(state)
+
+    t0 = time.perf_counter()
+    result = invoke_structured(llm, BehavioralOutput, "behavioral", _prompt(state))
+    return _result(result, t0)
+
+
+async def aanalyze(state: AMLAnalysisState, llm) -> dict:
+    """``analyze`` for the async graph path: awaits the LLM instead of blocking a thread."""
+    logger.info("[TRACE] Agent:behavioral | analyze START")
+    if llm is None:
+        return _local(state)
 
+    t0 = time.perf_counter()
+    result = await ainvoke_structured(llm, BehavioralOutput, "behavioral", _prompt(state))
+    return _result(result, t0)
+
+
+def _prompt(state: AMLAnalysisState) -> str:
     prompt = (
         "You are a behavioral analyst. Analyze if the current transaction deviates from historical behavior. "
         "Return a score 0-100 and a short summary.\n\n"
-        f"Customer: {state['customer_profile']}\n"
-        f"Account: {state['account_info']}\n"
-        f"Current transaction: {state['current_transaction']}\n"
-        f"Transaction history (recent): {state['transaction_history']}\n"
+        f"Customer: {format_record(state['customer_profile'], _CUSTOMER_FIELDS)}\n"
+        f"Account: {format_record(state['account_info'], _ACCOUNT_FIELDS)}\n"
+        f"Current transaction: {format_record(state['current_transaction'])}\n"
+        f"Account statistics (full history): {format_record(state['account_features'], _FEATURE_FIELDS)}\n"
+    )
+    return fit_tables(
+        "behavioral",
+        prompt,
+        [
+            (
+                "Transaction history (recent, newest first)",
+                state["transaction_history"],
+                _HISTORY_COLUMNS,
+                "transaction_amount",
+            ),
+        ],
     )
 
-    model = llm.with_structured_output(BehavioralOutput)
-    t0 = time.perf_counter()
-    logger.info("[TRACE] Agent:behavioral | LLM call START")
-    result: BehavioralOutput = model.invoke(prompt)
+
+def _local(state: AMLAnalysisState) -> dict:
+    logger.info("[TRACE] Agent:behavioral | LLM is None | local scoring")
+    return local_scorer.behavioral(state)
+
+
+def _result(result: BehavioralOutput, t0: float) -> dict:
     elapsed = round((time.perf_counter() - t0) * 1000, 2)
     logger.info(f"[TRACE] Agent:behavioral | LLM call END | score={result.score} | {elapsed}ms")
     return {"behavioral_score": result.score, "behavioral_summary": result.summary}
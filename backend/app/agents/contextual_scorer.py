@@ -3,6 +3,9 @@ import time
 from loguru import logger
 from pydantic import BaseModel
 
+from app.agents import local_scorer
+from app.agents.llm_gate import ainvoke_structured, invoke_structured
+from app.agents.prompt_format import format_record
 from app.agents.state import AMLAnalysisState
 
 
@@ -14,22 +17,42 @@ class ContextualOutput(BaseModel):
 def analyze(state: AMLAnalysisState, llm) -> dict:
     logger.info("[TRACE] Agent:contextual | analyze START")
     if llm is None:
-        logger.info("[TRACE] Agent:contextual | LLM is None (stub mode) | skipped")
-        return {"contextual_score": 50.0, "contextual_summary": "LLM not configured"}
+        return _local(state)
 
-    prompt = (
+    t0 = time.perf_counter()
+    result = invoke_structured(llm, ContextualOutput, "contextual", _prompt(state))
+    return _result(result, t0)
+
+
+async def aanalyze(state: AMLAnalysisState, llm) -> dict:
+    """``analyze`` for the async graph path: awaits the LLM instead of blocking a thread."""
+    logger.info("[TRACE] Agent:contextual | analyze START")
+    if llm is None:
+        return _local(state)
+
+    t0 = time.perf_counter()
+    result = await ainvoke_structured(llm, ContextualOutput, "contextual", _prompt(state))
+    return _result(result, t0)
+
+
+def _prompt(state: AMLAnalysisState) -> str:
+    # Single records only, so there is nothing to trim to the budget.
+    return (
         "You are a contextual risk scorer. Assess holistic risk given KYC/risk rating and transaction context. "
         "Return a score 0-100 and a short summary.\n\n"
-        f"Customer: {state['customer_profile']}\n"
-        f"Account: {state['account_info']}\n"
-        f"Current transaction: {state['current_transaction']}\n"
-        f"High risk info: {state['high_risk_info']}\n"
+        f"Customer: {format_record(state['customer_profile'])}\n"
+        f"Account: {format_record(state['account_info'])}\n"
+        f"Current transaction: {format_record(state['current_transaction'])}\n"
+        f"High risk info: {format_record(state['high_risk_info'])}\n"
     )
 
-    model = llm.with_structured_output(ContextualOutput)
-    t0 = time.perf_counter()
-    logger.info("[TRACE] Agent:contextual | LLM call START")
-    result: ContextualOutput = model.invoke(prompt)
+
+def _local(state: AMLAnalysisState) -> dict:
+    logger.info("[TRACE] Agent:contextual | LLM is None | local scoring")
+    return local_scorer.contextual(state)
+
+
+def _result(result: ContextualOutput, t0: float) -> dict:
     elapsed = round((time.perf_counter() - t0) * 1000, 2)
     logger.info(f"[TRACE] Agent:contextual | LLM call END | score={result.score} | {elapsed}ms")
     return {"contextual_score": result.score, "contextual_summary": result.summary}
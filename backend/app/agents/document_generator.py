@@ -3,6 +3,8 @@ import time
 from loguru import logger
 from pydantic import BaseModel
 
+from app.agents import local_scorer
+from app.agents.llm_gate import ainvoke_structured, invoke_structured
 from app.agents.state import AMLAnalysisState
 
 
@@ -13,10 +15,26 @@ class DocumentOutput(BaseModel):
 def generate(state: AMLAnalysisState, llm) -> dict:
     logger.info("[TRACE] Agent:document | generate START")
     if llm is None:
-        logger.info("[TRACE] Agent:document | LLM is None (stub mode) | skipped")
-        return {"document_content": "LLM not configured"}
+        return _local(state)
 
-    prompt = (
+    t0 = time.perf_counter()
+    result = invoke_structured(llm, DocumentOutput, "document", _prompt(state))
+    return _result(result, t0)
+
+
+async def agenerate(state: AMLAnalysisState, llm) -> dict:
+    """``generate`` for the async graph path: awaits the LLM instead of blocking a thread."""
+    logger.info("[TRACE] Agent:document | generate START")
+    if llm is None:
+        return _local(state)
+
+    t0 = time.perf_counter()
+    result = await ainvoke_structured(llm, DocumentOutput, "document", _prompt(state))
+    return _result(result, t0)
+
+
+def _prompt(state: AMLAnalysisState) -> str:
+    return (
         "You are a SAR document generator. Produce a concise narrative suitable for a SAR draft. "
         "Use the case summary and evidence.\n\n"
         f"Case summary: {state.get('case_summary')}\n"
@@ -27,10 +45,13 @@ def generate(state: AMLAnalysisState, llm) -> dict:
         f"False positive: {state.get('false_positive_summary')}\n"
     )
 
-    model = llm.with_structured_output(DocumentOutput)
-    t0 = time.perf_counter()
-    logger.info("[TRACE] Agent:document | LLM call START")
-    result: DocumentOutput = model.invoke(prompt)
+
+def _local(state: AMLAnalysisState) -> dict:
+    logger.info("[TRACE] Agent:document | LLM is None | local scoring")
+    return local_scorer.document(state)
+
+
+def _result(result: DocumentOutput, t0: float) -> dict:
     elapsed = round((time.perf_counter() - t0) * 1000, 2)
     logger.info(f"[TRACE] Agent:document | LLM call END | {elapsed}ms")
     return {"document_content": result.content}
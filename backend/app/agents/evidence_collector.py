@@ -3,8 +3,28 @@ import time
 from loguru import logger
 from pydantic import BaseModel
 
+from app.agents import local_scorer
+from app.agents.llm_gate import ainvoke_structured, invoke_structured
+from app.agents.prompt_format import fit_tables, format_record
 from app.agents.state import AMLAnalysisState
 
+_ALERT_COLUMNS = ("triggered_date", "alert_type", "severity", "rule_id", "transaction_id", "description")
+_HISTORY_COLUMNS = (
+    "transaction_id",
+    "transaction_date",
+    "transaction_type",
+    "transaction_amount",
+    "transaction_status",
+)
+_FEATURE_FIELDS = (
+    "history_count",
+    "amount_mean",
+    "amount_p99",
+    "amount_max",
+    "current_amount_zscore",
+    "deposit_withdrawal_ratio",
+)
+
 
 class EvidenceOutput(BaseModel):
     score: float
@@ -14,24 +34,55 @@ class EvidenceOutput(BaseModel):
 def analyze(state: AMLAnalysisState, llm) -> dict:
     logger.info("[TRACE] Agent:evidence | analyze START")
     if llm is None:
-        logger.info("[TRACE] Agent:evidence | LLM is None (stub mode) | skipped")
-        return {"evidence_score": 50.0, "evidence_summary": "LLM not configured"}
+        return _local(state)
+
+    t0 = time.perf_counter()
+    result = invoke_structured(llm, EvidenceOutput, "evidence", _prompt(state))
+    return _result(result, t0)
+
+
+async def aanalyze(state: AMLAnalysisState, llm) -> dict:
+    """``analyze`` for the async graph path: awaits the LLM instead of blocking a thread."""
+    logger.info("[TRACE] Agent:evidence | analyze START")
+    if llm is None:
+        return _local(state)
 
+    t0 = time.perf_counter()
+    result = await ainvoke_structured(llm, EvidenceOutput, "evidence", _prompt(state))
+    return _result(result, t0)
+
+
+def _prompt(state: AMLAnalysisState) -> str:
     prompt = (
         "You are an evidence collector. Build an evidence summary and score suspicious indicators. "
         "Return a score 0-100 and a concise summary.\n\n"
-        f"Current transaction: {state['current_transaction']}\n"
-        f"Existing alerts: {state['existing_alerts']}\n"
-        f"Transaction history (recent): {state['transaction_history']}\n"
+        f"Current transaction: {format_record(state['current_transaction'])}\n"
+        f"Account statistics (full history): {format_record(state['account_features'], _FEATURE_FIELDS)}\n"
         f"Behavioral summary: {state.get('behavioral_summary')}\n"
         f"Network summary: {state.get('network_summary')}\n"
         f"Contextual summary: {state.get('contextual_summary')}\n"
     )
+    return fit_tables(
+        "evidence",
+        prompt,
+        [
+            ("Existing alerts", state["existing_alerts"], _ALERT_COLUMNS, None),
+            (
+                "Transaction history (recent, newest first)",
+                state["transaction_history"],
+                _HISTORY_COLUMNS,
+                "transaction_amount",
+            ),
+        ],
+    )
 
-    model = llm.with_structured_output(EvidenceOutput)
-    t0 = time.perf_counter()
-    logger.info("[TRACE] Agent:evidence | LLM call START")
-    result: EvidenceOutput = model.invoke(prompt)
+
+def _local(state: AMLAnalysisState) -> dict:
+    logger.info("[TRACE] Agent:evidence | LLM is None | local scoring")
+    return local_scorer.evidence(state)
+
+
+def _result(result: EvidenceOutput, t0: float) -> dict:
     elapsed = round((time.perf_counter() - t0) * 1000, 2)
     logger.info(f"[TRACE] Agent:evidence | LLM call END | score={result.score} | {elapsed}ms")
     return {"evidence_score": result.score, "evidence_summary": result.summary}
@@ -3,6 +3,9 @@ import time
 from loguru import logger
 from pydantic import BaseModel
 
+from app.agents import local_scorer
+from app.agents.llm_gate import ainvoke_structured, invoke_structured
+from app.agents.prompt_format import format_record
 from app.agents.state import AMLAnalysisState
 
 
@@ -14,23 +17,42 @@ class FalsePositiveOutput(BaseModel):
 def analyze(state: AMLAnalysisState, llm) -> dict:
     logger.info("[TRACE] Agent:false_positive | analyze START")
     if llm is None:
-        logger.info("[TRACE] Agent:false_positive | LLM is None (stub mode) | skipped")
-        return {"false_positive_score": 50.0, "false_positive_summary": "LLM not configured"}
+        return _local(state)
 
-    prompt = (
+    t0 = time.perf_counter()
+    result = invoke_structured(llm, FalsePositiveOutput, "false_positive", _prompt(state))
+    return _result(result, t0)
+
+
+async def aanalyze(state: AMLAnalysisState, llm) -> dict:
+    """``analyze`` for the async graph path: awaits the LLM instead of blocking a thread."""
+    logger.info("[TRACE] Agent:false_positive | analyze START")
+    if llm is None:
+        return _local(state)
+
+    t0 = time.perf_counter()
+    result = await ainvoke_structured(llm, FalsePositiveOutput, "false_positive", _prompt(state))
+    return _result(result, t0)
+
+
+def _prompt(state: AMLAnalysisState) -> str:
+    return (
         "You are a false positive optimizer. Given all prior analyses, estimate likelihood of false positive. "
         "Return a score 0-100 (higher means less likely false positive) and a short summary.\n\n"
         f"Behavioral score/summary: {state.get('behavioral_score')} / {state.get('behavioral_summary')}\n"
         f"Network score/summary: {state.get('network_score')} / {state.get('network_summary')}\n"
         f"Contextual score/summary: {state.get('contextual_score')} / {state.get('contextual_summary')}\n"
         f"Evidence score/summary: {state.get('evidence_score')} / {state.get('evidence_summary')}\n"
-        f"High risk info: {state['high_risk_info']}\n"
+        f"High risk info: {format_record(state['high_risk_info'])}\n"
     )
 
-    model = llm.with_structured_output(FalsePositiveOutput)
-    t0 = time.perf_counter()
-    logger.info("[TRACE] Agent:false_positive | LLM call START")
-    result: FalsePositiveOutput = model.invoke(prompt)
+
+def _local(state: AMLAnalysisState) -> dict:
+    logger.info("[TRACE] Agent:false_positive | LLM is None | local scoring")
+    return local_scorer.false_positive(state)
+
+
+def _result(result: FalsePositiveOutput, t0: float) -> dict:
     elapsed = round((time.perf_counter() - t0) * 1000, 2)
     logger.info(f"[TRACE] Agent:false_positive | LLM call END | score={result.score} | {elapsed}ms")
     return {"false_positive_score": result.score, "false_positive_summary": result.summary}
@@ -0,0 +1,63 @@
+"""Per-account statistics over the full transaction history, computed before the graph runs.
+
+Agents get these numbers instead of deriving them from a few dozen raw rows: the LLM
+reasons over all of the account's history and the prompts stay short.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+AMOUNT_PERCENTILES = (50, 90, 99)
+
+# (transaction_amount, transaction_date, transaction_type, deposit_source_country)
+HistoryRow = tuple[float, object, str, str | None]
+
+
+def account_features(rows: Sequence[HistoryRow], current: dict | None) -> dict:
+    """Amount distribution, flow mix, timing and geography of ``rows``, and how unusual ``current`` is.
+
+    Amounts are in the transactions' own currencies, as stored. Inter-arrival times are
+    in seconds; ``hour_histogram`` counts transactions per UTC hour of day.
+    """
+    if not rows:
+        return {"history_count": 0}
+    amounts, dates, types, countries = zip(*rows, strict=True)
+    amounts = np.asarray(amounts, dtype=float)
+    types = np.asarray(types)
+    times = np.sort(np.asarray(dates, dtype="datetime64[s]"))
+
+    gaps = np.diff(times).astype(float)
+    hours = ((times - times.astype("datetime64[D]")) // np.timedelta64(1, "h")).astype(int)
+    deposits = amounts[types == "deposit"]
+    withdrawals = amounts[types == "withdrawal"]
+    mean = amounts.mean()
+    std = amounts.std()
+    percentiles = np.percentile(amounts, AMOUNT_PERCENTILES)
+    current_amount = (current or {}).get("transaction_amount")
+
+    features = {
+        "history_count": len(amounts),
+        "first_transaction_date": str(times[0]),
+        "last_transaction_date": str(times[-1]),
+        "amount_mean": _round(mean),
+        "amount_std": _round(std),
+        **{f"amount_p{p}": _round(value) for p, value in zip(AMOUNT_PERCENTILES, percentiles, strict=True)},
+        "amount_max": _round(amounts.max()),
+        "deposit_count": len(deposits),
+        "withdrawal_count": len(withdrawals),
+        "deposit_total": _round(deposits.sum()),
+        "withdrawal_total": _round(withdrawals.sum()),
+        "deposit_withdrawal_ratio": _round(deposits.sum() / withdrawals.sum()) if withdrawals.sum() else None,
+        "interarrival_mean_seconds": _round(gaps.mean()) if gaps.size else None,
+        "interarrival_median_seconds": _round(np.median(gaps)) if gaps.size else None,
+        "interarrival_min_seconds": _round(gaps.min()) if gaps.size else None,
+        "hour_histogram": np.bincount(hours, minlength=24).tolist(),
+        "distinct_source_countries": sorted({country for country in countries if country}),
+        "current_amount_zscore": _round((current_amount - mean) / std) if current_amount is not None and std else None,
+    }
+    return features
+
+
+def _round(value) -> float:
+    return round(float(value), 2)
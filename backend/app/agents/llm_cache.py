@@ -0,0 +1,103 @@
+import hashlib
+import itertools
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from app.config.database import session_scope
+from app.config.settings import settings
+from app.models.llm_cache_entry import LlmCacheEntry
+from app.repositories.llm_cache_repository import LlmCacheRepository
+from app.utils.datetime_utils import to_naive, utc_now
+
+# Expired and least recently used entries are pruned once every this many stores.
+_PRUNE_EVERY = 100
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+_stores = itertools.count(1)
+
+
+@contextmanager
+def bypass(enabled: bool = True) -> Iterator[None]:
+    """Ignore cached responses for LLM calls made inside the block; fresh ones still replace them."""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def model_name(llm: Any) -> str:
+    return str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__)
+
+
+def cache_key(llm: Any, agent: str, schema: type[BaseModel], prompt: str) -> str:
+    """Hash of everything that determines a structured response."""
+    parts = [settings.LLM_PROVIDER.lower(), model_name(llm), agent, schema.__name__, prompt]
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+def lookup(key: str, schema: type[BaseModel]) -> BaseModel | None:
+    """The cached response for ``key``, or ``None`` when missing, expired, bypassed or unreadable.
+
+    The cache only saves LLM calls: any failure reading it is logged and treated as a miss.
+    """
+    if not settings.LLM_CACHE_ENABLED or _bypass.get():
+        return None
+    try:
+        with session_scope() as db:
+            entry = LlmCacheRepository.get_by_key(db, key)
+            now = utc_now()
+            if entry is None or entry.created_date < _expiry(now):
+                return None
+            result = schema.model_validate_json(entry.response)
+            LlmCacheRepository.touch(db, key, now)
+            return result
+    except ValidationError:
+        logger.warning(f"LLM cache | entry no longer matches {schema.__name__} | key={key}")
+    except Exception:
+        logger.exception(f"LLM cache | lookup failed | key={key}")
+    return None
+
+
+def store(key: str, llm: Any, agent: str, result: BaseModel) -> None:
+    if not settings.LLM_CACHE_ENABLED or not isinstance(result, BaseModel):
+        return
+    now = utc_now()
+    entry = LlmCacheEntry(
+        cache_key=key,
+        provider=settings.LLM_PROVIDER.lower(),
+        model=model_name(llm),
+        agent=agent,
+        response=result.model_dump_json(),
+        hit_count=0,
+        created_date=now,
+        last_used_date=now,
+    )
+    try:
+        with session_scope() as db:
+            LlmCacheRepository.save(db, entry)
+            if next(_stores) % _PRUNE_EVERY == 0:
+                prune(db)
+    except Exception:
+        logger.exception(f"LLM cache | store failed | key={key}")
+
+
+def prune(db: Session) -> int:
+    """Delete expired entries, then all but the ``LLM_CACHE_MAX_ENTRIES`` most recently used."""
+    expired = LlmCacheRepository.delete_created_before(db, _expiry(utc_now()))
+    evicted = LlmCacheRepository.delete_least_recently_used(db, settings.LLM_CACHE_MAX_ENTRIES)
+    if expired or evicted:
+        logger.info(f"[TRACE] LLM cache | pruned | expired={expired} evicted={evicted}")
+    return expired + evicted
+
+
+def _expiry(now: datetime) -> datetime:
+    return to_naive(now - timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS))
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+from langchain_core.runnables import Runnable
+from loguru import logger
+from pydantic import BaseModel
+
+from app.agents import llm_cache
+from app.config.settings import settings
+
+# How often a coroutine waiting for an LLM slot retries; waiting in a thread would tie up
+# executor threads that the async workers need for database work.
+_ASYNC_SLOT_POLL_SECONDS = 0.02
+
+_lock = threading.Lock()
+_slots: threading.BoundedSemaphore | None = None
+# (id(llm), schema) -> (llm, runnable); the llm is kept so its id cannot be reused
+_structured: dict[tuple[int, type[BaseModel]], tuple[Any, Runnable]] = {}
+
+
+def _semaphore() -> threading.BoundedSemaphore:
+    global _slots
+    with _lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(max(settings.AGENT_MAX_INFLIGHT_LLM_CALLS, 1))
+        return _slots
+
+
+@contextmanager
+def llm_slot(agent: str) -> Iterator[None]:
+    """Hold one of the process-wide ``AGENT_MAX_INFLIGHT_LLM_CALLS`` slots for an LLM request.
+
+    Agent workers run many graphs at once; this keeps the number of requests in flight
+    to the provider bounded however many workers are configured.
+    """
+    slots = _semaphore()
+    t0 = time.perf_counter()
+    with slots:
+        waited = round((time.perf_counter() - t0) * 1000, 2)
+        if waited >= 1:
+            logger.info(f"[TRACE] Agent:{agent} | waited for LLM slot | {waited}ms")
+        yield
+
+
+@asynccontextmanager
+async def allm_slot(agent: str) -> AsyncIterator[None]:
+    """``llm_slot`` for coroutines: waits without blocking the event loop."""
+    slots = _semaphore()
+    t0 = time.perf_counter()
+    while not slots.acquire(blocking=False):
+        await asyncio.sleep(_ASYNC_SLOT_POLL_SECONDS)
+    try:
+        waited = round((time.perf_counter() - t0) * 1000, 2)
+        if waited >= 1:
+            logger.info(f"[TRACE] Agent:{agent} | waited for LLM slot | {waited}ms")
+        yield
+    finally:
+        slots.release()
+
+
+def structured_output(llm: Any, schema: type[BaseModel]) -> Runnable:
+    """``llm.with_structured_output(schema)``, built once per model and schema and then reused."""
+    key = (id(llm), schema)
+    cached = _structured.get(key)
+    if cached is None or cached[0] is not llm:
+        with _lock:
+            cached = _structured.get(key)
+            if cached is None or cached[0] is not llm:
+                cached = _structured[key] = (llm, llm.with_structured_output(schema))
+    return cached[1]
+
+
+def clear_structured_outputs() -> None:
+    """Drop cached runnables, e.g. after the chat model is rebuilt with new provider settings."""
+    with _lock:
+        _structured.clear()
+
+
+def invoke_structured(llm: Any, schema: type[BaseModel], agent: str, prompt: str) -> BaseModel:
+    """A structured response for ``prompt``: from the LLM cache, or from the model under an LLM slot."""
+    key = llm_cache.cache_key(llm, agent, schema, prompt)
+    result = llm_cache.lookup(key, schema)
+    if result is not None:
+        logger.info(f"[TRACE] Agent:{agent} | LLM cache hit")
+        return result
+    with llm_slot(agent):
+        logger.info(f"[TRACE] Agent:{agent} | LLM call START")
+        result = structured_output(llm, schema).invoke(prompt)
+    llm_cache.store(key, llm, agent, result)
+    return result
+
+
+async def ainvoke_structured(llm: Any, schema: type[BaseModel], agent: str, prompt: str) -> BaseModel:
+    """``invoke_structured`` for coroutines; the cache is read and written on a thread."""
+    key = llm_cache.cache_key(llm, agent, schema, prompt)
+    result = await asyncio.to_thread(llm_cache.lookup, key, schema)
+    if result is not None:
+        logger.info(f"[TRACE] Agent:{agent} | LLM cache hit")
+        return result
+    async with allm_slot(agent):
+        logger.info(f"[TRACE] Agent:{agent} | LLM call START")
+        result = await structured_output(llm, schema).ainvoke(prompt)
+    await asyncio.to_thread(llm_cache.store, key, llm, agent, result)
+    return result
@@ -0,0 +1,128 @@
+"""Deterministic, CPU-only scoring for every agent of the graph.
+
+Used when no LLM is configured, and by ``MasterAgent`` for a single agent whose LLM call
+fails or times out. Each function takes the graph state and returns the same keys as the
+agent it stands in for, so a case always gets real scores instead of a constant.
+"""
+
+from app.agents.state import AMLAnalysisState
+
+_ALERT_POINTS = {"critical": 40.0, "high": 30.0, "medium": 15.0, "low": 5.0}
+_UNKNOWN_ALERT_POINTS = 30.0
+_RISK_RATING_POINTS = {"high": 60.0, "medium": 35.0, "low": 10.0}
+_UNKNOWN_RISK_RATING_POINTS = 35.0
+_ZSCORE_FOR_MAX = 4.0  # an amount this many standard deviations out scores the full 60 points
+_RAPID_GAP_SECONDS = 3600
+
+
+def behavioral(state: AMLAnalysisState) -> dict:
+    """Statistical anomaly of the current transaction against the account's full history."""
+    features = state.get("account_features") or {}
+    amount = (state.get("current_transaction") or {}).get("transaction_amount")
+    zscore = features.get("current_amount_zscore")
+    findings = []
+    if features.get("history_count", 0) < 2 or zscore is None:
+        score = 30.0
+        findings.append("too little history for a baseline")
+    else:
+        score = min(abs(zscore) / _ZSCORE_FOR_MAX, 1.0) * 60.0
+        findings.append(f"amount z-score {zscore}")
+        if amount is not None and amount > features["amount_p99"]:
+            score += 15.0
+            findings.append("above the 99th percentile")
+    gap = features.get("interarrival_min_seconds")
+    if gap is not None and gap < _RAPID_GAP_SECONDS:
+        score += 15.0
+        findings.append(f"transactions {gap:g}s apart")
+    ratio = features.get("deposit_withdrawal_ratio")
+    if ratio is not None and 0.8 <= ratio <= 1.25:
+        score += 10.0
+        findings.append("deposits matched by withdrawals")
+    return {"behavioral_score": _clamp(score), "behavioral_summary": _summary(findings)}
+
+
+def network(state: AMLAnalysisState) -> dict:
+    """Linkage of the account: distinct funding sources, source countries and other alerts."""
+    features = state.get("account_features") or {}
+    sources = {
+        row.get("deposit_source_value") for row in state.get("transaction_history") or [] if row.get("deposit_source_value")
+    }
+    countries = features.get("distinct_source_countries") or []
+    other_alerts = max(len(state.get("existing_alerts") or []) - 1, 0)
+    score = min(len(sources) * 10.0, 40.0) + min(max(len(countries) - 1, 0) * 10.0, 30.0) + min(other_alerts, 3) * 10.0
+    findings = [
+        f"{len(sources)} distinct funding source(s)",
+        f"{len(countries)} source country(ies)",
+        f"{other_alerts} other alert(s) on the account",
+    ]
+    return {"network_score": _clamp(score), "network_summary": _summary(findings)}
+
+
+def contextual(state: AMLAnalysisState) -> dict:
+    """KYC status, risk rating, high-risk listing and cross-border funding."""
+    customer = state.get("customer_profile") or {}
+    current = state.get("current_transaction") or {}
+    rating = (customer.get("risk_rating") or "").lower()
+    score = _RISK_RATING_POINTS.get(rating, _UNKNOWN_RISK_RATING_POINTS)
+    findings = [f"risk rating {customer.get('risk_rating')}"]
+    if (customer.get("kyc_status") or "").lower() != "verified":
+        score += 20.0
+        findings.append(f"KYC {customer.get('kyc_status')}")
+    if state.get("high_risk_info"):
+        score += 30.0
+        findings.append("account on the high-risk list")
+    source_country = current.get("deposit_source_country")
+    if source_country and customer.get("residency_country") and source_country != customer["residency_country"]:
+        score += 10.0
+        findings.append(f"funds from {source_country}")
+    return {"contextual_score": _clamp(score), "contextual_summary": _summary(findings)}
+
+
+def evidence(state: AMLAnalysisState) -> dict:
+    """Rule evidence: alerts on the current transaction count in full, older ones at half weight."""
+    transaction_id = state.get("transaction_id")
+    score = 0.0
+    current_rules = []
+    for alert in state.get("existing_alerts") or []:
+        points = _ALERT_POINTS.get(alert.get("severity"), _UNKNOWN_ALERT_POINTS)
+        if transaction_id and alert.get("transaction_id") == transaction_id:
+            score += points
+            current_rules.append(alert.get("rule_id"))
+        else:
+            score += points / 2
+    findings = [f"rules {', '.join(sorted(set(current_rules)))} on this transaction" if current_rules else "no rule hits"]
+    findings.append(f"{len(state.get('existing_alerts') or [])} alert(s) on the account")
+    return {"evidence_score": _clamp(score), "evidence_summary": _summary(findings)}
+
+
+def false_positive(state: AMLAnalysisState) -> dict:
+    """Mean of the analyst scores (higher means less likely a false positive); high-risk listings stay at 50+."""
+    scores = [state.get(f"{agent}_score", 0.0) for agent in ("behavioral", "network", "contextual", "evidence")]
+    score = sum(scores) / len(scores)
+    if state.get("high_risk_info"):
+        score = max(score, 50.0)
+    return {
+        "false_positive_score": _clamp(score),
+        "false_positive_summary": _summary([f"mean analyst score {round(sum(scores) / len(scores), 2)}"]),
+    }
+
+
+def document(state: AMLAnalysisState) -> dict:
+    """A SAR draft assembled from the case and agent summaries."""
+    sections = [
+        ("Case", state.get("case_summary")),
+        ("Behavioral analysis", state.get("behavioral_summary")),
+        ("Network analysis", state.get("network_summary")),
+        ("Customer context", state.get("contextual_summary")),
+        ("Evidence", state.get("evidence_summary")),
+    ]
+    content = "\n\n".join(f"{title}: {text}" for title, text in sections if text)
+    return {"document_content": f"Account {state.get('account_number')}, alert {state.get('alert_id')}.\n\n{content}"}
+
+
+def _clamp(score: float) -> float:
+    return round(min(max(score, 0.0), 100.0), 2)
+
+
+def _summary(findings: list[str]) -> str:
+    return f"Local scoring: {'; '.join(findings)}."
@@ -1,26 +1,51 @@
+import asyncio
+import threading
 import time
 
-from langgraph.graph import END, StateGraph
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, START, StateGraph
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 from loguru import logger
 from sqlalchemy.orm import Session
 
+from app.agents import llm_cache, local_scorer
+from app.agents.behavioral_analyst import aanalyze as behavioral_aanalyze
 from app.agents.behavioral_analyst import analyze as behavioral_analyze
+from app.agents.contextual_scorer import aanalyze as contextual_aanalyze
 from app.agents.contextual_scorer import analyze as contextual_analyze
+from app.agents.document_generator import agenerate as document_agenerate
 from app.agents.document_generator import generate as document_generate
+from app.agents.evidence_collector import aanalyze as evidence_aanalyze
 from app.agents.evidence_collector import analyze as evidence_analyze
+from app.agents.false_positive_optimizer import aanalyze as false_positive_aanalyze
 from app.agents.false_positive_optimizer import analyze as false_positive_analyze
+from app.agents.features import account_features
+from app.agents.llm_gate import clear_structured_outputs
+from app.agents.network_analyst import aanalyze as network_aanalyze
 from app.agents.network_analyst import analyze as network_analyze
+from app.agents.prompt_format import (
+    ACCOUNT_FIELDS,
+    ALERT_FIELDS,
+    CUSTOMER_FIELDS,
+    HIGH_RISK_FIELDS,
+    TRANSACTION_FIELDS,
+)
 from app.agents.state import AMLAnalysisState
 from app.agents.tools import (
+    as_state_dict,
     get_account,
     get_alerts,
     get_customer,
     get_high_risk_info,
+    get_history_columns,
     get_latest_transaction,
+    get_prior_decisions,
+    get_transaction,
     get_transaction_history,
 )
+from app.agents.triage import TriageResult, triage
+from app.config.database import unit_of_work
 from app.config.settings import settings
 from app.exceptions.base_exception import AMLException, NotFoundException
 from app.exceptions.error_codes import AGENT_LLM_API_FAILED, ALERT_NOT_FOUND
@@ -28,12 +53,14 @@ from app.models.alert import Alert
 from app.models.case import Case
 from app.models.case_document_content import CaseDocumentContent
 from app.repositories.case_repository import CaseRepository
+from app.rules.rule_context import RuleContext
 from app.utils.datetime_utils import utc_now
 from app.utils.id_generator import generate_id
 
 
 class MasterAgent:
     def __init__(self) -> None:
+        self.provider_settings = _provider_settings()
         t0 = time.perf_counter()
         self.llm = self._build_llm()
         elapsed_llm = round((time.perf_counter() - t0) * 1000, 2)
@@ -53,11 +80,11 @@ class MasterAgent:
             api_key = settings.GEMINI_API_KEY
             model = settings.GEMINI_MODEL
             if not api_key or api_key == "your-gemini-key-here":
-                logger.warning("Gemini API key not configured; running in stub mode")
+                logger.warning("Gemini API key not configured; agents use local scoring")
                 return None
             try:
                 logger.info(f"[TRACE] MasterAgent | Initializing Gemini LLM | model={model}")
-                return ChatGoogleGenerativeAI(model=model, api_key=api_key)
+                return ChatGoogleGenerativeAI(model=model, api_key=api_key, timeout=settings.AGENT_LLM_TIMEOUT_SECONDS)
             except Exception as exc:
                 raise AMLException(AGENT_LLM_API_FAILED, f"Failed to initialize Gemini LLM: {exc}") from exc
 
@@ -65,11 +92,11 @@ class MasterAgent:
             api_key = settings.OPENAI_API_KEY
             model = settings.OPENAI_MODEL
             if not api_key or api_key == "your-openai-key-here":
-                logger.warning("OpenAI API key not configured; running in stub mode")
+                logger.warning("OpenAI API key not configured; agents use local scoring")
                 return None
             try:
                 logger.info(f"[TRACE] MasterAgent | Initializing OpenAI LLM | model={model}")
-                return ChatOpenAI(model=model, api_key=api_key)
+                return ChatOpenAI(model=model, api_key=api_key, timeout=settings.AGENT_LLM_TIMEOUT_SECONDS)
             except Exception as exc:
                 raise AMLException(AGENT_LLM_API_FAILED, f"Failed to initialize OpenAI LLM: {exc}") from exc
 
@@ -78,25 +105,52 @@ class MasterAgent:
     def _build_graph(self):
         graph = StateGraph(AMLAnalysisState)
 
-        graph.add_node("behavioral", lambda state: behavioral_analyze(state, self.llm))
-        graph.add_node("network", lambda state: network_analyze(state, self.llm))
-        graph.add_node("contextual", lambda state: contextual_analyze(state, self.llm))
-        graph.add_node("evidence", lambda state: evidence_analyze(state, self.llm))
-        graph.add_node("false_positive", lambda state: false_positive_analyze(state, self.llm))
+        graph.add_node("behavioral", self._node(behavioral_analyze, behavioral_aanalyze, local_scorer.behavioral))
+        graph.add_node("network", self._node(network_analyze, network_aanalyze, local_scorer.network))
+        graph.add_node("contextual", self._node(contextual_analyze, contextual_aanalyze, local_scorer.contextual))
+        graph.add_node("evidence", self._node(evidence_analyze, evidence_aanalyze, local_scorer.evidence))
+        graph.add_node("false_positive", self._node(false_positive_analyze, false_positive_aanalyze, local_scorer.false_positive))
         graph.add_node("finalize", self._finalize_case)
-        graph.add_node("document", lambda state: document_generate(state, self.llm))
+        graph.add_node("document", self._node(document_generate, document_agenerate, local_scorer.document))
 
-        graph.set_entry_point("behavioral")
-        graph.add_edge("behavioral", "network")
-        graph.add_edge("network", "contextual")
-        graph.add_edge("contextual", "evidence")
+        # The three analysts only read the initial state: they run concurrently and
+        # evidence starts once all of them have written their scores.
+        for analyst in ("behavioral", "network", "contextual"):
+            graph.add_edge(START, analyst)
+        graph.add_edge(["behavioral", "network", "contextual"], "evidence")
         graph.add_edge("evidence", "false_positive")
         graph.add_edge("false_positive", "finalize")
-        graph.add_edge("finalize", "document")
+        # No SAR draft for a case the agents classified as a false positive.
+        graph.add_conditional_edges("finalize", _needs_document, ["document", END])
         graph.add_edge("document", END)
 
         return graph.compile()
 
+    def _node(self, analyze, aanalyze, local) -> RunnableLambda:
+        """A graph node that blocks under ``graph.invoke`` and awaits the LLM under ``graph.ainvoke``.
+
+        When the agent's LLM call fails or times out, ``local`` (from ``local_scorer``) scores
+        that agent instead, so one provider error does not fail the whole case.
+        """
+
+        def call(state: AMLAnalysisState) -> dict:
+            try:
+                return analyze(state, self.llm)
+            except Exception as exc:
+                if not settings.AGENT_LOCAL_FALLBACK_ENABLED:
+                    raise
+                return _local_fallback(local, state, exc)
+
+        async def acall(state: AMLAnalysisState) -> dict:
+            try:
+                return await asyncio.wait_for(aanalyze(state, self.llm), settings.AGENT_LLM_TIMEOUT_SECONDS)
+            except Exception as exc:
+                if not settings.AGENT_LOCAL_FALLBACK_ENABLED:
+                    raise
+                return _local_fallback(local, state, exc)
+
+        return RunnableLambda(call, afunc=acall)
+
     def _finalize_case(self, state: AMLAnalysisState) -> dict:
         logger.info("[TRACE] MasterAgent | finalize_case START")
         case_score = (
@@ -132,10 +186,76 @@ class MasterAgent:
             "case_summary": case_summary,
         }
 
-    def run_for_alert(self, db: Session, alert_id: str) -> Case:
+    def run_for_alert(
+        self, db: Session, alert_id: str, context: RuleContext | None = None, refresh: bool = False
+    ) -> Case:
+        """Run the agent graph for an alert and persist the resulting case.
+
+        ``context`` is the ``RuleContext`` the alert was raised with; when given, its
+        account, customer and high-risk record are reused instead of re-fetched.
+        Responses already in the LLM cache are reused unless ``refresh`` is set. Alerts
+        triage closes as clear false positives get their case without running the graph.
+        """
         t0 = time.perf_counter()
         logger.info(f"[TRACE] MasterAgent | run_for_alert START | alert_id={alert_id}")
+        alert, verdict, initial_state = self._prepare(db, alert_id, context)
 
+        if initial_state is None:
+            result = _triaged_result(verdict)
+        else:
+            # --- Graph execution ---
+            t_graph = time.perf_counter()
+            logger.info(f"[TRACE] MasterAgent | graph.invoke START | alert_id={alert_id}")
+            with llm_cache.bypass(refresh):
+                result: AMLAnalysisState = self.graph.invoke(initial_state)
+            elapsed_graph = round((time.perf_counter() - t_graph) * 1000, 2)
+            logger.info(
+                f"[TRACE] MasterAgent | graph.invoke END | score={result.get('case_score_percentage')} | {elapsed_graph}ms"
+            )
+
+        case = self._create_case(db, alert, result)
+        elapsed_total = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info(f"[TRACE] MasterAgent | run_for_alert END | alert_id={alert_id} case_id={case.case_id} | {elapsed_total}ms")
+        return case
+
+    async def arun_for_alert(
+        self, db: Session, alert_id: str, context: RuleContext | None = None, refresh: bool = False
+    ) -> Case:
+        """``run_for_alert`` on an event loop.
+
+        The graph runs with ``graph.ainvoke``, so the LLM calls are awaited; the database
+        reads and the case insert run on a thread so they do not block the loop. ``db``
+        must not be used by anything else while this runs.
+        """
+        t0 = time.perf_counter()
+        logger.info(f"[TRACE] MasterAgent | arun_for_alert START | alert_id={alert_id}")
+        alert, verdict, initial_state = await asyncio.to_thread(self._prepare, db, alert_id, context)
+
+        if initial_state is None:
+            result = _triaged_result(verdict)
+        else:
+            t_graph = time.perf_counter()
+            logger.info(f"[TRACE] MasterAgent | graph.ainvoke START | alert_id={alert_id}")
+            with llm_cache.bypass(refresh):
+                result: AMLAnalysisState = await self.graph.ainvoke(initial_state)
+            elapsed_graph = round((time.perf_counter() - t_graph) * 1000, 2)
+            logger.info(
+                f"[TRACE] MasterAgent | graph.ainvoke END | score={result.get('case_score_percentage')} | {elapsed_graph}ms"
+            )
+
+        case = await asyncio.to_thread(self._create_case, db, alert, result)
+        elapsed_total = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info(f"[TRACE] MasterAgent | arun_for_alert END | alert_id={alert_id} case_id={case.case_id} | {elapsed_total}ms")
+        return case
+
+    def _prepare(
+        self, db: Session, alert_id: str, context: RuleContext | None
+    ) -> tuple[Alert, TriageResult, AMLAnalysisState | None]:
+        """The alert, its triage result and the graph's input state, read from the database.
+
+        The state is ``None`` when triage closes the alert: the graph does not run, so
+        its history and features are not loaded.
+        """
         alert = db.query(Alert).filter(Alert.alert_id == alert_id).first()
         if not alert:
             raise NotFoundException(ALERT_NOT_FOUND, "Alert not found")
@@ -143,31 +263,55 @@ class MasterAgent:
         # --- Data fetching ---
         t_fetch = time.perf_counter()
         logger.info(f"[TRACE] MasterAgent | data fetch START | account={alert.account_number}")
-        account = get_account(db, alert.account_number)
-        if not account:
-            raise NotFoundException(ALERT_NOT_FOUND, "Alert account not found")
+        if context is not None:
+            account, customer, high_risk = context.account, context.customer, context.high_risk
+        else:
+            account = get_account(db, alert.account_number)
+            if not account:
+                raise NotFoundException(ALERT_NOT_FOUND, "Alert account not found")
+            customer = get_customer(db, account.customer_id)
+            high_risk = get_high_risk_info(db, alert.account_number)
 
-        customer = get_customer(db, account.customer_id)
-        current_txn = get_latest_transaction(db, alert.account_number)
-        tx_history = get_transaction_history(db, alert.account_number)
+        # --- Triage ---
+        verdict = triage(alert, customer, high_risk, get_prior_decisions(db, alert.account_number))
+        logger.info(f"[TRACE] MasterAgent | triage END | score={verdict.score} false_positive={verdict.false_positive}")
+        if verdict.false_positive:
+            return alert, verdict, None
+
+        # The alert's own transaction: queued runs happen later, when newer ones may exist.
+        if alert.transaction_id:
+            current_txn = get_transaction(db, alert.transaction_id)
+        else:
+            current_txn = get_latest_transaction(db, alert.account_number)
+        tx_history = get_transaction_history(db, alert.account_number, settings.AGENT_HISTORY_ROWS)
         existing_alerts = get_alerts(db, alert.account_number)
-        high_risk = get_high_risk_info(db, alert.account_number)
         elapsed_fetch = round((time.perf_counter() - t_fetch) * 1000, 2)
         logger.info(
             f"[TRACE] MasterAgent | data fetch END | "
             f"txn_history={len(tx_history)} alerts={len(existing_alerts)} high_risk={'yes' if high_risk else 'no'} | {elapsed_fetch}ms"
         )
+        current = as_state_dict(current_txn, TRANSACTION_FIELDS) if current_txn else {}
+
+        # --- Feature stage ---
+        t_features = time.perf_counter()
+        features = account_features(get_history_columns(db, alert.account_number), current)
+        elapsed_features = round((time.perf_counter() - t_features) * 1000, 2)
+        logger.info(
+            f"[TRACE] MasterAgent | features END | history_count={features['history_count']} "
+            f"zscore={features.get('current_amount_zscore')} | {elapsed_features}ms"
+        )
 
         initial_state: AMLAnalysisState = {
             "alert_id": alert.alert_id,
             "account_number": alert.account_number,
             "transaction_id": current_txn.transaction_id if current_txn else "",
-            "customer_profile": customer.__dict__ if customer else {},
-            "account_info": account.__dict__,
-            "transaction_history": [t.__dict__ for t in tx_history],
-            "current_transaction": current_txn.__dict__ if current_txn else {},
-            "existing_alerts": [a.__dict__ for a in existing_alerts],
-            "high_risk_info": high_risk.__dict__ if high_risk else None,
+            "customer_profile": as_state_dict(customer, CUSTOMER_FIELDS) if customer else {},
+            "account_info": as_state_dict(account, ACCOUNT_FIELDS),
+            "transaction_history": [as_state_dict(t, TRANSACTION_FIELDS) for t in tx_history],
+            "current_transaction": current,
+            "existing_alerts": [as_state_dict(a, ALERT_FIELDS) for a in existing_alerts],
+            "high_risk_info": as_state_dict(high_risk, HIGH_RISK_FIELDS) if high_risk else None,
+            "account_features": features,
             "behavioral_score": 0.0,
             "behavioral_summary": "",
             "network_score": 0.0,
@@ -183,15 +327,10 @@ class MasterAgent:
             "case_summary": "",
             "document_content": "",
         }
+        return alert, verdict, initial_state
 
-        # --- Graph execution ---
-        t_graph = time.perf_counter()
-        logger.info(f"[TRACE] MasterAgent | graph.invoke START | alert_id={alert_id}")
-        result: AMLAnalysisState = self.graph.invoke(initial_state)
-        elapsed_graph = round((time.perf_counter() - t_graph) * 1000, 2)
-        logger.info(f"[TRACE] MasterAgent | graph.invoke END | score={result.get('case_score_percentage')} | {elapsed_graph}ms")
-
-        # --- Case creation ---
+    def _create_case(self, db: Session, alert: Alert, result: AMLAnalysisState) -> Case:
+        """Persist the case and its SAR draft (false positives have none) from the graph's output."""
         case = Case(
             case_id=generate_id("CASE"),
             alert_id=alert.alert_id,
@@ -212,19 +351,85 @@ class MasterAgent:
             case_opened_date=utc_now(),
             case_summary=result.get("case_summary", ""),
         )
-        case = CaseRepository.create_case(db, case)
-
-        document = CaseDocumentContent(
-            document_id=generate_id("DOC"),
-            case_id=case.case_id,
-            content_type="sar_draft",
-            content=result.get("document_content", ""),
-            generated_by="document_generator_agent",
-            version=1,
-        )
-        CaseRepository.create_document(db, document)
+        document = None
+        if result.get("document_content"):
+            document = CaseDocumentContent(
+                document_id=generate_id("DOC"),
+                case_id=case.case_id,
+                content_type="sar_draft",
+                content=result["document_content"],
+                generated_by="document_generator_agent",
+                version=1,
+            )
+        with unit_of_work(db):
+            CaseRepository.create_case(db, case, commit=False)
+            if document is not None:
+                CaseRepository.create_document(db, document, commit=False)
+        return case
 
-        elapsed_total = round((time.perf_counter() - t0) * 1000, 2)
-        logger.info(f"[TRACE] MasterAgent | run_for_alert END | alert_id={alert_id} case_id={case.case_id} | {elapsed_total}ms")
 
-        return case
+def _local_fallback(local, state: AMLAnalysisState, exc: Exception) -> dict:
+    logger.warning(
+        f"[TRACE] MasterAgent | LLM call failed, using local scoring | agent={local.__name__} | "
+        f"{type(exc).__name__}: {exc}"
+    )
+    return local(state)
+
+
+def _needs_document(state: AMLAnalysisState) -> str:
+    return END if state.get("case_classification") == "false_positive" else "document"
+
+
+def _triaged_result(verdict: TriageResult) -> dict:
+    """Case fields for an alert triage closed; agent scores and summaries stay empty."""
+    return {
+        "case_score_percentage": verdict.score,
+        "case_classification": "false_positive",
+        "case_summary": verdict.summary(),
+        "document_content": "",
+    }
+
+
+_shared_lock = threading.Lock()
+_shared: MasterAgent | None = None
+
+
+def _provider_settings() -> tuple:
+    """The settings an LLM client is built from; a change means the shared agent is stale."""
+    return (
+        settings.LLM_PROVIDER.lower(),
+        settings.GEMINI_MODEL,
+        settings.GEMINI_API_KEY,
+        settings.OPENAI_MODEL,
+        settings.OPENAI_API_KEY,
+    )
+
+
+def get_master_agent() -> MasterAgent:
+    """The process-wide ``MasterAgent``, built on first use.
+
+    Building one creates the LLM client (and its connection pool) and compiles the graph,
+    so requests and workers share a single instance. It is rebuilt when the provider
+    settings no longer match the ones it was built with.
+    """
+    agent = _shared
+    if agent is not None and agent.provider_settings == _provider_settings():
+        return agent
+    with _shared_lock:
+        if _shared is None or _shared.provider_settings != _provider_settings():
+            _load_shared()
+        return _shared
+
+
+def reload_master_agent() -> MasterAgent:
+    """Rebuild the shared ``MasterAgent`` from the current settings."""
+    with _shared_lock:
+        return _load_shared()
+
+
+def _load_shared() -> MasterAgent:
+    global _shared
+    clear_structured_outputs()
+    _shared = MasterAgent()
+    logger.info(f"[TRACE] MasterAgent | shared agent loaded | provider={_shared.provider_settings[0]}")
+    return _shared
@@ -3,8 +3,29 @@ import time
 from loguru import logger
 from pydantic import BaseModel
 
+from app.agents import local_scorer
+from app.agents.llm_gate import ainvoke_structured, invoke_structured
+from app.agents.prompt_format import fit_tables, format_record
 from app.agents.state import AMLAnalysisState
 
+_ALERT_COLUMNS = ("triggered_date", "alert_type", "severity", "transaction_id")
+_HISTORY_COLUMNS = (
+    "transaction_date",
+    "transaction_type",
+    "transaction_amount",
+    "deposit_source_type",
+    "deposit_source_value",
+    "deposit_source_country",
+)
+_FEATURE_FIELDS = (
+    "history_count",
+    "distinct_source_countries",
+    "deposit_count",
+    "withdrawal_count",
+    "deposit_withdrawal_ratio",
+    "interarrival_min_seconds",
+)
+
 
 class NetworkOutput(BaseModel):
     score: float
@@ -14,21 +35,52 @@ class NetworkOutput(BaseModel):
 def analyze(state: AMLAnalysisState, llm) -> dict:
     logger.info("[TRACE] Agent:network | analyze START")
     if llm is None:
-        logger.info("[TRACE] Agent:network | LLM is None (stub mode) | skipped")
-        return {"network_score": 50.0, "network_summary": "LLM not configured"}
+        return _local(state)
+
+    t0 = time.perf_counter()
+    result = invoke_structured(llm, NetworkOutput, "network", _prompt(state))
+    return _result(result, t0)
+
+
+async def aanalyze(state: AMLAnalysisState, llm) -> dict:
+    """``analyze`` for the async graph path: awaits the LLM instead of blocking a thread."""
+    logger.info("[TRACE] Agent:network | analyze START")
+    if llm is None:
+        return _local(state)
 
+    t0 = time.perf_counter()
+    result = await ainvoke_structured(llm, NetworkOutput, "network", _prompt(state))
+    return _result(result, t0)
+
+
+def _prompt(state: AMLAnalysisState) -> str:
     prompt = (
         "You are a network analyst. Look for relationships across accounts/devices/IPs (if present). "
         "Return a score 0-100 and a short summary.\n\n"
-        f"Account: {state['account_info']}\n"
-        f"Existing alerts: {state['existing_alerts']}\n"
-        f"Transaction history (recent): {state['transaction_history']}\n"
+        f"Account: {format_record(state['account_info'])}\n"
+        f"Account statistics (full history): {format_record(state['account_features'], _FEATURE_FIELDS)}\n"
+    )
+    return fit_tables(
+        "network",
+        prompt,
+        [
+            ("Existing alerts", state["existing_alerts"], _ALERT_COLUMNS, None),
+            (
+                "Transaction history (recent, newest first)",
+                state["transaction_history"],
+                _HISTORY_COLUMNS,
+                "transaction_amount",
+            ),
+        ],
     )
 
-    model = llm.with_structured_output(NetworkOutput)
-    t0 = time.perf_counter()
-    logger.info("[TRACE] Agent:network | LLM call START")
-    result: NetworkOutput = model.invoke(prompt)
+
+def _local(state: AMLAnalysisState) -> dict:
+    logger.info("[TRACE] Agent:network | LLM is None | local scoring")
+    return local_scorer.network(state)
+
+
+def _result(result: NetworkOutput, t0: float) -> dict:
     elapsed = round((time.perf_counter() - t0) * 1000, 2)
     logger.info(f"[TRACE] Agent:network | LLM call END | score={result.score} | {elapsed}ms")
     return {"network_score": result.score, "network_summary": result.summary}
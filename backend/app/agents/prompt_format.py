@@ -0,0 +1,139 @@
+"""Compact, token-budgeted rendering of ``AMLAnalysisState`` for agent prompts.
+
+The state keeps only the columns listed here, without audit columns or direct
+identifiers. Agents render single rows as ``key=value`` pairs and lists as a header
+plus one comma-separated line per row, choosing the columns they need, and fit the
+tables into their prompt token budget.
+"""
+
+import math
+from collections.abc import Sequence
+from datetime import date, datetime
+
+from app.config.settings import settings
+
+CUSTOMER_FIELDS = (
+    "customer_id",
+    "customer_type",
+    "date_of_birth",
+    "nationality",
+    "residency_country",
+    "address_country",
+    "kyc_status",
+    "kyc_verified_date",
+    "kyc_expired_date",
+    "risk_rating",
+)
+ACCOUNT_FIELDS = (
+    "account_number",
+    "account_type",
+    "account_status",
+    "opened_date",
+    "branch_code",
+    "balance_amount",
+    "balance_currency",
+)
+TRANSACTION_FIELDS = (
+    "transaction_id",
+    "transaction_date",
+    "transaction_type",
+    "transaction_amount",
+    "transaction_currency",
+    "transaction_status",
+    "purpose",
+    "deposit_source_type",
+    "deposit_source_value",
+    "deposit_source_country",
+)
+ALERT_FIELDS = ("alert_id", "transaction_id", "alert_type", "severity", "rule_id", "triggered_date", "description")
+HIGH_RISK_FIELDS = ("high_risk_flag", "overall_risk_score", "risk_source", "risk_reason", "detected_date")
+
+# Rough size of a token in English text and identifiers: close enough for a budget,
+# without depending on a provider-specific tokenizer.
+CHARS_PER_TOKEN = 4
+# Every table gets at least this much, however long the rest of the prompt is.
+_MIN_TABLE_TOKENS = 64
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def token_budget(agent: str) -> int:
+    return settings.AGENT_PROMPT_TOKEN_BUDGETS.get(agent, settings.AGENT_PROMPT_TOKEN_BUDGET)
+
+
+def format_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, list | tuple):
+        return " ".join(format_value(item) for item in value)
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    return str(value).replace(",", ";").replace("\n", " ")
+
+
+def format_record(record: dict | None, fields: Sequence[str] | None = None) -> str:
+    """``key=value`` pairs for one row, leaving out empty values; ``none`` for no row."""
+    if not record:
+        return "none"
+    pairs = ((field, record.get(field)) for field in (fields or record))
+    return "; ".join(f"{field}={format_value(value)}" for field, value in pairs if value not in (None, ""))
+
+
+def format_table(rows: list[dict], fields: Sequence[str], max_tokens: int, weight: str | None = None) -> str:
+    """A header line and one comma-separated line per row, within ``max_tokens``.
+
+    ``rows`` come newest first. When they do not all fit, the newest rows take half of
+    the budget, the rest goes to the remaining rows with the largest ``weight`` column
+    (e.g. the biggest amounts), the kept rows stay in their original order, and a last
+    line says how many were left out.
+    """
+    if not rows:
+        return "none"
+    header = ",".join(fields)
+    lines = [",".join(format_value(row.get(field)) for field in fields) for row in rows]
+    available = max_tokens * CHARS_PER_TOKEN - len(header) - 1
+    if sum(len(line) + 1 for line in lines) <= available:
+        return "\n".join([header, *lines])
+
+    available -= 80  # room for the omission line
+    kept: set[int] = set()
+    used = 0
+    for index, line in enumerate(lines):
+        if used + len(line) + 1 > available / 2:
+            break
+        kept.add(index)
+        used += len(line) + 1
+    if weight is not None:
+        rest = sorted(
+            (index for index in range(len(rows)) if index not in kept),
+            key=lambda index: -(rows[index].get(weight) or 0),
+        )
+        for index in rest:
+            if used + len(lines[index]) + 1 <= available:
+                kept.add(index)
+                used += len(lines[index]) + 1
+
+    omitted = [row for index, row in enumerate(rows) if index not in kept]
+    note = f"... {len(omitted)} of {len(rows)} rows omitted"
+    if weight is not None:
+        note += f" (total {weight} {format_value(float(sum(row.get(weight) or 0 for row in omitted)))})"
+    return "\n".join([header, *(lines[index] for index in sorted(kept)), note])
+
+
+def fit_tables(agent: str, prompt: str, tables: list[tuple[str, list[dict], Sequence[str], str | None]]) -> str:
+    """``prompt`` followed by ``(label, rows, fields, weight)`` tables, trimmed to the agent's budget.
+
+    Whatever the prompt leaves of ``token_budget(agent)`` is split evenly between the tables.
+    """
+    sections = [f"{label}:\n" for label, *_ in tables]
+    remaining = token_budget(agent) - estimate_tokens(prompt + "".join(sections)) - len(tables)
+    share = max(remaining // max(len(tables), 1), _MIN_TABLE_TOKENS)
+    for index, (_, rows, fields, weight) in enumerate(tables):
+        sections[index] += format_table(rows, fields, share, weight) + "\n"
+    return prompt + "".join(sections)
@@ -12,6 +12,7 @@ class AMLAnalysisState(TypedDict):
     current_transaction: dict
     existing_alerts: list[dict]
     high_risk_info: dict | None
+    account_features: dict  # see app.agents.features.account_features
 
     behavioral_score: float
     behavioral_summary: str
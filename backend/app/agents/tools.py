@@ -1,9 +1,12 @@
 from collections.abc import Sequence
 
+from sqlalchemy import Row, inspect, select
 from sqlalchemy.orm import Session
 
 from app.models.account import Account
 from app.models.alert import Alert
+from app.models.case import Case
+from app.models.case_decision import CaseDecision
 from app.models.customer import Customer
 from app.models.high_risk_account import HighRiskAccount
 from app.models.transaction import Transaction
@@ -17,6 +20,10 @@ def get_customer(db: Session, customer_id: str) -> Customer | None:
     return db.query(Customer).filter(Customer.customer_id == customer_id).first()
 
 
+def get_transaction(db: Session, transaction_id: str) -> Transaction | None:
+    return db.query(Transaction).filter(Transaction.transaction_id == transaction_id).first()
+
+
 def get_latest_transaction(db: Session, account_number: str) -> Transaction | None:
     return (
         db.query(Transaction)
@@ -36,9 +43,39 @@ def get_transaction_history(db: Session, account_number: str, limit: int = 50) -
     )
 
 
+def get_history_columns(db: Session, account_number: str) -> Sequence[Row]:
+    """The columns the feature stage needs, for every transaction of the account."""
+    return db.execute(
+        select(
+            Transaction.transaction_amount,
+            Transaction.transaction_date,
+            Transaction.transaction_type,
+            Transaction.deposit_source_country,
+        ).where(Transaction.account_number == account_number)
+    ).all()
+
+
 def get_alerts(db: Session, account_number: str) -> Sequence[Alert]:
     return db.query(Alert).filter(Alert.account_number == account_number).order_by(Alert.triggered_date.desc()).all()
 
 
+def get_prior_decisions(db: Session, account_number: str) -> list[str]:
+    """Latest ACCEPT/REJECT decision of each decided case of the account."""
+    rows = (
+        db.query(CaseDecision.case_id, CaseDecision.decision)
+        .join(Case, Case.case_id == CaseDecision.case_id)
+        .filter(Case.account_number == account_number)
+        .order_by(CaseDecision.decision_date, CaseDecision.id)
+        .all()
+    )
+    return list({case_id: decision for case_id, decision in rows}.values())
+
+
 def get_high_risk_info(db: Session, account_number: str) -> HighRiskAccount | None:
     return db.query(HighRiskAccount).filter(HighRiskAccount.account_number == account_number).first()
+
+
+def as_state_dict(instance, fields: Sequence[str] | None = None) -> dict:
+    """Column values of an ORM row, only ``fields`` when given; reloads it first if a commit expired its attributes."""
+    keys = fields or [attr.key for attr in inspect(instance).mapper.column_attrs]
+    return {key: getattr(instance, key) for key in keys}
@@ -1,4 +1,5 @@
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
 
 from loguru import logger
 from sqlalchemy import create_engine, event
@@ -37,6 +38,37 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """``get_db`` as a context manager, for work that runs outside a request's dependencies."""
+    yield from get_db()
+
+
+def commit_without_expire(db: Session) -> None:
+    """Commit while keeping loaded attributes, so objects built in full are not reloaded afterwards."""
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """Group repository calls made with ``commit=False`` into one flush and one commit.
+
+    Everything is rolled back if the block raises. Objects written in the block stay
+    populated after the commit instead of being expired and re-selected.
+    """
+    try:
+        yield db
+        commit_without_expire(db)
+    except Exception:
+        db.rollback()
+        raise
+
+
 def init_db() -> None:
     """Create all tables in the database."""
     import app.models  # noqa: F401 — ensure all models are registered
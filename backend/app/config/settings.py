@@ -16,6 +16,49 @@ class Settings(BaseSettings):
     VELOCITY_TXN_COUNT: int = 5
     VELOCITY_WINDOW_MINUTES: int = 60
     CROSS_BORDER_ALERT_SEVERITY: str = "high"
+    # Directory (or file) of declarative rule definitions loaded on top of the built-in
+    # rules; a definition with a built-in rule_id replaces that rule.
+    RULE_DEFINITIONS_PATH: str = ""
+
+    # In-process sliding-window store for the history rules
+    RULE_WINDOW_STORE_ENABLED: bool = False
+    RULE_WINDOW_STORE_VERIFY: bool = False  # also load from DB and compare on every lookup
+    RULE_WINDOW_STORE_MAX_ACCOUNTS: int = 10000
+    # >1 runs the per-transaction history/customer/high-risk reads concurrently on their own sessions
+    RULE_PREFETCH_WORKERS: int = 0
+
+    # Rule runtime statistics
+    RULE_STATS_SAMPLE_SIZE: int = 1024  # latency samples kept per rule for percentiles
+    RULE_ORDER_REFRESH_CALLS: int = 1000  # re-sort rules by observed cost every N evaluations
+
+    # Bulk ingestion
+    TRANSACTION_BULK_MAX_ITEMS: int = 5000
+    # NDJSON stream ingest: micro-batch size and the longest a record waits for its batch to fill
+    TRANSACTION_STREAM_BATCH_SIZE: int = 500
+    TRANSACTION_STREAM_MAX_LATENCY_MS: int = 250
+    TRANSACTION_STREAM_MAX_LINE_BYTES: int = 65536
+    # Stream ingest stops reading while more agent jobs than this are queued
+    AGENT_QUEUE_MAX_BACKLOG: int = 1000
+    # File import (scripts/import_transactions.py): rows per insert and per checkpoint
+    TRANSACTION_IMPORT_CHUNK_SIZE: int = 5000
+
+    # Agent jobs (agent_jobs table). Run a worker inside the API process, or set false and
+    # run scripts/agent_worker.py separately.
+    AGENT_WORKER_IN_PROCESS: bool = True
+    AGENT_WORKER_COUNT: int = 4  # worker threads per process; one account's jobs never run concurrently
+    AGENT_MAX_INFLIGHT_LLM_CALLS: int = 8  # cap on concurrent LLM requests across a process's workers
+    # Jobs one asyncio worker (scripts/agent_worker.py --async) runs at once on its event loop
+    AGENT_ASYNC_WORKER_CONCURRENCY: int = 100
+    AGENT_JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    AGENT_JOB_MAX_ATTEMPTS: int = 3
+    # Running jobs older than this are assumed orphaned by a stopped worker and re-queued
+    AGENT_JOB_STALE_SECONDS: int = 900
+
+    # Threshold sweep (backtest) cost model
+    AGENT_LLM_CALLS_PER_CASE: int = 6  # one structured-output call per agent node
+    LLM_COST_PER_CALL_USD: float = 0.002
+    THRESHOLD_SWEEP_MAX_POINTS: int = 1000
+    BACKTEST_CACHE_TTL_SECONDS: int = 300
 
     # LLM Configuration
     LLM_PROVIDER: str = "gemini"  # "gemini" or "openai"
@@ -23,6 +66,24 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-2.5-flash"
     OPENAI_API_KEY: str = "your-openai-key-here"
     OPENAI_MODEL: str = "gpt-4o-mini"
+    # Per agent call; a call that fails or times out is scored by app.agents.local_scorer
+    # instead (the async path's timeout also covers waiting for an LLM slot)
+    AGENT_LLM_TIMEOUT_SECONDS: float = 30.0
+    AGENT_LOCAL_FALLBACK_ENABLED: bool = True
+    # Parsed agent responses keyed by provider/model/agent/prompt (llm_cache_entries table)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 604800
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    # Estimated prompt tokens per agent call; history tables are trimmed to fit.
+    # Per-agent overrides as JSON, e.g. AGENT_PROMPT_TOKEN_BUDGETS='{"evidence": 2500}'
+    AGENT_PROMPT_TOKEN_BUDGET: int = 1500
+    AGENT_PROMPT_TOKEN_BUDGETS: dict[str, int] = {}
+    # Raw recent transactions passed to the agents; statistics cover the full history
+    AGENT_HISTORY_ROWS: int = 20
+    # Rules-only triage before the graph: alerts scoring below this are closed as false
+    # positives without calling the LLM (see app.agents.triage)
+    AGENT_TRIAGE_ENABLED: bool = True
+    AGENT_TRIAGE_FALSE_POSITIVE_SCORE: float = 20.0
 
     # Simulation
     SIMULATION_MAX_TXN_PER_SCENARIO: int = 3
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+
+from app.config.database import get_db
+from app.schemas.agent_job import AgentJobOut
+from app.schemas.common import StandardHeaders, success_response
+from app.services.agent_job_service import AgentJobService
+from app.utils.datetime_utils import utc_now
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=dict)
+def get_agent_job(
+    job_id: str,
+    request: Request,
+    _headers: StandardHeaders = Depends(),
+    db: Session = Depends(get_db),
+):
+    job = AgentJobService.get_job(db, job_id)
+    data = AgentJobOut.model_validate(job).model_dump()
+    return success_response(data, request.state.request_id, utc_now().isoformat())
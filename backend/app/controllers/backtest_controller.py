@@ -0,0 +1,30 @@
+import time
+
+from fastapi import APIRouter, Depends, Request
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.config.database import get_db
+from app.dependencies.auth import get_current_user
+from app.schemas.backtest import ThresholdSweepRequest
+from app.schemas.common import StandardHeaders, success_response
+from app.services.threshold_sweep_service import ThresholdSweepService
+from app.utils.datetime_utils import utc_now
+
+router = APIRouter()
+
+
+@router.post("/threshold-sweep", response_model=dict)
+def threshold_sweep(
+    payload: ThresholdSweepRequest,
+    request: Request,
+    _headers: StandardHeaders = Depends(),
+    db: Session = Depends(get_db),
+    _user=Depends(get_current_user),
+):
+    start = time.perf_counter()
+    logger.info(f"[TRACE] Controller | threshold_sweep START | thresholds={list(payload.ranges)}")
+    report = ThresholdSweepService.run(db, payload.ranges, refresh=payload.refresh)
+    elapsed = round((time.perf_counter() - start) * 1000, 2)
+    logger.info(f"[TRACE] Controller | threshold_sweep END | points={len(report.rows)} | {elapsed}ms")
+    return success_response(report.model_dump(), request.state.request_id, utc_now().isoformat())
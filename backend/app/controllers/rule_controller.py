@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Request
+
+from app.dependencies.auth import get_current_user
+from app.schemas.common import StandardHeaders, success_response
+from app.services.rule_service import RuleService
+from app.utils.datetime_utils import utc_now
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=dict)
+def get_rule_stats(
+    request: Request,
+    _headers: StandardHeaders = Depends(),
+    _user=Depends(get_current_user),
+):
+    data = [stats.model_dump() for stats in RuleService.get_stats()]
+    return success_response(data, request.state.request_id, utc_now().isoformat())
+
+
+@router.post("/stats/reset", response_model=dict)
+def reset_rule_stats(
+    request: Request,
+    _headers: StandardHeaders = Depends(),
+    _user=Depends(get_current_user),
+):
+    RuleService.reset_stats()
+    return success_response({"status": "reset"}, request.state.request_id, utc_now().isoformat())
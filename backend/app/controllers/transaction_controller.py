@@ -1,16 +1,34 @@
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 from sqlalchemy.orm import Session
 
 from app.config.database import get_db
 from app.schemas.common import StandardHeaders, paginated_response, success_response
-from app.schemas.transaction import TransactionCreate, TransactionOut
+from app.schemas.transaction import TransactionBulkCreate, TransactionCreate, TransactionOut
+from app.services.agent_job_service import AgentJobService
 from app.services.transaction_service import TransactionService
+from app.services.transaction_stream_service import TransactionStreamService
 from app.utils.datetime_utils import utc_now
 from app.dependencies.auth import get_current_user
 
 router = APIRouter()
 
 
+class _FullDuplexStreamingResponse(StreamingResponse):
+    """Streams the body without a disconnect listener competing for ``receive``.
+
+    ``StreamingResponse`` reads ``receive`` in the background to detect disconnects, which
+    swallows request-body messages an endpoint is still consuming; here the endpoint's own
+    body reader sees the disconnect instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
 @router.post("/", response_model=dict)
 def create_transaction(
     payload: TransactionCreate,
@@ -20,9 +38,31 @@ def create_transaction(
 ):
     transaction = TransactionService.create_transaction(db, payload)
     data = TransactionOut.model_validate(transaction).model_dump()
+    if transaction.transaction_status == "held":
+        job = AgentJobService.get_job_for_transaction(db, transaction.transaction_id)
+        data["agent_job_id"] = job.job_id if job else None
     return success_response(data, request.state.request_id, utc_now().isoformat())
 
 
+@router.post("/bulk", response_model=dict)
+def create_transactions_bulk(
+    payload: TransactionBulkCreate,
+    request: Request,
+    _headers: StandardHeaders = Depends(),
+    db: Session = Depends(get_db),
+):
+    result = TransactionService.create_transactions_bulk(db, payload.transactions)
+    return success_response(result.model_dump(), request.state.request_id, utc_now().isoformat())
+
+
+@router.post("/stream")
+async def stream_transactions(
+    request: Request,
+    _headers: StandardHeaders = Depends(),
+):
+    return _FullDuplexStreamingResponse(TransactionStreamService.process(request.stream()), media_type="application/x-ndjson")
+
+
 @router.get("/", response_model=dict)
 def list_transactions(
     request: Request,
@@ -24,6 +24,10 @@ TRANSACTION_INVALID_TYPE = "AML0301"
 TRANSACTION_HELD_FOR_REVIEW = "AML0302"
 TRANSACTION_FAILED = "AML0303"
 TRANSACTION_INVALID_AMOUNT = "AML0304"
+TRANSACTION_BATCH_TOO_LARGE = "AML0305"
+TRANSACTION_STREAM_INVALID_RECORD = "AML0306"
+TRANSACTION_IMPORT_INVALID_FILE = "AML0307"
+TRANSACTION_IMPORT_NOT_FOUND = "AML0308"
 
 # Alert (AML0400 - AML0499)
 ALERT_NOT_FOUND = "AML0400"
@@ -40,11 +44,14 @@ CASE_DOC_GEN_FAILED = "AML0504"
 RULE_EXECUTION_FAILED = "AML0600"
 RULE_NOT_FOUND = "AML0601"
 RULE_THRESHOLD_NOT_CONFIGURED = "AML0602"
+RULE_BACKTEST_INVALID_GRID = "AML0603"
+RULE_DEFINITION_INVALID = "AML0604"
 
 # Agent Orchestration (AML0700 - AML0799)
 AGENT_ORCHESTRATION_FAILED = "AML0700"
 AGENT_LLM_API_FAILED = "AML0701"
 AGENT_TIMEOUT = "AML0702"
+AGENT_JOB_NOT_FOUND = "AML0703"
 
 # Simulation (AML0800 - AML0899)
 SIMULATION_SCENARIO_NOT_FOUND = "AML0800"
@@ -4,13 +4,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
+from app.agents.master_agent import get_master_agent
 from app.config.database import init_db
 from app.controllers import (
     account_controller,
+    agent_job_controller,
     alert_controller,
     auth_controller,
+    backtest_controller,
     case_controller,
     customer_controller,
+    rule_controller,
     simulation_controller,
     transaction_controller,
     user_controller,
@@ -18,6 +22,7 @@ from app.controllers import (
 from app.config.settings import settings, setup_logging
 from app.exceptions.handlers import register_exception_handlers
 from app.middleware.request_context import RequestContextMiddleware
+from app.services.agent_worker import AgentWorkerPool
 from app.utils.datetime_utils import utc_now
 
 
@@ -27,8 +32,15 @@ async def lifespan(app: FastAPI):
     setup_logging()
     logger.info("Starting Regulus AML application...")
     init_db()
+    # Build the LLM client and compile the agent graph once; workers reuse it.
+    app.state.master_agent = get_master_agent()
+    workers = AgentWorkerPool() if settings.AGENT_WORKER_IN_PROCESS else None
+    if workers:
+        workers.start()
     logger.info("Application startup complete")
     yield
+    if workers:
+        workers.stop(timeout=settings.API_TIMEOUT_SECONDS)
     logger.info("Application shutdown")
 
 
@@ -70,10 +82,13 @@ def create_app() -> FastAPI:
     app.include_router(account_controller.router, prefix="/api/v1/accounts", tags=["Accounts"])
     app.include_router(transaction_controller.router, prefix="/api/v1/transactions", tags=["Transactions"])
     app.include_router(alert_controller.router, prefix="/api/v1/alerts", tags=["Alerts"])
+    app.include_router(agent_job_controller.router, prefix="/api/v1/agent-jobs", tags=["Agent Jobs"])
     app.include_router(case_controller.router, prefix="/api/v1/cases", tags=["Cases"])
     app.include_router(simulation_controller.router, prefix="/api/v1/simulate", tags=["Simulation"])
     app.include_router(user_controller.router, prefix="/api/v1/users", tags=["Users"])
     app.include_router(auth_controller.router, prefix="/api/v1/auth", tags=["Auth"])
+    app.include_router(rule_controller.router, prefix="/api/v1/rules", tags=["Rules"])
+    app.include_router(backtest_controller.router, prefix="/api/v1/backtest", tags=["Backtest"])
 
     return app
 
@@ -3,19 +3,33 @@ import time
 import uuid
 
 from loguru import logger
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import MutableHeaders
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config.settings import settings
 from app.utils.datetime_utils import utc_now
 
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
+class RequestContextMiddleware:
     """Middleware that extracts standard headers, binds request context to loguru,
-    and enforces a fail-fast timeout on all API requests."""
+    and enforces a fail-fast timeout on all API requests.
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    Written as plain ASGI rather than ``BaseHTTPMiddleware`` so the request body and the
+    response body pass through untouched, which streaming endpoints need to read the one
+    while writing the other. The timeout covers the time until the response starts.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
         # Extract or generate request ID
         request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
         forwarded_for = request.headers.get("X-Forwarded-For", "unknown")
@@ -26,17 +40,36 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
         request.state.forwarded_for = forwarded_for
         request.state.device_id = device_id
 
+        status_code = 500
+        started = asyncio.Event()
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                # Add request ID to response headers
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+                status_code = message["status"]
+                started.set()
+            await send(message)
+
         # Bind request_id to loguru context
         with logger.contextualize(request_id=request_id):
             logger.info(f"Incoming {request.method} {request.url.path} | IP: {forwarded_for} | Device: {device_id}")
 
             start_time = time.perf_counter()
+            app_task = asyncio.ensure_future(self.app(scope, receive, send_with_request_id))
+            response_started = asyncio.ensure_future(started.wait())
             try:
-                response = await asyncio.wait_for(
-                    call_next(request),
+                await asyncio.wait(
+                    {app_task, response_started},
                     timeout=settings.API_TIMEOUT_SECONDS,
+                    return_when=asyncio.FIRST_COMPLETED,
                 )
-            except asyncio.TimeoutError:
+            finally:
+                response_started.cancel()
+
+            if not started.is_set() and not app_task.done():
+                app_task.cancel()
                 duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
                 logger.error(
                     f"Request timeout after {duration_ms}ms | "
@@ -52,12 +85,11 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
                         "timestamp": utc_now().isoformat(),
                     },
                 )
+                await response(scope, receive, send_with_request_id)
+            else:
+                await app_task
 
             duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
             logger.info(
-                f"Completed {request.method} {request.url.path} | Status: {response.status_code} | Duration: {duration_ms}ms"
+                f"Completed {request.method} {request.url.path} | Status: {status_code} | Duration: {duration_ms}ms"
             )
-
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-        return response
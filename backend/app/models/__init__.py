@@ -1,23 +1,29 @@
 from app.models.account import Account
+from app.models.agent_job import AgentJob
 from app.models.alert import Alert
 from app.models.case import Case
 from app.models.case_decision import CaseDecision
 from app.models.case_document_content import CaseDocumentContent
 from app.models.customer import Customer
 from app.models.high_risk_account import HighRiskAccount
+from app.models.llm_cache_entry import LlmCacheEntry
 from app.models.organization import Organization
 from app.models.transaction import Transaction
+from app.models.transaction_import import TransactionImport
 from app.models.user import User
 
 __all__ = [
     "Account",
+    "AgentJob",
     "Alert",
     "Case",
     "CaseDecision",
     "CaseDocumentContent",
     "Customer",
     "HighRiskAccount",
+    "LlmCacheEntry",
     "Organization",
     "Transaction",
+    "TransactionImport",
     "User",
 ]
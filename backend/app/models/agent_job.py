@@ -0,0 +1,39 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.config.database import Base
+
+
+class AgentJob(Base):
+    """A queued agent analysis of one alert, claimed and run by an agent worker."""
+
+    __tablename__ = "agent_jobs"
+
+    job_id: Mapped[str] = mapped_column(String, primary_key=True)  # JOB-XXXXXXXXXX
+    alert_id: Mapped[str] = mapped_column(String, ForeignKey("alerts.alert_id"), nullable=False)
+    account_number: Mapped[str] = mapped_column(String, ForeignKey("accounts.account_number"), nullable=False)
+    transaction_id: Mapped[str | None] = mapped_column(
+        String, ForeignKey("transactions.transaction_id"), nullable=True, index=True
+    )
+    # queued/running/completed/failed
+    job_status: Mapped[str] = mapped_column(String, nullable=False, default="queued", index=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    worker_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    case_id: Mapped[str | None] = mapped_column(String, ForeignKey("cases.case_id"), nullable=True)
+    error_message: Mapped[str | None] = mapped_column(String, nullable=True)
+    queued_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    started_date: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_date: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    created_date: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
+    updated_date: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC)
+    )
+    created_by: Mapped[str] = mapped_column(String, nullable=False, default="system")
+    updated_by: Mapped[str] = mapped_column(String, nullable=False, default="system")
+
+    # Relationships
+    alert = relationship("Alert")
+    transaction = relationship("Transaction")
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.config.database import Base
+
+
+class LlmCacheEntry(Base):
+    """A parsed structured-output response, keyed by a hash of the request that produced it."""
+
+    __tablename__ = "llm_cache_entries"
+
+    cache_key: Mapped[str] = mapped_column(String, primary_key=True)  # sha256 of provider/model/agent/schema/prompt
+    provider: Mapped[str] = mapped_column(String, nullable=False)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    agent: Mapped[str] = mapped_column(String, nullable=False)
+    response: Mapped[str] = mapped_column(Text, nullable=False)  # the output model as JSON
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_date: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)  # for the TTL
+    last_used_date: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)  # for LRU eviction
@@ -0,0 +1,30 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.config.database import Base
+
+
+class TransactionImport(Base):
+    """Progress of one file import, committed with each chunk so an interrupted run can resume."""
+
+    __tablename__ = "transaction_imports"
+
+    import_id: Mapped[str] = mapped_column(String, primary_key=True)  # IMP-XXXXXXX or caller-chosen
+    source_path: Mapped[str] = mapped_column(String, nullable=False)
+    rule_mode: Mapped[str] = mapped_column(String, nullable=False)  # inline/defer/off
+    import_status: Mapped[str] = mapped_column(String, nullable=False, default="running")  # running/loaded/completed
+    rows_read: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # file rows consumed (the checkpoint)
+    rows_inserted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rows_rejected: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    alerts_raised: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Last transaction_id evaluated by a deferred-rules backfill
+    backfill_cursor: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    created_date: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
+    updated_date: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC)
+    )
+    created_by: Mapped[str] = mapped_column(String, nullable=False, default="system")
+    updated_by: Mapped[str] = mapped_column(String, nullable=False, default="system")
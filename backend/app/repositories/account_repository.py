@@ -17,6 +17,12 @@ class AccountRepository:
     def get_by_number(db: Session, account_number: str) -> Account | None:
         return db.query(Account).filter(Account.account_number == account_number).first()
 
+    @staticmethod
+    def list_by_numbers(db: Session, account_numbers: list[str]) -> list[Account]:
+        if not account_numbers:
+            return []
+        return db.query(Account).filter(Account.account_number.in_(account_numbers)).all()
+
     @staticmethod
     def list(db: Session, offset: int, limit: int) -> list[Account]:
         return db.query(Account).order_by(Account.account_number).offset(offset).limit(limit).all()
@@ -41,8 +47,9 @@ class AccountRepository:
         return db.query(Account).filter(Account.customer_id == customer_id).count()
 
     @staticmethod
-    def update(db: Session, account: Account) -> Account:
+    def update(db: Session, account: Account, commit: bool = True) -> Account:
         db.add(account)
-        db.commit()
-        db.refresh(account)
+        if commit:
+            db.commit()
+            db.refresh(account)
         return account
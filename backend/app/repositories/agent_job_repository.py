@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.agent_job import AgentJob
+
+_AGENT_JOB_INSERT_COLUMNS = ("job_id", "alert_id", "account_number", "transaction_id", "job_status", "queued_date")
+
+
+class AgentJobRepository:
+    @staticmethod
+    def create(db: Session, job: AgentJob, commit: bool = True) -> AgentJob:
+        db.add(job)
+        if commit:
+            db.commit()
+            db.refresh(job)
+        return job
+
+    @staticmethod
+    def bulk_insert(db: Session, jobs: list[AgentJob], commit: bool = True) -> int:
+        """Insert jobs as one executemany without tracking them in the session (for batch ingestion)."""
+        if not jobs:
+            return 0
+        rows = [{column: getattr(job, column) for column in _AGENT_JOB_INSERT_COLUMNS} for job in jobs]
+        db.execute(insert(AgentJob), rows)
+        if commit:
+            db.commit()
+        return len(rows)
+
+    @staticmethod
+    def get_by_id(db: Session, job_id: str) -> AgentJob | None:
+        return (
+            db.query(AgentJob).filter(AgentJob.job_id == job_id).execution_options(populate_existing=True).first()
+        )
+
+    @staticmethod
+    def get_by_transaction(db: Session, transaction_id: str) -> AgentJob | None:
+        return (
+            db.query(AgentJob)
+            .filter(AgentJob.transaction_id == transaction_id)
+            .order_by(AgentJob.queued_date.desc())
+            .first()
+        )
+
+    @staticmethod
+    def claim_next(db: Session, worker_id: str, now: datetime) -> str | None:
+        """Atomically mark the oldest claimable queued job as running for ``worker_id`` and return its ID.
+
+        Jobs of an account that already has a running job are skipped, so one account's
+        analyses run one at a time, in queue order, across every worker and process.
+        """
+        busy_accounts = select(AgentJob.account_number).where(AgentJob.job_status == "running")
+        oldest = (
+            select(AgentJob.job_id)
+            .where(AgentJob.job_status == "queued", AgentJob.account_number.not_in(busy_accounts))
+            .order_by(AgentJob.queued_date, AgentJob.job_id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        job_id = db.execute(
+            update(AgentJob)
+            .where(AgentJob.job_id == oldest, AgentJob.job_status == "queued")
+            .values(
+                job_status="running",
+                worker_id=worker_id,
+                attempts=AgentJob.attempts + 1,
+                started_date=now,
+                updated_date=now,
+            )
+            .returning(AgentJob.job_id)
+        ).scalar()
+        db.commit()
+        return job_id
+
+    @staticmethod
+    def requeue_stale(db: Session, started_before: datetime) -> int:
+        """Put back jobs left running by a worker that stopped before finishing them."""
+        result = db.execute(
+            update(AgentJob)
+            .where(AgentJob.job_status == "running", AgentJob.started_date < started_before)
+            .values(job_status="queued", worker_id=None)
+        )
+        db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def count_by_status(db: Session, job_status: str) -> int:
+        return db.query(AgentJob).filter(AgentJob.job_status == job_status).count()
+
+    @staticmethod
+    def update(db: Session, job: AgentJob, commit: bool = True) -> AgentJob:
+        db.add(job)
+        if commit:
+            db.commit()
+            db.refresh(job)
+        return job
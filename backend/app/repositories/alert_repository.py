@@ -1,9 +1,23 @@
 from __future__ import annotations
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.config.database import commit_without_expire
 from app.models.alert import Alert
 
+# Columns the rule engine sets; audit columns fall back to their defaults.
+_ALERT_INSERT_COLUMNS = (
+    "alert_id",
+    "account_number",
+    "transaction_id",
+    "alert_type",
+    "severity",
+    "rule_id",
+    "description",
+    "triggered_date",
+)
+
 
 class AlertRepository:
     @staticmethod
@@ -13,6 +27,32 @@ class AlertRepository:
         db.refresh(alert)
         return alert
 
+    @staticmethod
+    def create_many(db: Session, alerts: list[Alert], commit: bool = True) -> list[Alert]:
+        """Add alerts together; with ``commit`` they are written with one flush and one commit.
+
+        The alerts are built fully populated (column defaults are applied client-side at
+        flush), so they are neither refreshed nor expired by the commit.
+        """
+        if not alerts:
+            return alerts
+        db.add_all(alerts)
+        if commit:
+            commit_without_expire(db)
+        return alerts
+
+    @staticmethod
+    def bulk_insert(db: Session, alerts: list[Alert], commit: bool = True) -> int:
+        """Insert alerts as one executemany without tracking them in the session (for batch runs)."""
+        if not alerts:
+            return 0
+        rows = [{column: getattr(alert, column) for column in _ALERT_INSERT_COLUMNS} for alert in alerts]
+        db.flush()  # pending rows the alerts reference (e.g. their transactions) go first
+        db.execute(insert(Alert), rows)
+        if commit:
+            db.commit()
+        return len(rows)
+
     @staticmethod
     def get_by_id(db: Session, alert_id: str) -> Alert | None:
         return db.query(Alert).filter(Alert.alert_id == alert_id).first()
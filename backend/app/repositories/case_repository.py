@@ -9,10 +9,11 @@ from app.models.case_document_content import CaseDocumentContent
 
 class CaseRepository:
     @staticmethod
-    def create_case(db: Session, case: Case) -> Case:
+    def create_case(db: Session, case: Case, commit: bool = True) -> Case:
         db.add(case)
-        db.commit()
-        db.refresh(case)
+        if commit:
+            db.commit()
+            db.refresh(case)
         return case
 
     @staticmethod
@@ -52,22 +53,37 @@ class CaseRepository:
         )
 
     @staticmethod
-    def create_decision(db: Session, decision: CaseDecision) -> CaseDecision:
+    def latest_decisions_by_transaction(db: Session) -> dict[str, str]:
+        """Latest ACCEPT/REJECT decision of every decided case, keyed by the case's transaction_id."""
+        rows = (
+            db.query(Case.transaction_id, CaseDecision.decision)
+            .join(CaseDecision, CaseDecision.case_id == Case.case_id)
+            .filter(Case.transaction_id.is_not(None))
+            .order_by(CaseDecision.decision_date, CaseDecision.id)
+            .all()
+        )
+        return {transaction_id: decision for transaction_id, decision in rows}
+
+    @staticmethod
+    def create_decision(db: Session, decision: CaseDecision, commit: bool = True) -> CaseDecision:
         db.add(decision)
-        db.commit()
-        db.refresh(decision)
+        if commit:
+            db.commit()
+            db.refresh(decision)
         return decision
 
     @staticmethod
-    def update_case(db: Session, case: Case) -> Case:
+    def update_case(db: Session, case: Case, commit: bool = True) -> Case:
         db.add(case)
-        db.commit()
-        db.refresh(case)
+        if commit:
+            db.commit()
+            db.refresh(case)
         return case
 
     @staticmethod
-    def create_document(db: Session, document: CaseDocumentContent) -> CaseDocumentContent:
+    def create_document(db: Session, document: CaseDocumentContent, commit: bool = True) -> CaseDocumentContent:
         db.add(document)
-        db.commit()
-        db.refresh(document)
+        if commit:
+            db.commit()
+            db.refresh(document)
         return document
@@ -17,6 +17,12 @@ class CustomerRepository:
     def get_by_id(db: Session, customer_id: str) -> Customer | None:
         return db.query(Customer).filter(Customer.customer_id == customer_id).first()
 
+    @staticmethod
+    def list_by_ids(db: Session, customer_ids: list[str]) -> list[Customer]:
+        if not customer_ids:
+            return []
+        return db.query(Customer).filter(Customer.customer_id.in_(customer_ids)).all()
+
     @staticmethod
     def list(db: Session, offset: int, limit: int) -> list[Customer]:
         return db.query(Customer).order_by(Customer.customer_id).offset(offset).limit(limit).all()
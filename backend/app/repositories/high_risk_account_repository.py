@@ -9,15 +9,28 @@ class HighRiskAccountRepository:
         return db.query(HighRiskAccount).filter(HighRiskAccount.account_number == account_number).first()
 
     @staticmethod
-    def create(db: Session, high_risk_account: HighRiskAccount) -> HighRiskAccount:
+    def list_by_accounts(db: Session, account_numbers: list[str]) -> list[HighRiskAccount]:
+        if not account_numbers:
+            return []
+        return (
+            db.query(HighRiskAccount)
+            .filter(HighRiskAccount.account_number.in_(account_numbers))
+            .order_by(HighRiskAccount.id)
+            .all()
+        )
+
+    @staticmethod
+    def create(db: Session, high_risk_account: HighRiskAccount, commit: bool = True) -> HighRiskAccount:
         db.add(high_risk_account)
-        db.commit()
-        db.refresh(high_risk_account)
+        if commit:
+            db.commit()
+            db.refresh(high_risk_account)
         return high_risk_account
 
     @staticmethod
-    def update(db: Session, high_risk_account: HighRiskAccount) -> HighRiskAccount:
+    def update(db: Session, high_risk_account: HighRiskAccount, commit: bool = True) -> HighRiskAccount:
         db.add(high_risk_account)
-        db.commit()
-        db.refresh(high_risk_account)
+        if commit:
+            db.commit()
+            db.refresh(high_risk_account)
         return high_risk_account
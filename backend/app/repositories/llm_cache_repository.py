@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models.llm_cache_entry import LlmCacheEntry
+
+
+class LlmCacheRepository:
+    @staticmethod
+    def get_by_key(db: Session, cache_key: str) -> LlmCacheEntry | None:
+        return db.get(LlmCacheEntry, cache_key)
+
+    @staticmethod
+    def save(db: Session, entry: LlmCacheEntry, commit: bool = True) -> LlmCacheEntry:
+        """Insert the entry, or overwrite the one with the same key."""
+        entry = db.merge(entry)
+        if commit:
+            db.commit()
+        return entry
+
+    @staticmethod
+    def touch(db: Session, cache_key: str, now: datetime, commit: bool = True) -> None:
+        db.execute(
+            update(LlmCacheEntry)
+            .where(LlmCacheEntry.cache_key == cache_key)
+            .values(last_used_date=now, hit_count=LlmCacheEntry.hit_count + 1)
+        )
+        if commit:
+            db.commit()
+
+    @staticmethod
+    def delete_created_before(db: Session, before: datetime, commit: bool = True) -> int:
+        result = db.execute(delete(LlmCacheEntry).where(LlmCacheEntry.created_date < before))
+        if commit:
+            db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def delete_least_recently_used(db: Session, keep: int, commit: bool = True) -> int:
+        """Delete all but the ``keep`` most recently used entries."""
+        kept = select(LlmCacheEntry.cache_key).order_by(LlmCacheEntry.last_used_date.desc()).limit(keep)
+        result = db.execute(delete(LlmCacheEntry).where(LlmCacheEntry.cache_key.not_in(kept)))
+        if commit:
+            db.commit()
+        return result.rowcount
@@ -0,0 +1,25 @@
+from sqlalchemy.orm import Session
+
+from app.models.transaction_import import TransactionImport
+
+
+class TransactionImportRepository:
+    @staticmethod
+    def get_by_id(db: Session, import_id: str) -> TransactionImport | None:
+        return db.query(TransactionImport).filter(TransactionImport.import_id == import_id).first()
+
+    @staticmethod
+    def create(db: Session, transaction_import: TransactionImport, commit: bool = True) -> TransactionImport:
+        db.add(transaction_import)
+        if commit:
+            db.commit()
+            db.refresh(transaction_import)
+        return transaction_import
+
+    @staticmethod
+    def update(db: Session, transaction_import: TransactionImport, commit: bool = True) -> TransactionImport:
+        db.add(transaction_import)
+        if commit:
+            db.commit()
+            db.refresh(transaction_import)
+        return transaction_import
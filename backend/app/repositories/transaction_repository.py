@@ -1,18 +1,73 @@
 from __future__ import annotations
 
+from datetime import datetime
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.transaction import Transaction
 
+# Columns ingestion sets; audit columns fall back to their defaults.
+_TRANSACTION_INSERT_COLUMNS = (
+    "transaction_id",
+    "account_number",
+    "transaction_amount",
+    "transaction_currency",
+    "transaction_date",
+    "transaction_type",
+    "transaction_status",
+    "purpose",
+    "deposit_source_type",
+    "deposit_source_value",
+    "deposit_source_country",
+)
+
 
 class TransactionRepository:
     @staticmethod
-    def create(db: Session, transaction: Transaction) -> Transaction:
+    def create(db: Session, transaction: Transaction, commit: bool = True) -> Transaction:
         db.add(transaction)
-        db.commit()
-        db.refresh(transaction)
+        if commit:
+            db.commit()
+            db.refresh(transaction)
         return transaction
 
+    @staticmethod
+    def bulk_insert(db: Session, transactions: list[Transaction], commit: bool = True) -> int:
+        """Insert transactions as one executemany without tracking them in the session (for batch ingestion)."""
+        if not transactions:
+            return 0
+        rows = [{column: getattr(txn, column) for column in _TRANSACTION_INSERT_COLUMNS} for txn in transactions]
+        db.execute(insert(Transaction), rows)
+        if commit:
+            db.commit()
+        return len(rows)
+
+    @staticmethod
+    def insert_rows(db: Session, rows: list[dict], commit: bool = True) -> int:
+        """Insert already-validated column dicts (all with the same keys) as one executemany."""
+        if not rows:
+            return 0
+        db.execute(insert(Transaction), rows)
+        if commit:
+            db.commit()
+        return len(rows)
+
+    @staticmethod
+    def existing_ids(db: Session, transaction_ids: list[str]) -> set[str]:
+        if not transaction_ids:
+            return set()
+        rows = db.query(Transaction.transaction_id).filter(Transaction.transaction_id.in_(transaction_ids)).all()
+        return {transaction_id for (transaction_id,) in rows}
+
+    @staticmethod
+    def list_created_by(db: Session, created_by: str, after_id: str | None, limit: int) -> list[Transaction]:
+        """Transactions written by ``created_by`` in transaction_id order, resuming after ``after_id``."""
+        query = db.query(Transaction).filter(Transaction.created_by == created_by)
+        if after_id is not None:
+            query = query.filter(Transaction.transaction_id > after_id)
+        return query.order_by(Transaction.transaction_id).limit(limit).all()
+
     @staticmethod
     def get_by_id(db: Session, transaction_id: str) -> Transaction | None:
         return (
@@ -49,6 +104,34 @@ class TransactionRepository:
             .all()
         )
 
+    @staticmethod
+    def list_window(db: Session, account_number: str, start: datetime, end: datetime) -> list[Transaction]:
+        return (
+            db.query(Transaction)
+            .filter(
+                Transaction.account_number == account_number,
+                Transaction.transaction_date >= start,
+                Transaction.transaction_date <= end,
+            )
+            .order_by(Transaction.transaction_date)
+            .all()
+        )
+
+    @staticmethod
+    def get_latest_by_type(
+        db: Session, account_number: str, transaction_type: str, before: datetime
+    ) -> Transaction | None:
+        return (
+            db.query(Transaction)
+            .filter(
+                Transaction.account_number == account_number,
+                Transaction.transaction_type == transaction_type,
+                Transaction.transaction_date < before,
+            )
+            .order_by(Transaction.transaction_date.desc())
+            .first()
+        )
+
     @staticmethod
     def count(
         db: Session,
@@ -66,8 +149,9 @@ class TransactionRepository:
         return query.count()
 
     @staticmethod
-    def update(db: Session, transaction: Transaction) -> Transaction:
+    def update(db: Session, transaction: Transaction, commit: bool = True) -> Transaction:
         db.add(transaction)
-        db.commit()
-        db.refresh(transaction)
+        if commit:
+            db.commit()
+            db.refresh(transaction)
         return transaction
@@ -1,4 +1,17 @@
 from app.rules.base_rule import BaseRule, RuleResult
+from app.rules.declarative_rule import DeclarativeRule
+from app.rules.rule_context import RuleContext
+from app.rules.rule_dsl import RuleSpec, load_rule_specs
 from app.rules.rule_engine import RuleEngine
+from app.rules.rule_sql import RuleSetQuery
 
-__all__ = ["BaseRule", "RuleResult", "RuleEngine"]
+__all__ = [
+    "BaseRule",
+    "RuleResult",
+    "RuleContext",
+    "RuleEngine",
+    "DeclarativeRule",
+    "RuleSpec",
+    "RuleSetQuery",
+    "load_rule_specs",
+]
@@ -0,0 +1,184 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Collection, Iterable
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction
+from app.repositories.transaction_repository import TransactionRepository
+from app.utils.datetime_utils import to_naive
+
+# Transaction types rules look up without a lower time bound; the latest one
+# before a window's start is kept as an anchor so those lookups stay in memory.
+ANCHOR_TYPES = ("trade-buy",)
+
+
+class WindowEntry(NamedTuple):
+    """Detached snapshot of the transaction columns rules read from history."""
+
+    transaction_id: str
+    transaction_date: datetime
+    transaction_type: str
+    transaction_amount: float
+
+    @classmethod
+    def of(cls, transaction: Transaction) -> "WindowEntry":
+        return cls(
+            transaction.transaction_id,
+            to_naive(transaction.transaction_date),
+            transaction.transaction_type,
+            transaction.transaction_amount,
+        )
+
+
+class AccountWindow:
+    """In-memory slice of one account's transaction history.
+
+    Holds every transaction dated inside ``[start, end]`` plus, per transaction type,
+    the latest transaction dated before ``start`` (``anchors``), so rules that look back
+    without a time bound (e.g. the prior trade-buy) can still be answered in memory.
+    Entries are snapshots, so commits that expire ORM objects never trigger reloads.
+    """
+
+    def __init__(
+        self,
+        account_number: str,
+        transactions: Iterable[Transaction] = (),
+        anchors: dict[str, Transaction] | None = None,
+    ) -> None:
+        self.account_number = account_number
+        self.anchors: dict[str, WindowEntry] = {
+            t_type: WindowEntry.of(t) for t_type, t in (anchors or {}).items()
+        }
+        self._keys: list[tuple[datetime, int]] = []
+        self._entries: list[WindowEntry] = []
+        self._seq = 0
+        # Entries read by lookups, for per-rule statistics.
+        self.scanned = 0
+        for transaction in transactions:
+            self.add(transaction)
+
+    @classmethod
+    def load(cls, db: Session, account_number: str, start: datetime, end: datetime) -> "AccountWindow":
+        transactions = TransactionRepository.list_window(db, account_number, start, end)
+        anchors = {}
+        for transaction_type in ANCHOR_TYPES:
+            prior = TransactionRepository.get_latest_by_type(db, account_number, transaction_type, before=start)
+            if prior:
+                anchors[transaction_type] = prior
+        return cls(account_number, transactions, anchors)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, transaction_id: str) -> bool:
+        return any(entry.transaction_id == transaction_id for entry in self._entries)
+
+    def add(self, transaction: Transaction) -> None:
+        """Insert a transaction in date order; transactions already present are ignored."""
+        entry = WindowEntry.of(transaction)
+        # A duplicate carries the same date, so only entries at that timestamp are compared.
+        same_date = self._entries[self._lower(entry.transaction_date) : self._upper(entry.transaction_date)]
+        if any(existing.transaction_id == entry.transaction_id for existing in same_date):
+            return
+        # The sequence number keeps insertion order stable for equal timestamps.
+        key = (entry.transaction_date, self._seq)
+        self._seq += 1
+        index = bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._entries.insert(index, entry)
+
+    def count_between(self, start: datetime, end: datetime) -> int:
+        count = self._upper(end) - self._lower(start)
+        self.scanned += count
+        return count
+
+    def latest_between(self, transaction_type: str, start: datetime, end: datetime) -> WindowEntry | None:
+        lower = self._lower(start)
+        for index in range(self._upper(end) - 1, lower - 1, -1):
+            self.scanned += 1
+            if self._entries[index].transaction_type == transaction_type:
+                return self._entries[index]
+        return None
+
+    def latest_before(self, transaction_type: str, end: datetime) -> WindowEntry | None:
+        """Latest transaction of ``transaction_type`` dated at or before ``end``, with no lower bound."""
+        found = self.latest_between(transaction_type, datetime.min, end)
+        anchor = self.anchors.get(transaction_type)
+        if anchor is None or anchor.transaction_date > to_naive(end):
+            return found
+        # A backdated entry can sit below an anchor that is newer than it.
+        return _latest(found, anchor)
+
+    def aggregate(
+        self, func: str, transaction_types: Collection[str] | None, start: datetime, end: datetime
+    ) -> float | int | None:
+        """``count``/``sum``/``min``/``max``/``last`` of amounts dated in ``[start, end]``.
+
+        Only entries of ``transaction_types`` are considered when given. Like SQL, every
+        aggregate but ``count`` is ``None`` over an empty selection.
+        """
+        entries = self._entries[self._lower(start) : self._upper(end)]
+        self.scanned += len(entries)
+        amounts = [
+            entry.transaction_amount
+            for entry in entries
+            if transaction_types is None or entry.transaction_type in transaction_types
+        ]
+        if func == "count":
+            return len(amounts)
+        if not amounts:
+            return None
+        if func == "last":
+            return amounts[-1]
+        return {"sum": sum, "min": min, "max": max}[func](amounts)
+
+    def evict_before(self, cutoff: datetime) -> int:
+        """Drop entries dated before ``cutoff``, keeping the newest evicted one of each anchor type."""
+        index = self._lower(cutoff)
+        for entry in self._entries[:index]:
+            if entry.transaction_type in ANCHOR_TYPES:
+                self.anchors[entry.transaction_type] = _latest(self.anchors.get(entry.transaction_type), entry)
+        del self._entries[:index]
+        del self._keys[:index]
+        return index
+
+    def slice(self, start: datetime, end: datetime) -> "AccountWindow":
+        """Independent copy holding the entries in ``[start, end]`` and the anchors before ``start``.
+
+        Entries are copied with two list slices and no per-entry Python work.
+        """
+        lower, upper = self._lower(start), self._upper(end)
+        window = AccountWindow(self.account_number)
+        for transaction_type in ANCHOR_TYPES:
+            below = next(
+                (self._entries[i] for i in range(lower - 1, -1, -1) if self._entries[i].transaction_type == transaction_type),
+                None,
+            )
+            anchor = _latest(below, self.anchors.get(transaction_type))
+            if anchor is not None:
+                window.anchors[transaction_type] = anchor
+        window._entries = self._entries[lower:upper]
+        window._keys = self._keys[lower:upper]
+        window._seq = self._seq
+        return window
+
+    def same_as(self, other: "AccountWindow") -> bool:
+        """True when both windows hold the same transactions and anchors."""
+        ids = {entry.transaction_id for entry in self._entries}
+        return ids == {entry.transaction_id for entry in other._entries} and {
+            t_type: e.transaction_id for t_type, e in self.anchors.items()
+        } == {t_type: e.transaction_id for t_type, e in other.anchors.items()}
+
+    def _lower(self, start: datetime) -> int:
+        return bisect_left(self._keys, (to_naive(start), -1))
+
+    def _upper(self, end: datetime) -> int:
+        return bisect_left(self._keys, (to_naive(end), self._seq))
+
+
+def _latest(*entries: WindowEntry | None) -> WindowEntry | None:
+    """The most recent of the given entries (ignoring ``None``); the first wins on ties."""
+    found = [entry for entry in entries if entry is not None]
+    return max(found, key=lambda entry: entry.transaction_date) if found else None
@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from datetime import timedelta
 
-from app.models.account import Account
 from app.models.transaction import Transaction
+from app.rules.rule_context import RuleContext
+
+# Alert severities from most to least urgent; the most urgent alert of a transaction is
+# the one its agent run is opened for (ties go to the rule listed first).
+SEVERITY_PRIORITY = {"critical": 0, "high": 1, "medium": 2, "low": 3}
 
 
 @dataclass
@@ -17,8 +22,20 @@ class RuleResult:
 class BaseRule(ABC):
     rule_id: str
     rule_name: str
+    # Transaction types the rule can fire on; ``None`` means every type. ``RuleEngine``
+    # only calls ``evaluate`` for these types, so rules do not re-check the type.
+    applies_to: frozenset[str] | None = None
+    default_severity: str = "high"
+
+    def severity(self) -> str:
+        """Severity of the alerts this rule raises, resolved now (it may follow settings)."""
+        return self.default_severity
+
+    def lookback(self) -> timedelta:
+        """How far before a transaction this rule reads history; used to size preloaded windows."""
+        return timedelta(0)
 
     @abstractmethod
-    def evaluate(self, transaction: Transaction, account: Account, db) -> RuleResult:
-        """Evaluate a transaction and return a RuleResult."""
+    def evaluate(self, transaction: Transaction, context: RuleContext) -> RuleResult:
+        """Evaluate a transaction of an ``applies_to`` type against its preloaded context."""
         raise NotImplementedError
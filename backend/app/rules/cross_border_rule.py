@@ -1,24 +1,24 @@
 from app.config.settings import settings
-from app.models.account import Account
-from app.models.customer import Customer
 from app.models.transaction import Transaction
 from app.rules.base_rule import BaseRule, RuleResult
+from app.rules.rule_context import RuleContext
 
 
 class CrossBorderRule(BaseRule):
     rule_id = "RULE-05"
     rule_name = "Cross-Border Mismatch"
+    applies_to = frozenset({"deposit"})
 
-    def evaluate(self, transaction: Transaction, account: Account, db) -> RuleResult:
-        if transaction.transaction_type != "deposit":
-            return RuleResult(False, settings.CROSS_BORDER_ALERT_SEVERITY, "", self.rule_id, self.rule_name)
+    def severity(self) -> str:
+        return settings.CROSS_BORDER_ALERT_SEVERITY
 
+    def evaluate(self, transaction: Transaction, context: RuleContext) -> RuleResult:
         if not transaction.deposit_source_country:
-            return RuleResult(False, settings.CROSS_BORDER_ALERT_SEVERITY, "", self.rule_id, self.rule_name)
+            return RuleResult(False, self.severity(), "", self.rule_id, self.rule_name)
 
-        customer = db.query(Customer).filter(Customer.customer_id == account.customer_id).first()
+        customer = context.customer
         if not customer:
-            return RuleResult(False, settings.CROSS_BORDER_ALERT_SEVERITY, "", self.rule_id, self.rule_name)
+            return RuleResult(False, self.severity(), "", self.rule_id, self.rule_name)
 
         triggered = transaction.deposit_source_country != customer.residency_country
         description = (
@@ -29,7 +29,7 @@ class CrossBorderRule(BaseRule):
 
         return RuleResult(
             triggered=triggered,
-            severity=settings.CROSS_BORDER_ALERT_SEVERITY,
+            severity=self.severity(),
             description=description,
             rule_id=self.rule_id,
             rule_name=self.rule_name,
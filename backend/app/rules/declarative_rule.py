@@ -0,0 +1,158 @@
+import operator
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+from app.config.settings import settings
+from app.models.transaction import Transaction
+from app.rules.base_rule import BaseRule, RuleResult
+from app.rules.rule_context import RuleContext
+from app.rules.rule_dsl import RuleSpec, resolve_constant, window_seconds
+
+_COMPARE = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class _Scope:
+    """Per-evaluation state: the transaction, its context and memoised ``let`` values."""
+
+    __slots__ = ("transaction", "context", "lets", "values")
+
+    def __init__(self, transaction: Transaction, context: RuleContext, lets: dict[str, Callable]) -> None:
+        self.transaction = transaction
+        self.context = context
+        self.lets = lets
+        self.values: dict[str, Any] = {}
+
+    def ref(self, name: str) -> Any:
+        if name not in self.values:
+            self.values[name] = self.lets[name](self)
+        return self.values[name]
+
+    def source(self, model_name: str) -> Any:
+        if model_name == "transaction":
+            return self.transaction
+        return getattr(self.context, model_name)
+
+
+class DeclarativeRule(BaseRule):
+    """A rule defined by a ``RuleSpec``, compiled once into Python closures.
+
+    History aggregates are answered from ``context.history``, so the rule never queries.
+    """
+
+    def __init__(self, spec: RuleSpec) -> None:
+        self.spec = spec
+        self.rule_id = spec.rule_id
+        self.rule_name = spec.rule_name
+        self.applies_to = frozenset(spec.applies_to) if spec.applies_to is not None else None
+        self._lets = {name: _compile_expr(expr) for name, expr in spec.lets.items()}
+        self._when = _compile_condition(spec.when)
+
+    def severity(self) -> str:
+        return self.spec.resolve_severity()
+
+    def lookback(self) -> timedelta:
+        return self.spec.lookback()
+
+    def evaluate(self, transaction: Transaction, context: RuleContext) -> RuleResult:
+        scope = _Scope(transaction, context, self._lets)
+        triggered = self._when(scope)
+        description = ""
+        if triggered:
+            namespace = {name: getattr(settings, name) for name in self.spec.settings_used}
+            namespace.update({name: scope.ref(name) for name in self._lets})
+            description = self.spec.description.format_map(namespace)
+        return RuleResult(
+            triggered=triggered,
+            severity=self.severity(),
+            description=description,
+            rule_id=self.rule_id,
+            rule_name=self.rule_name,
+        )
+
+
+def _compile_expr(node: dict) -> Callable[[_Scope], Any]:
+    if "const" in node or "setting" in node:
+        # Settings are read per call so threshold changes apply without recompiling.
+        return lambda scope: resolve_constant(node)
+    if "field" in node:
+        model_name, _, column = node["field"].partition(".")
+
+        def read_field(scope: _Scope) -> Any:
+            source = scope.source(model_name)
+            return None if source is None else getattr(source, column)
+
+        return read_field
+    if "ref" in node:
+        name = node["ref"]
+        return lambda scope: scope.ref(name)
+    if "add" in node or "sub" in node:
+        combine = operator.add if "add" in node else operator.sub
+        left, right = (_compile_expr(operand) for operand in node.get("add", node.get("sub")))
+
+        def arithmetic(scope: _Scope) -> Any:
+            a, b = left(scope), right(scope)
+            return None if a is None or b is None else combine(a, b)
+
+        return arithmetic
+    if "abs" in node:
+        inner = _compile_expr(node["abs"])
+
+        def absolute(scope: _Scope) -> Any:
+            value = inner(scope)
+            return None if value is None else abs(value)
+
+        return absolute
+    return _compile_aggregate(node)
+
+
+def _compile_aggregate(node: dict) -> Callable[[_Scope], Any]:
+    func = node["agg"]
+    types = frozenset(node["types"]) if node.get("types") else None
+
+    if node.get("window") is None:
+        # Unbounded ``last`` (validated to anchor types): latest of each type at or before the transaction.
+        def latest(scope: _Scope) -> Any:
+            history, end = scope.context.history, scope.transaction.transaction_date
+            found = [entry for t in types if (entry := history.latest_before(t, end)) is not None]
+            return max(found, key=lambda e: e.transaction_date).transaction_amount if found else None
+
+        return latest
+
+    def windowed(scope: _Scope) -> Any:
+        end = scope.transaction.transaction_date
+        start = end - timedelta(seconds=window_seconds(node))
+        return scope.context.history.aggregate(func, types, start, end)
+
+    return windowed
+
+
+def _compile_condition(node: dict) -> Callable[[_Scope], bool]:
+    if "all" in node:
+        children = [_compile_condition(child) for child in node["all"]]
+        return lambda scope: all(child(scope) for child in children)
+    if "any" in node:
+        children = [_compile_condition(child) for child in node["any"]]
+        return lambda scope: any(child(scope) for child in children)
+    if "not" in node:
+        inner = _compile_condition(node["not"])
+        return lambda scope: not inner(scope)
+    if "exists" in node:
+        value = _compile_expr(node["exists"])
+        return lambda scope: value(scope) is not None
+
+    compare = _COMPARE[node["cmp"]]
+    left, right = _compile_expr(node["left"]), _compile_expr(node["right"])
+
+    def comparison(scope: _Scope) -> bool:
+        a, b = left(scope), right(scope)
+        return a is not None and b is not None and bool(compare(a, b))
+
+    return comparison
@@ -1,15 +1,16 @@
 from app.config.settings import settings
-from app.models.account import Account
 from app.models.transaction import Transaction
 from app.rules.base_rule import BaseRule, RuleResult
+from app.rules.rule_context import RuleContext
 
 
 class HighDepositRule(BaseRule):
     rule_id = "RULE-01"
     rule_name = "High Deposit"
+    applies_to = frozenset({"deposit"})
 
-    def evaluate(self, transaction: Transaction, account: Account, db) -> RuleResult:
-        triggered = transaction.transaction_type == "deposit" and transaction.transaction_amount >= settings.DEPOSIT_THRESHOLD
+    def evaluate(self, transaction: Transaction, context: RuleContext) -> RuleResult:
+        triggered = transaction.transaction_amount >= settings.DEPOSIT_THRESHOLD
         description = (
             f"Deposit amount {transaction.transaction_amount} exceeds threshold {settings.DEPOSIT_THRESHOLD}"
             if triggered
@@ -17,7 +18,7 @@ class HighDepositRule(BaseRule):
         )
         return RuleResult(
             triggered=triggered,
-            severity="high",
+            severity=self.severity(),
             description=description,
             rule_id=self.rule_id,
             rule_name=self.rule_name,
@@ -1,32 +1,19 @@
-from sqlalchemy import desc
-
 from app.config.settings import settings
-from app.models.account import Account
 from app.models.transaction import Transaction
 from app.rules.base_rule import BaseRule, RuleResult
+from app.rules.rule_context import RuleContext
 
 
 class NegligibleProfitRule(BaseRule):
     rule_id = "RULE-02"
     rule_name = "Negligible Profit Trade"
+    applies_to = frozenset({"trade-sell"})
 
-    def evaluate(self, transaction: Transaction, account: Account, db) -> RuleResult:
+    def evaluate(self, transaction: Transaction, context: RuleContext) -> RuleResult:
         triggered = False
         description = ""
 
-        if transaction.transaction_type != "trade-sell":
-            return RuleResult(False, "high", "", self.rule_id, self.rule_name)
-
-        prior_buy = (
-            db.query(Transaction)
-            .filter(
-                Transaction.account_number == transaction.account_number,
-                Transaction.transaction_type == "trade-buy",
-                Transaction.transaction_date <= transaction.transaction_date,
-            )
-            .order_by(desc(Transaction.transaction_date))
-            .first()
-        )
+        prior_buy = context.history.latest_before("trade-buy", transaction.transaction_date)
 
         if prior_buy:
             profit = transaction.transaction_amount - prior_buy.transaction_amount
@@ -38,7 +25,7 @@ class NegligibleProfitRule(BaseRule):
 
         return RuleResult(
             triggered=triggered,
-            severity="high",
+            severity=self.severity(),
             description=description,
             rule_id=self.rule_id,
             rule_name=self.rule_name,
@@ -1,31 +1,23 @@
 from datetime import timedelta
 
 from app.config.settings import settings
-from app.models.account import Account
 from app.models.transaction import Transaction
 from app.rules.base_rule import BaseRule, RuleResult
+from app.rules.rule_context import RuleContext
 
 
 class RapidCycleRule(BaseRule):
     rule_id = "RULE-03"
     rule_name = "Rapid Deposit-Withdrawal"
+    default_severity = "medium"
+    applies_to = frozenset({"withdrawal"})
 
-    def evaluate(self, transaction: Transaction, account: Account, db) -> RuleResult:
-        if transaction.transaction_type != "withdrawal":
-            return RuleResult(False, "medium", "", self.rule_id, self.rule_name)
+    def lookback(self) -> timedelta:
+        return timedelta(hours=settings.RAPID_CYCLE_HOURS)
 
-        window_start = transaction.transaction_date - timedelta(hours=settings.RAPID_CYCLE_HOURS)
-        recent_deposit = (
-            db.query(Transaction)
-            .filter(
-                Transaction.account_number == transaction.account_number,
-                Transaction.transaction_type == "deposit",
-                Transaction.transaction_date >= window_start,
-                Transaction.transaction_date <= transaction.transaction_date,
-            )
-            .order_by(Transaction.transaction_date.desc())
-            .first()
-        )
+    def evaluate(self, transaction: Transaction, context: RuleContext) -> RuleResult:
+        window_start = transaction.transaction_date - self.lookback()
+        recent_deposit = context.history.latest_between("deposit", window_start, transaction.transaction_date)
 
         triggered = recent_deposit is not None
         description = (
@@ -36,7 +28,7 @@ class RapidCycleRule(BaseRule):
 
         return RuleResult(
             triggered=triggered,
-            severity="medium",
+            severity=self.severity(),
             description=description,
             rule_id=self.rule_id,
             rule_name=self.rule_name,
@@ -0,0 +1,124 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.models.account import Account
+from app.models.customer import Customer
+from app.models.high_risk_account import HighRiskAccount
+from app.models.transaction import Transaction
+from app.repositories.customer_repository import CustomerRepository
+from app.repositories.high_risk_account_repository import HighRiskAccountRepository
+from app.rules.account_window import AccountWindow
+from app.rules.sliding_window_store import window_store
+
+
+@dataclass
+class RuleContext:
+    """Account data a transaction is evaluated against, loaded once and shared.
+
+    Rules read it instead of querying, and ``TransactionService`` hands the same
+    object to the agent pipeline so flagged transactions do not re-fetch it.
+    """
+
+    account: Account
+    customer: Customer | None
+    high_risk: HighRiskAccount | None
+    history: AccountWindow
+
+    @classmethod
+    def load(cls, db: Session, transaction: Transaction, account: Account, lookback: timedelta) -> "RuleContext":
+        if settings.RULE_PREFETCH_WORKERS > 1:
+            return cls._load_concurrent(db, transaction, account, lookback)
+        history = cls._load_history(db, transaction, account.account_number, lookback)
+        history.add(transaction)
+        return cls(
+            account=account,
+            customer=CustomerRepository.get_by_id(db, account.customer_id),
+            high_risk=HighRiskAccountRepository.get_by_account(db, account.account_number),
+            history=history,
+        )
+
+    @classmethod
+    def _load_concurrent(
+        cls, db: Session, transaction: Transaction, account: Account, lookback: timedelta
+    ) -> "RuleContext":
+        """Run the history, customer and high-risk reads in parallel, each on its own session.
+
+        Loaded rows are merged into ``db`` without another query so callers (and the
+        agent pipeline) can keep using them like objects loaded on their own session.
+        """
+        pool = _prefetch_pool()
+        account_number = account.account_number
+        history = pool.submit(_in_session, cls._load_history, transaction, account_number, lookback)
+        customer = pool.submit(_in_session, CustomerRepository.get_by_id, account.customer_id)
+        high_risk = pool.submit(_in_session, HighRiskAccountRepository.get_by_account, account_number)
+
+        context = cls(
+            account=account,
+            customer=_merge(db, customer.result()),
+            high_risk=_merge(db, high_risk.result()),
+            history=history.result(),
+        )
+        context.history.add(transaction)
+        return context
+
+    @staticmethod
+    def _load_history(db: Session, transaction: Transaction, account_number: str, lookback: timedelta) -> AccountWindow:
+        start, end = transaction.transaction_date - lookback, transaction.transaction_date
+        history = None
+        if settings.RULE_WINDOW_STORE_ENABLED:
+            history = window_store.snapshot(db, account_number, start, end, lookback)
+        if history is None:
+            history = AccountWindow.load(db, account_number, start, end)
+        return history
+
+    @classmethod
+    def load_many(cls, db: Session, windows: dict[str, tuple[Account, AccountWindow]]) -> dict[str, "RuleContext"]:
+        """Build contexts for several accounts with one customer and one high-risk query."""
+        accounts = [account for account, _ in windows.values()]
+        customers = {
+            customer.customer_id: customer
+            for customer in CustomerRepository.list_by_ids(db, list({a.customer_id for a in accounts}))
+        }
+        high_risks: dict[str, HighRiskAccount] = {}
+        for record in HighRiskAccountRepository.list_by_accounts(db, list(windows)):
+            high_risks.setdefault(record.account_number, record)
+
+        return {
+            account_number: cls(
+                account=account,
+                customer=customers.get(account.customer_id),
+                high_risk=high_risks.get(account_number),
+                history=history,
+            )
+            for account_number, (account, history) in windows.items()
+        }
+
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _prefetch_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.RULE_PREFETCH_WORKERS, thread_name_prefix="rule-prefetch")
+        return _pool
+
+
+def _in_session(func, *args):
+    session = SessionLocal()
+    try:
+        return func(session, *args)
+    finally:
+        session.close()
+
+
+def _merge(db: Session, instance):
+    return db.merge(instance, load=False) if instance is not None else None
@@ -0,0 +1,281 @@
+"""Declarative rule definitions.
+
+A rule is a JSON (or, when PyYAML is installed, YAML) object::
+
+    {
+      "rule_id": "RULE-04",
+      "rule_name": "Transaction Velocity",
+      "severity": "medium",                     # or {"setting": "CROSS_BORDER_ALERT_SEVERITY"}
+      "applies_to": ["deposit"],                # optional transaction-type filter
+      "let": {"txn_count": {"agg": "count", "window": {"minutes": {"setting": "VELOCITY_WINDOW_MINUTES"}}}},
+      "when": {"cmp": ">=", "left": {"ref": "txn_count"}, "right": {"setting": "VELOCITY_TXN_COUNT"}},
+      "description": "{txn_count} transactions within {VELOCITY_WINDOW_MINUTES} minutes"
+    }
+
+Expressions: ``const``, ``setting`` (threshold settings only), ``field``
+(``transaction.*``, ``account.*``, ``customer.*``, ``high_risk.*`` columns), ``ref`` (a
+``let`` name), ``add`` / ``sub`` (two operands), ``abs`` and ``agg``. An aggregate is
+``count``, ``sum``, ``min``, ``max`` or ``last`` of the account's transaction amounts
+dated in ``[transaction_date - window, transaction_date]`` (the evaluated transaction
+included), optionally restricted to ``types``; only ``last`` may omit the window.
+Conditions: ``all`` / ``any`` (lists), ``not``, ``exists`` (value is not null) and
+``cmp`` (``== != > >= < <=``); a comparison with a null operand is false.
+
+Specs compile to Python predicates (``DeclarativeRule``) and to a single SQL statement
+(``RuleSetQuery``); this module only parses and validates them.
+"""
+
+import json
+import string
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from app.config.settings import settings
+from app.exceptions.base_exception import ValidationException
+from app.exceptions.error_codes import RULE_DEFINITION_INVALID
+from app.models.account import Account
+from app.models.customer import Customer
+from app.models.high_risk_account import HighRiskAccount
+from app.models.transaction import Transaction
+from app.rules.account_window import ANCHOR_TYPES
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - YAML definitions are optional
+    yaml = None
+
+BUILTIN_DEFINITIONS_PATH = Path(__file__).parent / "definitions"
+
+# Settings a definition may read; anything else (credentials, URLs) stays out of reach.
+RULE_SETTINGS = (
+    "DEPOSIT_THRESHOLD",
+    "NEGLIGIBLE_PROFIT_THRESHOLD",
+    "RAPID_CYCLE_HOURS",
+    "VELOCITY_TXN_COUNT",
+    "VELOCITY_WINDOW_MINUTES",
+    "CROSS_BORDER_ALERT_SEVERITY",
+)
+SOURCE_MODELS = {
+    "transaction": Transaction,
+    "account": Account,
+    "customer": Customer,
+    "high_risk": HighRiskAccount,
+}
+AGGREGATES = ("count", "sum", "min", "max", "last")
+COMPARISONS = ("==", "!=", ">", ">=", "<", "<=")
+WINDOW_UNITS = {"minutes": 60, "hours": 3600, "days": 86400}
+TRANSACTION_TYPES = ("deposit", "withdrawal", "trade-buy", "trade-sell")
+
+
+@dataclass
+class RuleSpec:
+    rule_id: str
+    rule_name: str
+    severity: Any  # str, or {"setting": NAME}
+    when: dict
+    description: str = ""
+    applies_to: tuple[str, ...] | None = None
+    lets: dict[str, dict] = field(default_factory=dict)
+    settings_used: tuple[str, ...] = ()
+    source: str = ""
+
+    def resolve_severity(self) -> str:
+        return resolve_constant(self.severity)
+
+    def aggregates(self) -> list[dict]:
+        """Every ``agg`` node in the rule, in definition order."""
+        found: list[dict] = []
+        for node in [*self.lets.values(), self.when]:
+            _walk(node, lambda n: found.append(n) if "agg" in n else None)
+        return found
+
+    def lookback(self) -> timedelta:
+        windows = [window_seconds(node) for node in self.aggregates()]
+        return timedelta(seconds=max((w for w in windows if w is not None), default=0))
+
+
+def resolve_constant(node: Any) -> Any:
+    """Value of a ``const`` / ``setting`` node (or a bare literal)."""
+    if isinstance(node, dict):
+        if "setting" in node:
+            return getattr(settings, node["setting"])
+        return node["const"]
+    return node
+
+
+def window_seconds(node: dict) -> float | None:
+    """Length of an aggregate's window in seconds, or ``None`` when it is unbounded."""
+    window = node.get("window")
+    if window is None:
+        return None
+    (unit, amount), = window.items()
+    return float(resolve_constant(amount)) * WINDOW_UNITS[unit]
+
+
+def parse_rule_spec(data: dict, source: str = "") -> RuleSpec:
+    """Validate a rule definition and return it as a ``RuleSpec``."""
+    where = f"{source}: " if source else ""
+
+    def fail(message: str) -> None:
+        raise ValidationException(RULE_DEFINITION_INVALID, f"{where}{message}")
+
+    if not isinstance(data, dict):
+        fail("rule definition must be an object")
+    for key in ("rule_id", "rule_name", "when"):
+        if key not in data:
+            fail(f"missing '{key}'")
+    unknown = set(data) - {"rule_id", "rule_name", "severity", "applies_to", "let", "when", "description"}
+    if unknown:
+        fail(f"unknown keys {sorted(unknown)}")
+
+    used: list[str] = []
+    lets = data.get("let") or {}
+    if not isinstance(lets, dict) or not all(isinstance(n, str) and n.isidentifier() for n in lets):
+        fail("'let' must map identifiers to expressions")
+
+    def check_constant(node: Any, what: str) -> None:
+        if isinstance(node, dict):
+            if set(node) == {"setting"}:
+                if node["setting"] not in RULE_SETTINGS:
+                    fail(f"{what}: setting '{node['setting']}' is not available to rules")
+                used.append(node["setting"])
+                return
+            if set(node) == {"const"}:
+                return
+            fail(f"{what}: expected a const or setting")
+
+    def check_expr(node: Any, defined: set[str]) -> None:
+        if not isinstance(node, dict) or not (
+            len(node) == 1 or ("agg" in node and node.keys() <= {"agg", "types", "window"})
+        ):
+            fail(f"invalid expression {node!r}")
+        if "const" in node or "setting" in node:
+            check_constant(node, "expression")
+        elif "field" in node:
+            model_name, _, column = str(node["field"]).partition(".")
+            model = SOURCE_MODELS.get(model_name)
+            if model is None or column not in model.__table__.columns:
+                fail(f"unknown field '{node['field']}'")
+        elif "ref" in node:
+            if node["ref"] not in defined:
+                fail(f"'{node['ref']}' is not defined before use")
+        elif "add" in node or "sub" in node:
+            operands = node.get("add", node.get("sub"))
+            if not isinstance(operands, list) or len(operands) != 2:
+                fail("add/sub take exactly two operands")
+            for operand in operands:
+                check_expr(operand, defined)
+        elif "abs" in node:
+            check_expr(node["abs"], defined)
+        elif "agg" in node:
+            if node["agg"] not in AGGREGATES:
+                fail(f"unknown aggregate '{node['agg']}'")
+            types = node.get("types")
+            if types is not None and (not isinstance(types, list) or set(types) - set(TRANSACTION_TYPES)):
+                fail(f"aggregate types must be a list of {list(TRANSACTION_TYPES)}")
+            window = node.get("window")
+            if window is None:
+                # Unbounded lookups are served from the window's per-type anchors.
+                if node["agg"] != "last" or not types or set(types) - set(ANCHOR_TYPES):
+                    fail(f"only 'last' over {list(ANCHOR_TYPES)} may omit the window")
+            elif not isinstance(window, dict) or len(window) != 1 or next(iter(window)) not in WINDOW_UNITS:
+                fail(f"window must be one of {list(WINDOW_UNITS)}")
+            else:
+                check_constant(next(iter(window.values())), "window")
+        else:
+            fail(f"invalid expression {node!r}")
+
+    def check_condition(node: Any, defined: set[str]) -> None:
+        if not isinstance(node, dict):
+            fail(f"invalid condition {node!r}")
+        if "all" in node or "any" in node:
+            children = node.get("all", node.get("any"))
+            if len(node) != 1 or not isinstance(children, list) or not children:
+                fail("all/any take a non-empty list of conditions")
+            for child in children:
+                check_condition(child, defined)
+        elif "not" in node and len(node) == 1:
+            check_condition(node["not"], defined)
+        elif "exists" in node and len(node) == 1:
+            check_expr(node["exists"], defined)
+        elif "cmp" in node and set(node) == {"cmp", "left", "right"}:
+            if node["cmp"] not in COMPARISONS:
+                fail(f"unknown comparison '{node['cmp']}'")
+            check_expr(node["left"], defined)
+            check_expr(node["right"], defined)
+        else:
+            fail(f"invalid condition {node!r}")
+
+    defined: set[str] = set()
+    for name, expr in lets.items():
+        check_expr(expr, defined)
+        defined.add(name)
+    check_condition(data["when"], defined)
+
+    severity = data.get("severity", "high")
+    if not isinstance(severity, str):
+        check_constant(severity, "severity")
+
+    applies_to = data.get("applies_to")
+    if applies_to is not None:
+        if not isinstance(applies_to, list) or set(applies_to) - set(TRANSACTION_TYPES):
+            fail(f"applies_to must be a list of {list(TRANSACTION_TYPES)}")
+        applies_to = tuple(applies_to)
+
+    description = data.get("description", "")
+    for _, name, _, _ in string.Formatter().parse(description):
+        if name is not None and name not in defined and name not in used:
+            fail(f"description placeholder '{{{name}}}' must name a let or a setting used by the rule")
+
+    return RuleSpec(
+        rule_id=data["rule_id"],
+        rule_name=data["rule_name"],
+        severity=severity,
+        when=data["when"],
+        description=description,
+        applies_to=applies_to,
+        lets=dict(lets),
+        settings_used=tuple(dict.fromkeys(used)),
+        source=source,
+    )
+
+
+def load_rule_specs(path: str | Path) -> list[RuleSpec]:
+    """Parse every definition file in a directory (or a single file), ordered by file name.
+
+    A file holds one rule object, a list of them, or ``{"rules": [...]}``.
+    """
+    path = Path(path)
+    suffixes = {".json"} | ({".yaml", ".yml"} if yaml is not None else set())
+    files = sorted(p for p in path.iterdir() if p.suffix in suffixes) if path.is_dir() else [path]
+
+    specs: list[RuleSpec] = []
+    for file in files:
+        text = file.read_text(encoding="utf-8")
+        try:
+            data = yaml.safe_load(text) if file.suffix in (".yaml", ".yml") else json.loads(text)
+        except Exception as exc:
+            raise ValidationException(RULE_DEFINITION_INVALID, f"{file.name}: {exc}") from exc
+        if isinstance(data, dict) and "rules" in data:
+            data = data["rules"]
+        for item in data if isinstance(data, list) else [data]:
+            specs.append(parse_rule_spec(item, source=file.name))
+
+    seen: set[str] = set()
+    for spec in specs:
+        if spec.rule_id in seen:
+            raise ValidationException(RULE_DEFINITION_INVALID, f"{spec.source}: duplicate rule_id '{spec.rule_id}'")
+        seen.add(spec.rule_id)
+    return specs
+
+
+def _walk(node: Any, visit) -> None:
+    if isinstance(node, dict):
+        visit(node)
+        for value in node.values():
+            _walk(value, visit)
+    elif isinstance(node, list):
+        for value in node:
+            _walk(value, visit)
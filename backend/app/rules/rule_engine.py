@@ -1,26 +1,38 @@
 import time
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import timedelta
 
 from loguru import logger
 from sqlalchemy.orm import Session
 
+from app.config.settings import settings
+from app.exceptions.base_exception import NotFoundException
+from app.exceptions.error_codes import ACCOUNT_NOT_FOUND
 from app.models.account import Account
 from app.models.alert import Alert
 from app.models.transaction import Transaction
+from app.repositories.account_repository import AccountRepository
 from app.repositories.alert_repository import AlertRepository
-from app.rules.base_rule import RuleResult
+from app.rules.account_window import AccountWindow
+from app.rules.base_rule import BaseRule, RuleResult
 from app.rules.cross_border_rule import CrossBorderRule
+from app.rules.declarative_rule import DeclarativeRule
 from app.rules.high_deposit_rule import HighDepositRule
 from app.rules.high_risk_account_rule import HighRiskAccountRule
 from app.rules.negligible_profit_rule import NegligibleProfitRule
 from app.rules.rapid_cycle_rule import RapidCycleRule
+from app.rules.rule_context import RuleContext
+from app.rules.rule_dsl import RuleSpec, load_rule_specs
+from app.rules.rule_stats import rule_stats
 from app.rules.velocity_rule import VelocityRule
-from app.utils.datetime_utils import utc_now
+from app.utils.datetime_utils import to_naive, utc_now
 from app.utils.id_generator import generate_id
 
 
 class RuleEngine:
     def __init__(self) -> None:
-        self.rules = [
+        self.rules: list[BaseRule] = [
             HighDepositRule(),
             NegligibleProfitRule(),
             RapidCycleRule(),
@@ -28,27 +40,182 @@ class RuleEngine:
             CrossBorderRule(),
             HighRiskAccountRule(),
         ]
+        if settings.RULE_DEFINITIONS_PATH:
+            self._add_declarative_rules(load_rule_specs(settings.RULE_DEFINITIONS_PATH))
+        self._build_dispatch()
+        self._evaluations = 0
 
-    def evaluate_transaction(self, db: Session, transaction: Transaction, account: Account) -> list[Alert]:
-        alerts: list[Alert] = []
-        for rule in self.rules:
+    def _add_declarative_rules(self, specs: Sequence[RuleSpec]) -> None:
+        positions = {rule.rule_id: index for index, rule in enumerate(self.rules)}
+        for spec in specs:
+            rule = DeclarativeRule(spec)
+            if spec.rule_id in positions:
+                self.rules[positions[spec.rule_id]] = rule
+            else:
+                self.rules.append(rule)
+        logger.info(f"[TRACE] RuleEngine | declarative rules loaded | count={len(specs)}")
+
+    def lookback(self) -> timedelta:
+        """Longest history any rule reads before a transaction."""
+        return max(rule.lookback() for rule in self.rules)
+
+    def load_context(self, db: Session, transaction: Transaction, account: Account) -> RuleContext:
+        return RuleContext.load(db, transaction, account, self.lookback())
+
+    def evaluate_transaction(
+        self,
+        db: Session,
+        transaction: Transaction,
+        account: Account,
+        context: RuleContext | None = None,
+        commit: bool = True,
+    ) -> list[Alert]:
+        if context is None:
+            context = self.load_context(db, transaction, account)
+        return AlertRepository.create_many(db, self._evaluate_rules(transaction, context), commit=commit)
+
+    def evaluate_batch(
+        self, db: Session, transactions: Sequence[Transaction], commit: bool = True
+    ) -> dict[str, list[Alert]]:
+        """Evaluate many transactions, loading each account's history window once.
+
+        Transactions are grouped by account and replayed in date order against an
+        in-memory ``AccountWindow``; customers and high-risk records for all accounts
+        are fetched with one query each. Transactions not yet in the database are added to
+        the window as they are evaluated, so results match evaluating them one by one
+        with ``evaluate_transaction``. Returns the alerts raised, keyed by transaction_id;
+        they are written with a single bulk insert and are not attached to the session.
+        """
+        t0 = time.perf_counter()
+        contexts = self.load_batch_contexts(db, transactions)
+
+        results: dict[str, list[Alert]] = {}
+        for transaction in sorted(transactions, key=lambda t: (t.account_number, to_naive(t.transaction_date))):
+            results[transaction.transaction_id] = self.evaluate(transaction, contexts[transaction.account_number])
+        AlertRepository.bulk_insert(db, [alert for alerts in results.values() for alert in alerts], commit=commit)
+
+        elapsed = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info(
+            f"[TRACE] RuleEngine | evaluate_batch END | txns={len(transactions)} accounts={len(contexts)} "
+            f"alerts={sum(len(a) for a in results.values())} | {elapsed}ms"
+        )
+        return results
+
+    def load_batch_contexts(
+        self,
+        db: Session,
+        transactions: Sequence[Transaction],
+        accounts: dict[str, Account] | None = None,
+    ) -> dict[str, RuleContext]:
+        """One ``RuleContext`` per account, with a window covering all of its transactions.
+
+        Accounts are fetched with one ``IN`` query unless passed in. The transactions are
+        not added to the windows; ``evaluate`` does that as each one is replayed, in date order.
+        """
+        by_account: dict[str, list[Transaction]] = defaultdict(list)
+        for transaction in transactions:
+            by_account[transaction.account_number].append(transaction)
+        if accounts is None:
+            accounts = {
+                account.account_number: account
+                for account in AccountRepository.list_by_numbers(db, list(by_account))
+            }
+        lookback = self.lookback()
+
+        windows: dict[str, tuple[Account, AccountWindow]] = {}
+        for account_number, account_txns in by_account.items():
+            account = accounts.get(account_number)
+            if not account:
+                raise NotFoundException(ACCOUNT_NOT_FOUND, f"Account {account_number} not found")
+
+            dates = [t.transaction_date for t in account_txns]
+            windows[account_number] = (
+                account,
+                AccountWindow.load(
+                    db,
+                    account_number,
+                    start=min(dates, key=to_naive) - lookback,
+                    end=max(dates, key=to_naive),
+                ),
+            )
+        return RuleContext.load_many(db, windows)
+
+    def evaluate(self, transaction: Transaction, context: RuleContext) -> list[Alert]:
+        """Add a transaction to its context's window and return its (unsaved) alerts.
+
+        Call in date order per account when replaying a batch against shared contexts.
+        """
+        context.history.add(transaction)
+        return self._evaluate_rules(transaction, context)
+
+    @staticmethod
+    def _cost_key(item: tuple[int, BaseRule]) -> tuple[bool, float]:
+        """Type-gated rules first, then cheapest by observed mean latency."""
+        rule = item[1]
+        return rule.applies_to is None, rule_stats.mean_ms(rule.rule_id)
+
+    def _build_dispatch(self) -> None:
+        """Precompute, per transaction type, the rules that can fire on it in execution order.
+
+        Rules outside a type's list are never called for it, so they need no type guard of
+        their own. Types no rule names fall back to the rules that apply to every type.
+        Tables are rebuilt rather than mutated, so concurrent evaluations keep a consistent view.
+        """
+        ordered = sorted(enumerate(self.rules), key=self._cost_key)
+        types = {t for rule in self.rules if rule.applies_to is not None for t in rule.applies_to}
+        self._dispatch = {
+            t: [item for item in ordered if item[1].applies_to is None or t in item[1].applies_to] for t in types
+        }
+        self._dispatch_default = [item for item in ordered if item[1].applies_to is None]
+        self._skipped = {
+            t: [rule for rule in self.rules if rule.applies_to is not None and t not in rule.applies_to]
+            for t in types
+        }
+        self._skipped_default = [rule for rule in self.rules if rule.applies_to is not None]
+
+    def _rules_for(self, transaction_type: str) -> list[tuple[int, BaseRule]]:
+        """Rules (with their canonical index) to run for a type; the table is re-sorted periodically from live stats."""
+        self._evaluations += 1
+        if self._evaluations % settings.RULE_ORDER_REFRESH_CALLS == 0:
+            self._build_dispatch()
+        rule_stats.record_skips(self._skipped.get(transaction_type, self._skipped_default))
+        return self._dispatch.get(transaction_type, self._dispatch_default)
+
+    def _evaluate_rules(self, transaction: Transaction, context: RuleContext) -> list[Alert]:
+        """Run the applicable rules and build (unsaved) alerts for those that triggered."""
+        triggered: list[tuple[int, RuleResult]] = []
+        for index, rule in self._rules_for(transaction.transaction_type):
             rule_name = type(rule).__name__
+            scanned = context.history.scanned
             t_rule = time.perf_counter()
-            result: RuleResult = rule.evaluate(transaction, account, db)
-            elapsed = round((time.perf_counter() - t_rule) * 1000, 2)
+            result: RuleResult = rule.evaluate(transaction, context)
+            elapsed_ms = (time.perf_counter() - t_rule) * 1000
+            elapsed = round(elapsed_ms, 2)
+            rule_stats.record(
+                rule.rule_id, rule.rule_name, elapsed_ms, result.triggered, context.history.scanned - scanned
+            )
             if result.triggered:
                 logger.info(f"[TRACE] RuleEngine | {rule_name} TRIGGERED | severity={result.severity} | {elapsed}ms")
-                alert = Alert(
-                    alert_id=generate_id("ALERT"),
-                    account_number=transaction.account_number,
-                    transaction_id=transaction.transaction_id,
-                    alert_type=result.rule_name,
-                    severity=result.severity,
-                    rule_id=result.rule_id,
-                    description=result.description,
-                    triggered_date=utc_now(),
-                )
-                alerts.append(AlertRepository.create(db, alert))
+                triggered.append((index, result))
             else:
                 logger.debug(f"[TRACE] RuleEngine | {rule_name} not triggered | {elapsed}ms")
+
+        # Alerts keep the canonical rule order whatever order the rules ran in.
+        alerts: list[Alert] = []
+        for _, result in sorted(triggered, key=lambda item: item[0]):
+            alert = Alert(
+                alert_id=generate_id("ALERT"),
+                account_number=transaction.account_number,
+                transaction_id=transaction.transaction_id,
+                alert_type=result.rule_name,
+                severity=result.severity,
+                rule_id=result.rule_id,
+                description=result.description,
+                triggered_date=utc_now(),
+            )
+            alerts.append(alert)
         return alerts
+
+
+# Shared engine; rules hold no per-transaction state, so one instance serves every request.
+rule_engine = RuleEngine()
@@ -0,0 +1,243 @@
+import operator
+import time
+from collections.abc import Sequence
+from datetime import datetime
+
+from loguru import logger
+from sqlalchemy import DateTime, Select, and_, case, false, func, literal, not_, or_, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models.account import Account
+from app.models.customer import Customer
+from app.models.high_risk_account import HighRiskAccount
+from app.models.transaction import Transaction
+from app.rules.rule_dsl import RuleSpec, resolve_constant, window_seconds
+from app.utils.datetime_utils import to_naive
+
+_COMPARE = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+_AGGREGATE = {"count": func.count, "sum": func.sum, "min": func.min, "max": func.max}
+
+
+class shifted(FunctionElement):  # noqa: N801 - SQL function construct
+    """``date + seconds`` for a DateTime column, rendered per dialect."""
+
+    type = DateTime()
+    name = "shifted"
+    inherit_cache = True
+
+
+@compiles(shifted)
+def _compile_shifted(element, compiler, **kw):
+    date, seconds = list(element.clauses)
+    return f"({compiler.process(date, **kw)} + {compiler.process(seconds, **kw)} * INTERVAL '1 second')"
+
+
+@compiles(shifted, "sqlite")
+def _compile_shifted_sqlite(element, compiler, **kw):
+    # SQLite stores DateTime as ISO text; strftime keeps millisecond precision so the
+    # result still compares correctly against stored values.
+    date, seconds = list(element.clauses)
+    return (
+        f"strftime('%Y-%m-%d %H:%M:%f', {compiler.process(date, **kw)}, "
+        f"{compiler.process(seconds, **kw)} || ' seconds')"
+    )
+
+
+class RuleSetQuery:
+    """Compiles rule specs into one SELECT that flags every transaction in a date range.
+
+    Aggregates over the same window length share a single self-join on ``transactions``,
+    computed with conditional aggregation, so N history rules over one window cost one
+    join rather than N queries. ``last`` lookups become correlated subqueries, shared
+    between rules that ask for the same one. Windows follow the Python predicates
+    (inclusive at both ends), with millisecond precision on SQLite.
+    """
+
+    def __init__(self, specs: Sequence[RuleSpec]) -> None:
+        self.specs = list(specs)
+
+    def statement(self, start: datetime | None = None, end: datetime | None = None) -> Select:
+        return _StatementBuilder(self.specs, start, end).build()
+
+    def evaluate(
+        self, db: Session, start: datetime | None = None, end: datetime | None = None
+    ) -> dict[str, list[str]]:
+        """Rule ids triggered per transaction_id, for flagged transactions dated in ``[start, end]``."""
+        t0 = time.perf_counter()
+        rule_ids = [spec.rule_id for spec in self.specs]
+        flagged: dict[str, list[str]] = {}
+        for row in db.execute(self.statement(start, end)):
+            flagged[row[0]] = [rule_id for rule_id, hit in zip(rule_ids, row[1:], strict=True) if hit]
+        elapsed = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info(f"[TRACE] RuleSetQuery | evaluate END | rules={len(rule_ids)} flagged={len(flagged)} | {elapsed}ms")
+        return flagged
+
+
+class _StatementBuilder:
+    def __init__(self, specs: list[RuleSpec], start: datetime | None, end: datetime | None) -> None:
+        self.specs = specs
+        self.start = to_naive(start) if start is not None else None
+        self.end = to_naive(end) if end is not None else None
+        self.t = aliased(Transaction, name="t")
+        self.sources = {
+            "transaction": self.t,
+            "account": aliased(Account, name="a"),
+            "customer": aliased(Customer, name="c"),
+            "high_risk": aliased(HighRiskAccount, name="h"),
+        }
+        self.used_sources: set[str] = set()
+        self.aggregates: dict[tuple, ColumnElement] = {}
+        self.window_joins: list = []
+
+    def build(self) -> Select:
+        self._prepare_aggregates()
+        t = self.t
+        conditions = []
+        for spec in self.specs:
+            lets: dict[str, ColumnElement] = {}
+            for name, expr in spec.lets.items():
+                lets[name] = self._expr(expr, lets)
+            condition = self._condition(spec.when, lets)
+            if spec.applies_to is not None:
+                condition = and_(t.transaction_type.in_(spec.applies_to), condition)
+            conditions.append((spec.rule_id, condition))
+
+        stmt = select(
+            t.transaction_id,
+            *(case((condition, 1), else_=0).label(rule_id) for rule_id, condition in conditions),
+        ).select_from(t)
+
+        account, customer, high_risk = (self.sources[n] for n in ("account", "customer", "high_risk"))
+        if self.used_sources & {"account", "customer"}:
+            stmt = stmt.outerjoin(account, account.account_number == t.account_number)
+        if "customer" in self.used_sources:
+            stmt = stmt.outerjoin(customer, customer.customer_id == account.customer_id)
+        if "high_risk" in self.used_sources:
+            # One record per account, the oldest, as ``RuleContext.load_many`` picks.
+            first_id = (
+                select(func.min(HighRiskAccount.id))
+                .where(HighRiskAccount.account_number == t.account_number)
+                .correlate(t)
+                .scalar_subquery()
+            )
+            stmt = stmt.outerjoin(high_risk, high_risk.id == first_id)
+        for window in self.window_joins:
+            stmt = stmt.outerjoin(window, window.c.transaction_id == t.transaction_id)
+
+        return stmt.where(*self._scope(t), or_(*(condition for _, condition in conditions))).order_by(
+            t.account_number, t.transaction_date
+        )
+
+    def _scope(self, transaction) -> list[ColumnElement]:
+        bounds = []
+        if self.start is not None:
+            bounds.append(transaction.transaction_date >= self.start)
+        if self.end is not None:
+            bounds.append(transaction.transaction_date <= self.end)
+        return bounds
+
+    def _prepare_aggregates(self) -> None:
+        """Build one grouped self-join per window length and a subquery per ``last`` lookup."""
+        by_window: dict[float, list[tuple]] = {}
+        for spec in self.specs:
+            for node in spec.aggregates():
+                key = _aggregate_key(node)
+                if key in self.aggregates or (key[0] != "last" and key in by_window.get(key[2], [])):
+                    continue
+                if key[0] == "last":
+                    self.aggregates[key] = self._last(key)
+                else:
+                    by_window.setdefault(key[2], []).append(key)
+
+        for index, (seconds, keys) in enumerate(by_window.items()):
+            scope, history = aliased(Transaction, name=f"ws{index}"), aliased(Transaction, name=f"wh{index}")
+            columns = []
+            for position, (agg, types, _) in enumerate(keys):
+                value = history.transaction_id if agg == "count" else history.transaction_amount
+                if types is not None:
+                    value = case((history.transaction_type.in_(sorted(types)), value))
+                columns.append(_AGGREGATE[agg](value).label(f"agg{position}"))
+            window = (
+                select(scope.transaction_id.label("transaction_id"), *columns)
+                .join(
+                    history,
+                    and_(
+                        history.account_number == scope.account_number,
+                        history.transaction_date <= scope.transaction_date,
+                        history.transaction_date >= shifted(scope.transaction_date, literal(-seconds)),
+                    ),
+                )
+                .where(*self._scope(scope))
+                .group_by(scope.transaction_id)
+                .subquery(f"win{index}")
+            )
+            self.window_joins.append(window)
+            for position, key in enumerate(keys):
+                self.aggregates[key] = window.c[f"agg{position}"]
+
+    def _last(self, key: tuple) -> ColumnElement:
+        _, types, seconds = key
+        t, history = self.t, aliased(Transaction, name=f"lh{len(self.aggregates)}")
+        conditions = [
+            history.account_number == t.account_number,
+            history.transaction_date <= t.transaction_date,
+        ]
+        if types is not None:
+            conditions.append(history.transaction_type.in_(sorted(types)))
+        if seconds is not None:
+            conditions.append(history.transaction_date >= shifted(t.transaction_date, literal(-seconds)))
+        return (
+            select(history.transaction_amount)
+            .where(*conditions)
+            .order_by(history.transaction_date.desc())
+            .limit(1)
+            .correlate(t)
+            .scalar_subquery()
+        )
+
+    def _expr(self, node: dict, lets: dict[str, ColumnElement]) -> ColumnElement:
+        if "const" in node or "setting" in node:
+            return literal(resolve_constant(node))
+        if "field" in node:
+            model_name, _, column = node["field"].partition(".")
+            self.used_sources.add(model_name)
+            return getattr(self.sources[model_name], column)
+        if "ref" in node:
+            return lets[node["ref"]]
+        if "add" in node:
+            left, right = (self._expr(operand, lets) for operand in node["add"])
+            return left + right
+        if "sub" in node:
+            left, right = (self._expr(operand, lets) for operand in node["sub"])
+            return left - right
+        if "abs" in node:
+            return func.abs(self._expr(node["abs"], lets))
+        return self.aggregates[_aggregate_key(node)]
+
+    def _condition(self, node: dict, lets: dict[str, ColumnElement]) -> ColumnElement:
+        if "all" in node:
+            return and_(*(self._condition(child, lets) for child in node["all"]))
+        if "any" in node:
+            return or_(*(self._condition(child, lets) for child in node["any"]))
+        if "not" in node:
+            return not_(self._condition(node["not"], lets))
+        if "exists" in node:
+            return self._expr(node["exists"], lets).is_not(None)
+        # Collapse NULL to false so ``not`` behaves like the Python predicate.
+        comparison = _COMPARE[node["cmp"]](self._expr(node["left"], lets), self._expr(node["right"], lets))
+        return func.coalesce(comparison, false())
+
+
+def _aggregate_key(node: dict) -> tuple:
+    types = frozenset(node["types"]) if node.get("types") else None
+    return node["agg"], types, window_seconds(node)
@@ -0,0 +1,96 @@
+import threading
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from app.config.settings import settings
+
+
+@dataclass
+class RuleStats:
+    rule_id: str
+    rule_name: str
+    calls: int = 0
+    skipped: int = 0
+    triggered: int = 0
+    rows_scanned: int = 0
+    total_ms: float = 0.0
+    samples: deque = field(default_factory=deque, repr=False)
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Latency percentile (nearest rank) over the most recent samples."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def as_dict(self) -> dict:
+        return {
+            "rule_id": self.rule_id,
+            "rule_name": self.rule_name,
+            "calls": self.calls,
+            "skipped": self.skipped,
+            "triggered": self.triggered,
+            "trigger_rate": round(self.triggered / self.calls, 4) if self.calls else 0.0,
+            "rows_scanned": self.rows_scanned,
+            "avg_rows_scanned": round(self.rows_scanned / self.calls, 2) if self.calls else 0.0,
+            "mean_ms": round(self.mean_ms, 4),
+            "p50_ms": round(self.percentile(50), 4),
+            "p95_ms": round(self.percentile(95), 4),
+            "p99_ms": round(self.percentile(99), 4),
+        }
+
+
+class RuleStatsRegistry:
+    """Process-wide runtime statistics per rule, fed by ``RuleEngine``.
+
+    Latency percentiles are computed over the last ``RULE_STATS_SAMPLE_SIZE`` calls of
+    each rule; counters cover the lifetime of the process (or since ``reset``).
+    """
+
+    def __init__(self, sample_size: int | None = None) -> None:
+        self.sample_size = sample_size or settings.RULE_STATS_SAMPLE_SIZE
+        self._stats: dict[str, RuleStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, rule_id: str, rule_name: str, elapsed_ms: float, triggered: bool, rows_scanned: int) -> None:
+        with self._lock:
+            stats = self._get(rule_id, rule_name)
+            stats.calls += 1
+            stats.triggered += int(triggered)
+            stats.rows_scanned += rows_scanned
+            stats.total_ms += elapsed_ms
+            stats.samples.append(elapsed_ms)
+
+    def record_skips(self, rules: Sequence) -> None:
+        """Count rules the dispatch table did not run (objects with ``rule_id`` / ``rule_name``)."""
+        if not rules:
+            return
+        with self._lock:
+            for rule in rules:
+                self._get(rule.rule_id, rule.rule_name).skipped += 1
+
+    def mean_ms(self, rule_id: str) -> float:
+        stats = self._stats.get(rule_id)
+        return stats.mean_ms if stats else 0.0
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return [stats.as_dict() for stats in self._stats.values()]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def _get(self, rule_id: str, rule_name: str) -> RuleStats:
+        stats = self._stats.get(rule_id)
+        if stats is None:
+            stats = self._stats[rule_id] = RuleStats(rule_id, rule_name, samples=deque(maxlen=self.sample_size))
+        return stats
+
+
+rule_stats = RuleStatsRegistry()
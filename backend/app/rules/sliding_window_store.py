@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.models.transaction import Transaction
+from app.rules.account_window import AccountWindow
+from app.utils.datetime_utils import to_naive
+
+
+class _AccountBuffer:
+    def __init__(self, window: AccountWindow, floor: datetime) -> None:
+        self.window = window
+        # Earliest date from which the buffer is known to be complete.
+        self.floor = floor
+        self.newest = floor
+
+
+class SlidingWindowStore:
+    """Process-local, per-account buffers of recent transactions for the history rules.
+
+    An account's buffer is warmed from the database on first access and then kept
+    current through ``record``; entries older than the longest rule lookback behind the
+    newest transaction are evicted. Requests the buffer cannot answer (e.g. a backdated
+    transaction older than its floor) return ``None`` so callers fall back to SQL.
+    Only transactions written through ``record`` are seen, so writers that bypass it
+    must ``invalidate`` the account.
+    """
+
+    def __init__(self, max_accounts: int | None = None) -> None:
+        self.max_accounts = max_accounts or settings.RULE_WINDOW_STORE_MAX_ACCOUNTS
+        self.horizon = timedelta(0)
+        self.hits = 0
+        self.misses = 0
+        self.mismatches = 0
+        self._buffers: OrderedDict[str, _AccountBuffer] = OrderedDict()
+        # Accounts whose buffer is being loaded, with transactions recorded meanwhile.
+        self._warming: dict[str, list[Transaction]] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(
+        self, db: Session, account_number: str, start: datetime, end: datetime, horizon: timedelta
+    ) -> AccountWindow | None:
+        """History for ``[start, end]`` from the account's buffer, or ``None`` if it cannot be served."""
+        start, end = to_naive(start), to_naive(end)
+        with self._lock:
+            self.horizon = max(self.horizon, horizon)
+            buffer = self._buffers.get(account_number)
+            if buffer is None:
+                floor = end - self.horizon
+                self._warming.setdefault(account_number, [])
+        if buffer is None:
+            buffer = self._warm(db, account_number, floor)
+            if buffer is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+
+        with self._lock:
+            buffer = self._buffers.get(account_number)
+            if buffer is None or start < buffer.floor:  # evicted or invalidated meanwhile, or too old
+                self.misses += 1
+                return None
+            self._buffers.move_to_end(account_number)
+            self.hits += 1
+            window = buffer.window.slice(start, end)
+
+        if settings.RULE_WINDOW_STORE_VERIFY:
+            expected = AccountWindow.load(db, account_number, start, end)
+            if not window.same_as(expected):
+                with self._lock:
+                    self.mismatches += 1
+                logger.warning(
+                    f"[TRACE] SlidingWindowStore | MISMATCH | account={account_number} "
+                    f"store={len(window)} db={len(expected)} | buffer invalidated"
+                )
+                self.invalidate(account_number)
+                return expected
+        return window
+
+    def _warm(self, db: Session, account_number: str, floor: datetime) -> _AccountBuffer | None:
+        """Load an account's buffer without holding the store lock, then install it.
+
+        Transactions recorded while the load ran are replayed into it. Returns ``None``
+        if the account was invalidated meanwhile, since the load may predate that write.
+        """
+        window = AccountWindow.load(db, account_number, floor, datetime.max)
+        with self._lock:
+            buffer = self._buffers.get(account_number)
+            if buffer is not None:  # another lookup installed it first
+                return buffer
+            if account_number not in self._warming:
+                return None
+            buffer = _AccountBuffer(window, floor)
+            self._buffers[account_number] = buffer
+            self._evict_accounts()
+            for transaction in self._warming.pop(account_number):
+                self._add(buffer, transaction)
+            return self._buffers.get(account_number)  # dropped if a replayed transaction predates the floor
+
+    def record(self, transaction: Transaction) -> None:
+        """Add a persisted transaction to its account's buffer, if that buffer is warm.
+
+        A transaction dated before the buffer's floor cannot be placed (the anchors below
+        the floor would be wrong), so the account's buffer is dropped and reloaded on next use.
+        """
+        with self._lock:
+            account_number = transaction.account_number
+            if account_number in self._warming:
+                self._warming[account_number].append(transaction)
+            buffer = self._buffers.get(account_number)
+            if buffer is not None:
+                self._add(buffer, transaction)
+
+    def _add(self, buffer: _AccountBuffer, transaction: Transaction) -> None:
+        """Apply a recorded transaction to a buffer; the caller holds the lock."""
+        if to_naive(transaction.transaction_date) < buffer.floor:
+            self._buffers.pop(buffer.window.account_number, None)
+            return
+        buffer.window.add(transaction)
+        buffer.newest = max(buffer.newest, to_naive(transaction.transaction_date))
+        cutoff = buffer.newest - self.horizon
+        if cutoff > buffer.floor:
+            buffer.window.evict_before(cutoff)
+            buffer.floor = cutoff
+
+    def invalidate(self, account_number: str | None = None) -> None:
+        """Drop one account's buffer, or every buffer when no account is given."""
+        with self._lock:
+            if account_number is None:
+                self._buffers.clear()
+                self._warming.clear()
+            else:
+                self._buffers.pop(account_number, None)
+                self._warming.pop(account_number, None)
+
+    def _evict_accounts(self) -> None:
+        while len(self._buffers) > self.max_accounts:
+            self._buffers.popitem(last=False)
+
+
+window_store = SlidingWindowStore()
@@ -1,26 +1,22 @@
 from datetime import timedelta
 
 from app.config.settings import settings
-from app.models.account import Account
 from app.models.transaction import Transaction
 from app.rules.base_rule import BaseRule, RuleResult
+from app.rules.rule_context import RuleContext
 
 
 class VelocityRule(BaseRule):
     rule_id = "RULE-04"
     rule_name = "Transaction Velocity"
+    default_severity = "medium"
 
-    def evaluate(self, transaction: Transaction, account: Account, db) -> RuleResult:
-        window_start = transaction.transaction_date - timedelta(minutes=settings.VELOCITY_WINDOW_MINUTES)
-        txn_count = (
-            db.query(Transaction)
-            .filter(
-                Transaction.account_number == transaction.account_number,
-                Transaction.transaction_date >= window_start,
-                Transaction.transaction_date <= transaction.transaction_date,
-            )
-            .count()
-        )
+    def lookback(self) -> timedelta:
+        return timedelta(minutes=settings.VELOCITY_WINDOW_MINUTES)
+
+    def evaluate(self, transaction: Transaction, context: RuleContext) -> RuleResult:
+        window_start = transaction.transaction_date - self.lookback()
+        txn_count = context.history.count_between(window_start, transaction.transaction_date)
         triggered = txn_count >= settings.VELOCITY_TXN_COUNT
         description = (
             f"{txn_count} transactions within {settings.VELOCITY_WINDOW_MINUTES} minutes"
@@ -29,7 +25,7 @@ class VelocityRule(BaseRule):
         )
         return RuleResult(
             triggered=triggered,
-            severity="medium",
+            severity=self.severity(),
             description=description,
             rule_id=self.rule_id,
             rule_name=self.rule_name,
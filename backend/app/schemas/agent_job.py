@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class AgentJobOut(BaseModel):
+    job_id: str
+    alert_id: str
+    account_number: str
+    transaction_id: str | None = None
+    job_status: str  # queued / running / completed / failed
+    attempts: int
+    case_id: str | None = None
+    error_message: str | None = None
+    queued_date: datetime
+    started_date: datetime | None = None
+    finished_date: datetime | None = None
+
+    model_config = {"from_attributes": True}
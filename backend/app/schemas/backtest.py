@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field
+
+
+class ThresholdRange(BaseModel):
+    start: float
+    stop: float
+    step: float = Field(default=1.0, gt=0)
+
+
+class ThresholdSweepRequest(BaseModel):
+    ranges: dict[str, ThresholdRange]
+    refresh: bool = False  # reload transactions instead of reusing the cached columns
+
+
+class RuleCost(BaseModel):
+    alerts: int
+    agent_invocations: int
+    estimated_llm_cost_usd: float
+
+
+class ThresholdSweepRow(BaseModel):
+    thresholds: dict[str, float]
+    alert_count: int
+    agent_invocations: int
+    estimated_llm_calls: int
+    estimated_llm_cost_usd: float
+    accepted_cases_caught: int
+    rejected_cases_caught: int
+    rules: dict[str, RuleCost]
+
+
+class ThresholdSweepOut(BaseModel):
+    transactions: int
+    accepted_cases: int
+    rejected_cases: int
+    llm_calls_per_case: int
+    llm_cost_per_call_usd: float
+    rows: list[ThresholdSweepRow]
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class RuleStatsOut(BaseModel):
+    rule_id: str
+    rule_name: str
+    calls: int
+    skipped: int
+    triggered: int
+    trigger_rate: float
+    rows_scanned: int
+    avg_rows_scanned: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
@@ -34,5 +34,47 @@ class TransactionOut(TransactionBase):
     updated_date: datetime
     created_by: str
     updated_by: str
+    agent_job_id: str | None = None  # set when the transaction is held and its analysis queued
+
+    model_config = {"from_attributes": True}
+
+
+class TransactionBulkCreate(BaseModel):
+    transactions: list[TransactionCreate]
+
+
+class TransactionBulkItemOut(BaseModel):
+    index: int  # position in the request
+    transaction_id: str | None = None
+    transaction_status: str  # completed / held / rejected
+    alert_ids: list[str] = []
+    agent_queued: bool = False
+    agent_job_id: str | None = None
+    error_code: str | None = None
+    error_message: str | None = None
+
+
+class TransactionBulkOut(BaseModel):
+    received: int
+    completed: int
+    held: int
+    rejected: int
+    items: list[TransactionBulkItemOut]
+
+
+class TransactionImportOut(BaseModel):
+    import_id: str
+    source_path: str
+    rule_mode: str  # inline / defer / off
+    import_status: str  # running / loaded / completed
+    rows_read: int
+    rows_inserted: int
+    rows_rejected: int
+    alerts_raised: int
+    backfill_cursor: str | None = None
+    # This run only: rows loaded (or evaluated, for a backfill) and throughput
+    rows_processed: int = 0
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
 
     model_config = {"from_attributes": True}
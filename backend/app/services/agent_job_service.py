@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.exceptions.base_exception import NotFoundException
+from app.exceptions.error_codes import AGENT_JOB_NOT_FOUND
+from app.models.agent_job import AgentJob
+from app.models.alert import Alert
+from app.repositories.agent_job_repository import AgentJobRepository
+from app.utils.datetime_utils import utc_now
+from app.utils.id_generator import generate_id
+
+
+class AgentJobService:
+    """Durable queue of agent analyses, one ``agent_jobs`` row per alert to analyse.
+
+    Ingestion writes the job in the same commit as the alert, so a held transaction
+    always has its analysis queued; agent workers claim jobs oldest first, run
+    ``MasterAgent.run_for_alert`` and record the outcome. A failed run is re-queued
+    until it has been attempted ``AGENT_JOB_MAX_ATTEMPTS`` times.
+    """
+
+    @staticmethod
+    def build(alert: Alert, queued_at: datetime) -> AgentJob:
+        return AgentJob(
+            job_id=generate_id("JOB"),
+            alert_id=alert.alert_id,
+            account_number=alert.account_number,
+            transaction_id=alert.transaction_id,
+            job_status="queued",
+            attempts=0,
+            queued_date=queued_at,
+        )
+
+    @staticmethod
+    def enqueue(db: Session, alert: Alert, commit: bool = True) -> AgentJob:
+        job = AgentJobRepository.create(db, AgentJobService.build(alert, utc_now()), commit=commit)
+        logger.info(f"[TRACE] AgentJobService | enqueued | job_id={job.job_id} alert_id={alert.alert_id}")
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: str) -> AgentJob:
+        job = AgentJobRepository.get_by_id(db, job_id)
+        if not job:
+            raise NotFoundException(AGENT_JOB_NOT_FOUND, "Agent job not found")
+        return job
+
+    @staticmethod
+    def get_job_for_transaction(db: Session, transaction_id: str) -> AgentJob | None:
+        return AgentJobRepository.get_by_transaction(db, transaction_id)
+
+    @staticmethod
+    def pending(db: Session) -> int:
+        return AgentJobRepository.count_by_status(db, "queued")
+
+    @staticmethod
+    def claim(db: Session, worker_id: str) -> AgentJob | None:
+        job_id = AgentJobRepository.claim_next(db, worker_id, utc_now())
+        return AgentJobRepository.get_by_id(db, job_id) if job_id else None
+
+    @staticmethod
+    def complete(db: Session, job: AgentJob, case_id: str) -> AgentJob:
+        job.job_status = "completed"
+        job.case_id = case_id
+        job.error_message = None
+        job.finished_date = utc_now()
+        return AgentJobRepository.update(db, job)
+
+    @staticmethod
+    def fail(db: Session, job: AgentJob, message: str) -> AgentJob:
+        retry = job.attempts < settings.AGENT_JOB_MAX_ATTEMPTS
+        job.job_status = "queued" if retry else "failed"
+        job.worker_id = None
+        job.error_message = message
+        job.finished_date = None if retry else utc_now()
+        return AgentJobRepository.update(db, job)
+
+    @staticmethod
+    def requeue_stale(db: Session) -> int:
+        count = AgentJobRepository.requeue_stale(db, utc_now() - timedelta(seconds=settings.AGENT_JOB_STALE_SECONDS))
+        if count:
+            logger.warning(f"AgentJobService | re-queued {count} jobs left running by a stopped worker")
+        return count
@@ -0,0 +1,241 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.agents.master_agent import MasterAgent, get_master_agent
+from app.config.database import session_scope
+from app.config.settings import settings
+from app.exceptions.base_exception import AMLException
+from app.models.agent_job import AgentJob
+from app.services.agent_job_service import AgentJobService
+
+
+class AgentWorker:
+    """Claims jobs from the ``agent_jobs`` table and runs the agent graph for each.
+
+    ``run`` polls until ``stop`` is called; ``start`` does the same on a daemon thread.
+    Each job runs on its own session. Unless one is passed in, jobs use the process-wide
+    agent from ``get_master_agent``, so a reload after a provider change is picked up by
+    the next job; the compiled graph and LLM clients are safe to call concurrently.
+    """
+
+    def __init__(self, worker_id: str | None = None, master_agent: MasterAgent | None = None) -> None:
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._master_agent = master_agent
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_next(self) -> AgentJob | None:
+        """Claim and run the oldest queued job; ``None`` when the queue is empty."""
+        with session_scope() as db:
+            job = AgentJobService.claim(db, self.worker_id)
+            if job is not None:
+                self._execute(db, job)
+            return job
+
+    def drain(self) -> int:
+        """Run queued jobs until none are left; returns how many ran."""
+        count = 0
+        while not self._stop.is_set() and self.run_next() is not None:
+            count += 1
+        return count
+
+    def run(self) -> None:
+        logger.info(f"[TRACE] AgentWorker | started | worker_id={self.worker_id}")
+        _requeue_stale()
+        while not self._stop.is_set():
+            try:
+                job = self.run_next()
+            except Exception:
+                logger.exception(f"AgentWorker | claim failed | worker_id={self.worker_id}")
+                job = None
+            if job is None:
+                self._stop.wait(settings.AGENT_JOB_POLL_INTERVAL_SECONDS)
+        logger.info(f"[TRACE] AgentWorker | stopped | worker_id={self.worker_id}")
+
+    def start(self, target: Callable[[], object] | None = None) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=target or self.run, name=f"agent-worker-{self.worker_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop after the job in progress, waiting up to ``timeout`` for it when running on a thread."""
+        self.request_stop()
+        self.join(timeout)
+
+    def request_stop(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait for the worker thread; ``True`` once it has exited."""
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _agent(self) -> MasterAgent:
+        return self._master_agent or get_master_agent()
+
+    def _execute(self, db: Session, job: AgentJob) -> None:
+        t0 = time.perf_counter()
+        try:
+            case = self._agent().run_for_alert(db, job.alert_id)
+        except Exception as exc:
+            db.rollback()
+            logger.exception(f"AgentWorker | agent run failed | job_id={job.job_id} alert_id={job.alert_id}")
+            AgentJobService.fail(db, job, _failure_message(exc))
+            return
+        AgentJobService.complete(db, job, case.case_id)
+        elapsed = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info(
+            f"[TRACE] AgentWorker | job completed | job_id={job.job_id} alert_id={job.alert_id} "
+            f"case_id={case.case_id} | {elapsed}ms"
+        )
+
+
+class AgentWorkerPool:
+    """``AGENT_WORKER_COUNT`` worker threads sharing the process-wide ``MasterAgent``.
+
+    Claims never hand out a job for an account that already has one running, so cases of
+    one account are built one after another while different accounts run in parallel;
+    concurrent LLM requests are capped separately by ``AGENT_MAX_INFLIGHT_LLM_CALLS``.
+    ``stop`` stops claiming and waits for in-flight jobs to finish. Jobs still running
+    when the process exits are re-queued by the next worker after ``AGENT_JOB_STALE_SECONDS``.
+    """
+
+    def __init__(self, count: int | None = None, master_agent: MasterAgent | None = None) -> None:
+        self.count = max(count or settings.AGENT_WORKER_COUNT, 1)
+        self._master_agent = master_agent
+        self.workers: list[AgentWorker] = []
+
+    def start(self, drain: bool = False) -> None:
+        """Start the workers; with ``drain`` each exits once it finds nothing to claim."""
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.workers = [AgentWorker(f"{prefix}:{index}", self._master_agent) for index in range(self.count)]
+        for worker in self.workers:
+            worker.start(worker.drain if drain else None)
+        logger.info(f"[TRACE] AgentWorkerPool | started | workers={self.count} drain={drain}")
+
+    def stop(self, timeout: float | None = None) -> bool:
+        """Stop claiming and wait up to ``timeout`` for in-flight jobs; ``True`` if all finished."""
+        self.request_stop()
+        finished = self.join(timeout)
+        if not finished:
+            logger.warning("AgentWorkerPool | stop timed out with jobs still running")
+        return finished
+
+    def request_stop(self) -> None:
+        for worker in self.workers:
+            worker.request_stop()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait up to ``timeout`` for every worker to exit; ``True`` once all have."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        finished = True
+        for worker in self.workers:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            finished = worker.join(remaining) and finished
+        return finished
+
+    def drain(self) -> None:
+        """Run every queued job on the pool's workers and return when none are left."""
+        self.start(drain=True)
+        self.join()
+
+
+class AsyncAgentWorker:
+    """Runs up to ``AGENT_ASYNC_WORKER_CONCURRENCY`` jobs at once on one event loop.
+
+    Each of ``concurrency`` lanes claims a job and runs ``MasterAgent.arun_for_alert``,
+    which awaits the LLM calls, so waiting on the provider costs a coroutine rather than
+    a thread; claims and database work go through ``asyncio.to_thread``. Claiming, the
+    per-account ordering and ``AGENT_MAX_INFLIGHT_LLM_CALLS`` work as for ``AgentWorker``,
+    so raise the LLM cap along with the concurrency.
+    """
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        worker_id: str | None = None,
+        master_agent: MasterAgent | None = None,
+    ) -> None:
+        self.concurrency = max(concurrency or settings.AGENT_ASYNC_WORKER_CONCURRENCY, 1)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:async"
+        self._master_agent = master_agent
+        self._stop = threading.Event()
+
+    async def run(self, drain: bool = False) -> int:
+        """Run jobs until ``request_stop``, or with ``drain`` until none are left; returns how many ran."""
+        logger.info(f"[TRACE] AsyncAgentWorker | started | worker_id={self.worker_id} concurrency={self.concurrency}")
+        await asyncio.to_thread(_requeue_stale)
+        lanes = (self._lane(f"{self.worker_id}:{index}", drain) for index in range(self.concurrency))
+        counts = await asyncio.gather(*lanes)
+        logger.info(f"[TRACE] AsyncAgentWorker | stopped | worker_id={self.worker_id} jobs={sum(counts)}")
+        return sum(counts)
+
+    async def drain(self) -> int:
+        return await self.run(drain=True)
+
+    def request_stop(self) -> None:
+        """Stop claiming; lanes finish the job in progress. Safe to call from any thread."""
+        self._stop.set()
+
+    async def run_next(self, worker_id: str) -> AgentJob | None:
+        """Claim and run the oldest claimable job; ``None`` when there is nothing to claim."""
+        with session_scope() as db:
+            job = await asyncio.to_thread(AgentJobService.claim, db, worker_id)
+            if job is not None:
+                await self._execute(db, job)
+            return job
+
+    async def _lane(self, worker_id: str, drain: bool) -> int:
+        count = 0
+        while not self._stop.is_set():
+            try:
+                job = await self.run_next(worker_id)
+            except Exception:
+                logger.exception(f"AsyncAgentWorker | claim failed | worker_id={worker_id}")
+                job = None
+            if job is not None:
+                count += 1
+            elif drain:
+                break
+            else:
+                await asyncio.sleep(settings.AGENT_JOB_POLL_INTERVAL_SECONDS)
+        return count
+
+    def _agent(self) -> MasterAgent:
+        return self._master_agent or get_master_agent()
+
+    async def _execute(self, db: Session, job: AgentJob) -> None:
+        t0 = time.perf_counter()
+        try:
+            case = await self._agent().arun_for_alert(db, job.alert_id)
+        except Exception as exc:
+            await asyncio.to_thread(db.rollback)
+            logger.exception(f"AsyncAgentWorker | agent run failed | job_id={job.job_id} alert_id={job.alert_id}")
+            await asyncio.to_thread(AgentJobService.fail, db, job, _failure_message(exc))
+            return
+        await asyncio.to_thread(AgentJobService.complete, db, job, case.case_id)
+        elapsed = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info(
+            f"[TRACE] AsyncAgentWorker | job completed | job_id={job.job_id} alert_id={job.alert_id} "
+            f"case_id={case.case_id} | {elapsed}ms"
+        )
+
+
+def _requeue_stale() -> None:
+    with session_scope() as db:
+        AgentJobService.requeue_stale(db)
+
+
+def _failure_message(exc: Exception) -> str:
+    # Only application messages are kept: other exception text can carry SQL and parameters.
+    return exc.message if isinstance(exc, AMLException) else type(exc).__name__
@@ -0,0 +1,12 @@
+from app.rules.rule_stats import rule_stats
+from app.schemas.rule import RuleStatsOut
+
+
+class RuleService:
+    @staticmethod
+    def get_stats() -> list[RuleStatsOut]:
+        return [RuleStatsOut(**stats) for stats in rule_stats.snapshot()]
+
+    @staticmethod
+    def reset_stats() -> None:
+        rule_stats.reset()
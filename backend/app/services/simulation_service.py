@@ -8,8 +8,10 @@ from app.config.database import Base
 from app.config.settings import settings
 from app.exceptions.base_exception import NotFoundException
 from app.exceptions.error_codes import SIMULATION_SCENARIO_NOT_FOUND
+from app.rules.sliding_window_store import window_store
 from app.schemas.simulation import SimulationScenario
 from app.schemas.transaction import TransactionCreate
+from app.services.threshold_sweep_service import ThresholdSweepService
 from app.services.transaction_service import TransactionService
 from app.utils.datetime_utils import utc_now
 
@@ -190,3 +192,5 @@ class SimulationService:
         for table in reversed(Base.metadata.sorted_tables):
             db.execute(table.delete())
         db.commit()
+        window_store.invalidate()
+        ThresholdSweepService.invalidate()
@@ -0,0 +1,119 @@
+import itertools
+import threading
+import time
+
+import numpy as np
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.exceptions.base_exception import ValidationException
+from app.exceptions.error_codes import RULE_BACKTEST_INVALID_GRID
+from app.repositories.case_repository import CaseRepository
+from app.rules.backtest import BACKTEST_THRESHOLDS, BacktestEngine, TransactionColumns
+from app.schemas.backtest import RuleCost, ThresholdRange, ThresholdSweepOut, ThresholdSweepRow
+
+
+class ThresholdSweepService:
+    """Replays history under a grid of rule thresholds and estimates the agent cost of each point.
+
+    Every flagged transaction opens one case, i.e. one agent run of
+    ``AGENT_LLM_CALLS_PER_CASE`` LLM calls; a rule's cost is that of the runs where it
+    raises the primary alert. The ``BacktestEngine`` (sorted columns and window indices)
+    is cached across requests for ``BACKTEST_CACHE_TTL_SECONDS``.
+    """
+
+    _engine: BacktestEngine | None = None
+    _loaded_at = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def expand(threshold_range: ThresholdRange) -> list[float]:
+        """Values from ``start`` to ``stop`` inclusive, ``step`` apart."""
+        if threshold_range.stop < threshold_range.start:
+            raise ValidationException(RULE_BACKTEST_INVALID_GRID, "Range stop must not be below start")
+        count = int(np.floor((threshold_range.stop - threshold_range.start) / threshold_range.step + 1e-9)) + 1
+        return [round(threshold_range.start + i * threshold_range.step, 10) for i in range(count)]
+
+    @staticmethod
+    def get_engine(db: Session, refresh: bool = False) -> BacktestEngine:
+        with ThresholdSweepService._lock:
+            expired = time.monotonic() - ThresholdSweepService._loaded_at > settings.BACKTEST_CACHE_TTL_SECONDS
+            if refresh or expired or ThresholdSweepService._engine is None:
+                ThresholdSweepService._engine = BacktestEngine(TransactionColumns.load(db))
+                ThresholdSweepService._loaded_at = time.monotonic()
+            return ThresholdSweepService._engine
+
+    @staticmethod
+    def invalidate() -> None:
+        with ThresholdSweepService._lock:
+            ThresholdSweepService._engine = None
+
+    @staticmethod
+    def run(db: Session, ranges: dict[str, ThresholdRange], refresh: bool = False) -> ThresholdSweepOut:
+        t0 = time.perf_counter()
+        unknown = sorted(set(ranges) - set(BACKTEST_THRESHOLDS))
+        if unknown:
+            raise ValidationException(
+                RULE_BACKTEST_INVALID_GRID,
+                f"Unsupported thresholds {unknown}; expected any of {list(BACKTEST_THRESHOLDS)}",
+            )
+        grid = {name: ThresholdSweepService.expand(threshold_range) for name, threshold_range in ranges.items()}
+        points = int(np.prod([len(values) for values in grid.values()])) if grid else 1
+        if points > settings.THRESHOLD_SWEEP_MAX_POINTS:
+            raise ValidationException(
+                RULE_BACKTEST_INVALID_GRID,
+                f"Sweep has {points} points; the limit is {settings.THRESHOLD_SWEEP_MAX_POINTS}",
+            )
+
+        engine = ThresholdSweepService.get_engine(db, refresh=refresh)
+        transaction_ids = engine.columns.transaction_id
+        decisions = CaseRepository.latest_decisions_by_transaction(db)
+        accepted_rows = np.flatnonzero(
+            np.isin(transaction_ids, [t for t, d in decisions.items() if d == "ACCEPT"])
+        )
+        rejected_rows = np.flatnonzero(
+            np.isin(transaction_ids, [t for t, d in decisions.items() if d == "REJECT"])
+        )
+
+        calls_per_case = settings.AGENT_LLM_CALLS_PER_CASE
+        cost_per_call = settings.LLM_COST_PER_CALL_USD
+        names = list(grid)
+        rows: list[ThresholdSweepRow] = []
+        for values in itertools.product(*grid.values()):
+            result = engine.evaluate(**dict(zip(names, values, strict=True)))
+            invocations = result.flagged_count
+            rows.append(
+                ThresholdSweepRow(
+                    thresholds=result.thresholds,
+                    alert_count=result.alert_count,
+                    agent_invocations=invocations,
+                    estimated_llm_calls=invocations * calls_per_case,
+                    estimated_llm_cost_usd=round(invocations * calls_per_case * cost_per_call, 4),
+                    accepted_cases_caught=int(result.flagged[accepted_rows].sum()),
+                    rejected_cases_caught=int(result.flagged[rejected_rows].sum()),
+                    rules={
+                        rule_id: RuleCost(
+                            alerts=hits,
+                            agent_invocations=result.primary_hits[rule_id],
+                            estimated_llm_cost_usd=round(
+                                result.primary_hits[rule_id] * calls_per_case * cost_per_call, 4
+                            ),
+                        )
+                        for rule_id, hits in result.hits.items()
+                    },
+                )
+            )
+
+        elapsed = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info(
+            f"[TRACE] ThresholdSweepService | run END | points={len(rows)} rows={len(engine.columns)} | {elapsed}ms"
+        )
+        return ThresholdSweepOut(
+            transactions=len(engine.columns),
+            accepted_cases=len(accepted_rows),
+            rejected_cases=len(rejected_rows),
+            llm_calls_per_case=calls_per_case,
+            llm_cost_per_call_usd=cost_per_call,
+            rows=rows,
+        )
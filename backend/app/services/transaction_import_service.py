@@ -0,0 +1,266 @@
+import csv
+import hashlib
+import itertools
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import Column, DateTime, Float
+from sqlalchemy.orm import Session
+
+from app.config.database import unit_of_work
+from app.config.settings import settings
+from app.exceptions.base_exception import NotFoundException, ValidationException
+from app.exceptions.error_codes import TRANSACTION_IMPORT_INVALID_FILE, TRANSACTION_IMPORT_NOT_FOUND
+from app.models.transaction import Transaction
+from app.models.transaction_import import TransactionImport
+from app.repositories.account_repository import AccountRepository
+from app.repositories.transaction_import_repository import TransactionImportRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.rules.rule_engine import rule_engine
+from app.rules.sliding_window_store import window_store
+from app.schemas.transaction import TransactionImportOut
+from app.services.transaction_service import TransactionService
+from app.utils.datetime_utils import to_naive
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - Parquet import is optional
+    pq = None
+
+# inline: evaluate each chunk as it is loaded; defer: leave it to ``backfill``; off: load only
+RULE_MODES = ("inline", "defer", "off")
+
+# Audit columns are set by the importer so a backfill can find the rows an import wrote.
+_AUDIT_COLUMNS = ("created_by", "updated_by")
+IMPORT_COLUMNS = {
+    column.name: column for column in Transaction.__table__.columns if column.name not in _AUDIT_COLUMNS
+}
+# Columns a file must provide: not nullable and without a model default.
+REQUIRED_COLUMNS = tuple(
+    name for name, column in IMPORT_COLUMNS.items() if not column.nullable and column.default is None
+)
+
+
+class TransactionImportService:
+    """Loads transaction history from CSV or Parquet files in chunks.
+
+    The header is checked against the ``Transaction`` model before any row is read. Each
+    chunk is validated, inserted with one executemany and committed together with the
+    import's checkpoint (``TransactionImport.rows_read``), so re-running an interrupted
+    import skips exactly the rows already committed. Rows that fail validation, reference
+    unknown accounts or repeat an existing transaction_id are logged and skipped.
+
+    Imported rows are history: their status comes from the file (or the model default),
+    and balances, high-risk flags and agent runs are left untouched. Rule evaluation only
+    raises alerts, the same way ``RuleEngine.evaluate_batch`` replays stored history.
+    """
+
+    @staticmethod
+    def run(
+        db: Session,
+        path: str | Path,
+        import_id: str | None = None,
+        rule_mode: str = "inline",
+        chunk_size: int | None = None,
+    ) -> TransactionImportOut:
+        t0 = time.perf_counter()
+        path = Path(path).resolve()
+        if rule_mode not in RULE_MODES:
+            raise ValidationException(TRANSACTION_IMPORT_INVALID_FILE, f"Rule mode must be one of {list(RULE_MODES)}")
+        if not path.is_file():
+            raise ValidationException(TRANSACTION_IMPORT_INVALID_FILE, f"File not found: {path}")
+        chunk_size = chunk_size or settings.TRANSACTION_IMPORT_CHUNK_SIZE
+        import_id = import_id or TransactionImportService.default_import_id(path)
+
+        with TransactionImportService._open(path, chunk_size) as (header, rows):
+            columns = TransactionImportService._columns(header)
+            record = TransactionImportRepository.get_by_id(db, import_id)
+            if record is None:
+                record = TransactionImportRepository.create(
+                    db, TransactionImport(import_id=import_id, source_path=str(path), rule_mode=rule_mode)
+                )
+            elif record.rule_mode != rule_mode:
+                raise ValidationException(
+                    TRANSACTION_IMPORT_INVALID_FILE,
+                    f"Import {import_id} was started with rule mode '{record.rule_mode}'",
+                )
+            logger.info(
+                f"[TRACE] TransactionImportService | run START | import_id={import_id} path={path} "
+                f"rules={rule_mode} resume_from={record.rows_read}"
+            )
+            if record.import_status != "running":
+                return TransactionImportService._report(record, 0, t0)
+
+            resumed_from = record.rows_read
+            rows = itertools.islice(rows, record.rows_read, None)
+            while chunk := list(itertools.islice(rows, chunk_size)):
+                TransactionImportService._load_chunk(db, record, columns, chunk)
+
+        record.import_status = "loaded" if rule_mode == "defer" else "completed"
+        TransactionImportRepository.update(db, record)
+        return TransactionImportService._report(record, record.rows_read - resumed_from, t0)
+
+    @staticmethod
+    def backfill(db: Session, import_id: str, chunk_size: int | None = None) -> TransactionImportOut:
+        """Evaluate the rules over the rows of a ``defer`` import, resuming after the last committed chunk."""
+        t0 = time.perf_counter()
+        chunk_size = chunk_size or settings.TRANSACTION_IMPORT_CHUNK_SIZE
+        record = TransactionImportRepository.get_by_id(db, import_id)
+        if record is None:
+            raise NotFoundException(TRANSACTION_IMPORT_NOT_FOUND, f"Import {import_id} not found")
+        if record.rule_mode != "defer" or record.import_status == "running":
+            raise ValidationException(
+                TRANSACTION_IMPORT_INVALID_FILE,
+                f"Import {import_id} is not a finished deferred-rules load "
+                f"(rules={record.rule_mode} status={record.import_status})",
+            )
+
+        evaluated = 0
+        created_by = _created_by(import_id)
+        while transactions := TransactionRepository.list_created_by(db, created_by, record.backfill_cursor, chunk_size):
+            with unit_of_work(db):
+                results = rule_engine.evaluate_batch(db, transactions, commit=False)
+                record.alerts_raised += sum(len(alerts) for alerts in results.values())
+                record.backfill_cursor = transactions[-1].transaction_id
+                TransactionImportRepository.update(db, record, commit=False)
+            evaluated += len(transactions)
+            for transaction in transactions:
+                db.expunge(transaction)
+
+        record.import_status = "completed"
+        TransactionImportRepository.update(db, record)
+        return TransactionImportService._report(record, evaluated, t0)
+
+    @staticmethod
+    def default_import_id(path: Path) -> str:
+        """Stable ID for a file, so re-running the same command resumes rather than restarts."""
+        stat = path.stat()
+        digest = hashlib.sha1(f"{path}|{stat.st_size}|{stat.st_mtime_ns}".encode()).hexdigest()[:10].upper()
+        return f"IMP-{digest}"
+
+    @staticmethod
+    @contextmanager
+    def _open(path: Path, chunk_size: int) -> Iterator[tuple[list[str], Iterator[dict]]]:
+        """The file's column names and an iterator over its rows as dicts."""
+        suffix = path.suffix.lower()
+        if suffix == ".csv":
+            with path.open(newline="", encoding="utf-8") as handle:
+                reader = csv.DictReader(handle)
+                yield list(reader.fieldnames or []), reader
+        elif suffix in (".parquet", ".pq"):
+            if pq is None:
+                raise ValidationException(TRANSACTION_IMPORT_INVALID_FILE, "Parquet import requires pyarrow")
+            parquet = pq.ParquetFile(path)
+            batches = parquet.iter_batches(batch_size=chunk_size)
+            yield parquet.schema_arrow.names, (row for batch in batches for row in batch.to_pylist())
+        else:
+            raise ValidationException(TRANSACTION_IMPORT_INVALID_FILE, f"Unsupported file type '{suffix}'")
+
+    @staticmethod
+    def _columns(header: list[str]) -> dict[str, Column]:
+        unknown = sorted(set(header) - set(IMPORT_COLUMNS))
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if unknown or missing:
+            raise ValidationException(
+                TRANSACTION_IMPORT_INVALID_FILE,
+                f"File columns do not match the transaction model: missing={missing} unknown={unknown}",
+            )
+        return {name: IMPORT_COLUMNS[name] for name in header}
+
+    @staticmethod
+    def _load_chunk(db: Session, record: TransactionImport, columns: dict[str, Column], chunk: list[dict]) -> None:
+        t0 = time.perf_counter()
+        rows: list[dict] = []
+        for line, raw in enumerate(chunk, start=record.rows_read + 1):
+            try:
+                rows.append(_convert(columns, raw))
+            except ValueError as exc:
+                logger.warning(f"TransactionImportService | row {line} rejected | {exc}")
+
+        accounts = {
+            account.account_number
+            for account in AccountRepository.list_by_numbers(db, list({row["account_number"] for row in rows}))
+        }
+        seen = TransactionRepository.existing_ids(db, [row["transaction_id"] for row in rows])
+        accepted: list[dict] = []
+        for row in rows:
+            if row["account_number"] not in accounts:
+                logger.warning(f"TransactionImportService | {row['transaction_id']} rejected | unknown account")
+            elif row["transaction_id"] in seen:
+                logger.warning(f"TransactionImportService | {row['transaction_id']} rejected | duplicate id")
+            else:
+                seen.add(row["transaction_id"])
+                row["created_by"] = row["updated_by"] = _created_by(record.import_id)
+                accepted.append(row)
+
+        alerts = 0
+        with unit_of_work(db):
+            TransactionRepository.insert_rows(db, accepted, commit=False)
+            if record.rule_mode == "inline" and accepted:
+                results = rule_engine.evaluate_batch(db, [Transaction(**row) for row in accepted], commit=False)
+                alerts = sum(len(found) for found in results.values())
+            record.rows_read += len(chunk)
+            record.rows_inserted += len(accepted)
+            record.rows_rejected += len(chunk) - len(accepted)
+            record.alerts_raised += alerts
+            TransactionImportRepository.update(db, record, commit=False)
+        for account_number in {row["account_number"] for row in accepted}:
+            window_store.invalidate(account_number)
+
+        elapsed = time.perf_counter() - t0
+        logger.info(
+            f"[TRACE] TransactionImportService | chunk END | import_id={record.import_id} rows={len(chunk)} "
+            f"inserted={len(accepted)} alerts={alerts} total={record.rows_read} "
+            f"rows/s={len(chunk) / elapsed if elapsed else 0:.0f} | {round(elapsed * 1000, 2)}ms"
+        )
+
+    @staticmethod
+    def _report(record: TransactionImport, rows: int, t0: float) -> TransactionImportOut:
+        elapsed = time.perf_counter() - t0
+        report = TransactionImportOut.model_validate(record).model_copy(
+            update={
+                "rows_processed": rows,
+                "elapsed_seconds": round(elapsed, 3),
+                "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0,
+            }
+        )
+        logger.info(
+            f"[TRACE] TransactionImportService | END | import_id={record.import_id} status={record.import_status} "
+            f"rows={rows} rows/s={report.rows_per_second} | {round(elapsed * 1000, 2)}ms"
+        )
+        return report
+
+
+def _created_by(import_id: str) -> str:
+    return f"import:{import_id}"
+
+
+def _convert(columns: dict[str, Column], raw: dict) -> dict:
+    """Typed column values for one file row; raises ``ValueError`` naming the offending column."""
+    row = {}
+    for name, column in columns.items():
+        value = raw.get(name)
+        if value is None or value == "":
+            if not column.nullable:
+                raise ValueError(f"{name} is required")
+            row[name] = None
+            continue
+        try:
+            if isinstance(column.type, DateTime):
+                parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+                row[name] = to_naive(parsed.astimezone(UTC)) if parsed.tzinfo else parsed
+            elif isinstance(column.type, Float):
+                row[name] = float(value)
+            else:
+                row[name] = str(value)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"{name}: {exc}") from exc
+    if row["transaction_amount"] <= 0:
+        raise ValueError("transaction_amount must be positive")
+    if row["transaction_type"] not in TransactionService._ALLOWED_TYPES:
+        raise ValueError(f"invalid transaction_type '{row['transaction_type']}'")
+    return row
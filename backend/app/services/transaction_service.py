@@ -1,25 +1,36 @@
 import time
+from collections import Counter
+from datetime import datetime
 
 from loguru import logger
 from sqlalchemy.orm import Session
 
-from app.exceptions.base_exception import NotFoundException, ValidationException
+from app.config.database import unit_of_work
+from app.config.settings import settings
+from app.exceptions.base_exception import AMLException, NotFoundException, ValidationException
 from app.exceptions.error_codes import (
     ACCOUNT_INSUFFICIENT_BALANCE,
     ACCOUNT_NOT_FOUND,
+    TRANSACTION_BATCH_TOO_LARGE,
     TRANSACTION_INVALID_AMOUNT,
     TRANSACTION_INVALID_TYPE,
     TRANSACTION_NOT_FOUND,
 )
 from app.models.account import Account
+from app.models.agent_job import AgentJob
+from app.models.alert import Alert
 from app.models.transaction import Transaction
 from app.repositories.account_repository import AccountRepository
+from app.repositories.agent_job_repository import AgentJobRepository
+from app.repositories.alert_repository import AlertRepository
 from app.repositories.high_risk_account_repository import HighRiskAccountRepository
-from app.agents.master_agent import MasterAgent
 from app.repositories.transaction_repository import TransactionRepository
-from app.rules.rule_engine import RuleEngine
-from app.schemas.transaction import TransactionCreate
-from app.utils.datetime_utils import utc_now
+from app.rules.base_rule import SEVERITY_PRIORITY
+from app.rules.rule_engine import rule_engine
+from app.rules.sliding_window_store import window_store
+from app.schemas.transaction import TransactionBulkItemOut, TransactionBulkOut, TransactionCreate
+from app.services.agent_job_service import AgentJobService
+from app.utils.datetime_utils import to_naive, utc_now
 from app.utils.id_generator import generate_id
 from app.models.high_risk_account import HighRiskAccount
 
@@ -33,93 +44,230 @@ class TransactionService:
         logger.info(f"[TRACE] TransactionService | create_transaction START | account={data.account_number} type={data.transaction_type} amount={data.transaction_amount}")
 
         account = db.query(Account).filter(Account.account_number == data.account_number).first()
+        TransactionService._validate(data, account)
+        TransactionService._check_balance(data.transaction_type, data.transaction_amount, account.balance_amount)
+        transaction = TransactionService._build(data, utc_now())
+
+        # --- Rule evaluation ---
+        # The transaction is evaluated while still transient: the context adds it to the
+        # account's history window explicitly, so velocity counts include it, and the row
+        # is then inserted once with its final status instead of as ``pending`` first.
+        t_rules = time.perf_counter()
+        logger.info(f"[TRACE] TransactionService | RuleEngine evaluation START | txn={transaction.transaction_id}")
+        context = rule_engine.load_context(db, transaction, account)
+
+        # Everything the ingest writes (transaction, alerts, high-risk flag, balance) is
+        # committed once, or rolled back together if any step fails.
+        with unit_of_work(db):
+            alerts = rule_engine.evaluate_transaction(db, transaction, account, context, commit=False)
+            elapsed_rules = round((time.perf_counter() - t_rules) * 1000, 2)
+            logger.info(f"[TRACE] TransactionService | RuleEngine evaluation END | {len(alerts)} alerts triggered | {elapsed_rules}ms")
+
+            if alerts:
+                transaction.transaction_status = "held"
+                logger.info(f"[TRACE] TransactionService | txn status -> held | alerts={[a.alert_id for a in alerts]}")
+
+                if not context.high_risk:
+                    context.high_risk = HighRiskAccountRepository.create(
+                        db, TransactionService._high_risk_flag(account.account_number), commit=False
+                    )
+            else:
+                transaction.transaction_status = "completed"
+                account.balance_amount = TransactionService._apply_balance(transaction, account.balance_amount)
+                AccountRepository.update(db, account, commit=False)
+
+            TransactionRepository.create(db, transaction, commit=False)
+            logger.info(f"[TRACE] TransactionService | txn created | id={transaction.transaction_id} status={transaction.transaction_status}")
+
+            if alerts:
+                # --- Queue the highest-priority alert for agent analysis ---
+                # The job is committed with the alert; an agent worker runs it, so the
+                # request does not wait for the LLM calls.
+                primary_alert = TransactionService._primary_alert(alerts)
+                logger.info(
+                    f"[TRACE] TransactionService | primary alert selected | "
+                    f"alert_id={primary_alert.alert_id} severity={primary_alert.severity} "
+                    f"type={primary_alert.alert_type} | skipped {len(alerts) - 1} lower-priority alerts"
+                )
+                AgentJobService.enqueue(db, primary_alert, commit=False)
+
+        if settings.RULE_WINDOW_STORE_ENABLED:
+            window_store.record(transaction)
+
+        if alerts:
+            elapsed_total = round((time.perf_counter() - t0) * 1000, 2)
+            logger.info(f"[TRACE] TransactionService | create_transaction END (held) | txn={transaction.transaction_id} | {elapsed_total}ms")
+            return transaction
+
+        elapsed_total = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info(f"[TRACE] TransactionService | create_transaction END (completed) | txn={transaction.transaction_id} | {elapsed_total}ms")
+        return transaction
+
+    @staticmethod
+    def create_transactions_bulk(db: Session, items: list[TransactionCreate]) -> TransactionBulkOut:
+        """Ingest a batch of transactions and report the outcome of each one.
+
+        Accounts are loaded with one ``IN`` query and every item is validated up front;
+        invalid items are rejected individually rather than failing the batch. Valid items
+        are replayed per account in date order against shared rule contexts (so balances,
+        velocity counts and high-risk flags evolve as if they had arrived one by one), then
+        transactions and alerts are written with bulk inserts in a single commit. The
+        primary alert of each held transaction is queued for agent analysis in the same commit.
+        """
+        t0 = time.perf_counter()
+        logger.info(f"[TRACE] TransactionService | create_transactions_bulk START | items={len(items)}")
+        if len(items) > settings.TRANSACTION_BULK_MAX_ITEMS:
+            raise ValidationException(
+                TRANSACTION_BATCH_TOO_LARGE,
+                f"Batch has {len(items)} transactions; the limit is {settings.TRANSACTION_BULK_MAX_ITEMS}",
+            )
+
+        accounts = {
+            account.account_number: account
+            for account in AccountRepository.list_by_numbers(db, list({item.account_number for item in items}))
+        }
+        results: dict[int, TransactionBulkItemOut] = {}
+        candidates: list[tuple[int, Transaction]] = []
+        received_at = utc_now()
+        for index, data in enumerate(items):
+            try:
+                TransactionService._validate(data, accounts.get(data.account_number))
+            except AMLException as exc:
+                results[index] = TransactionService._rejected(index, exc)
+                continue
+            candidates.append((index, TransactionService._build(data, received_at)))
+        candidates.sort(key=lambda item: (item[1].account_number, to_naive(item[1].transaction_date), item[0]))
+
+        # --- Rule evaluation (batch-wise) ---
+        t_rules = time.perf_counter()
+        contexts = rule_engine.load_batch_contexts(db, [txn for _, txn in candidates], accounts) if candidates else {}
+        balances = {account_number: account.balance_amount for account_number, account in accounts.items()}
+        accepted: list[Transaction] = []
+        all_alerts: list[Alert] = []
+        jobs: list[AgentJob] = []
+
+        with unit_of_work(db):
+            for index, transaction in candidates:
+                account_number = transaction.account_number
+                try:
+                    TransactionService._check_balance(
+                        transaction.transaction_type, transaction.transaction_amount, balances[account_number]
+                    )
+                except AMLException as exc:
+                    results[index] = TransactionService._rejected(index, exc)
+                    continue
+
+                context = contexts[account_number]
+                alerts = rule_engine.evaluate(transaction, context)
+                if alerts:
+                    transaction.transaction_status = "held"
+                    if not context.high_risk:
+                        context.high_risk = HighRiskAccountRepository.create(
+                            db, TransactionService._high_risk_flag(account_number), commit=False
+                        )
+                    jobs.append(AgentJobService.build(TransactionService._primary_alert(alerts), received_at))
+                else:
+                    transaction.transaction_status = "completed"
+                    balances[account_number] = TransactionService._apply_balance(transaction, balances[account_number])
+                accepted.append(transaction)
+                all_alerts.extend(alerts)
+                results[index] = TransactionBulkItemOut(
+                    index=index,
+                    transaction_id=transaction.transaction_id,
+                    transaction_status=transaction.transaction_status,
+                    alert_ids=[alert.alert_id for alert in alerts],
+                    agent_queued=bool(alerts),
+                    agent_job_id=jobs[-1].job_id if alerts else None,
+                )
+            elapsed_rules = round((time.perf_counter() - t_rules) * 1000, 2)
+            logger.info(
+                f"[TRACE] TransactionService | bulk RuleEngine evaluation END | "
+                f"txns={len(accepted)} alerts={len(all_alerts)} | {elapsed_rules}ms"
+            )
+
+            for account_number, account in accounts.items():
+                if balances[account_number] != account.balance_amount:
+                    account.balance_amount = balances[account_number]
+                    AccountRepository.update(db, account, commit=False)
+            TransactionRepository.bulk_insert(db, accepted, commit=False)
+            AlertRepository.bulk_insert(db, all_alerts, commit=False)
+            AgentJobRepository.bulk_insert(db, jobs, commit=False)
+
+        if settings.RULE_WINDOW_STORE_ENABLED:
+            for transaction in accepted:
+                window_store.record(transaction)
+
+        ordered = [results[index] for index in range(len(items))]
+        counts = Counter(item.transaction_status for item in ordered)
+        elapsed_total = round((time.perf_counter() - t0) * 1000, 2)
+        logger.info(
+            f"[TRACE] TransactionService | create_transactions_bulk END | completed={counts['completed']} "
+            f"held={counts['held']} rejected={counts['rejected']} | {elapsed_total}ms"
+        )
+        return TransactionBulkOut(
+            received=len(items),
+            completed=counts["completed"],
+            held=counts["held"],
+            rejected=counts["rejected"],
+            items=ordered,
+        )
+
+    @staticmethod
+    def _validate(data: TransactionCreate, account: Account | None) -> None:
         if not account:
             raise NotFoundException(ACCOUNT_NOT_FOUND, "Account not found")
         if data.transaction_amount <= 0:
             raise ValidationException(TRANSACTION_INVALID_AMOUNT, "Transaction amount must be positive")
         if data.transaction_type not in TransactionService._ALLOWED_TYPES:
             raise ValidationException(TRANSACTION_INVALID_TYPE, "Invalid transaction type")
-        if data.transaction_type in {"withdrawal", "trade-buy"} and account.balance_amount < data.transaction_amount:
+
+    @staticmethod
+    def _check_balance(transaction_type: str, amount: float, balance: float) -> None:
+        if transaction_type in {"withdrawal", "trade-buy"} and balance < amount:
             raise ValidationException(ACCOUNT_INSUFFICIENT_BALANCE, "Insufficient balance")
 
-        transaction_date = data.transaction_date or utc_now()
-        transaction = Transaction(
+    @staticmethod
+    def _build(data: TransactionCreate, default_date: datetime) -> Transaction:
+        return Transaction(
             transaction_id=generate_id("TXN"),
             account_number=data.account_number,
             transaction_amount=data.transaction_amount,
             transaction_currency=data.transaction_currency,
-            transaction_date=transaction_date,
+            transaction_date=data.transaction_date or default_date,
             transaction_type=data.transaction_type,
             purpose=data.purpose,
             deposit_source_type=data.deposit_source_type,
             deposit_source_value=data.deposit_source_value,
             deposit_source_country=data.deposit_source_country,
-            transaction_status="pending",
         )
-        transaction = TransactionRepository.create(db, transaction)
-        logger.info(f"[TRACE] TransactionService | txn created | id={transaction.transaction_id}")
-
-        # --- Rule evaluation ---
-        t_rules = time.perf_counter()
-        logger.info(f"[TRACE] TransactionService | RuleEngine evaluation START | txn={transaction.transaction_id}")
-        alerts = RuleEngine().evaluate_transaction(db, transaction, account)
-        elapsed_rules = round((time.perf_counter() - t_rules) * 1000, 2)
-        logger.info(f"[TRACE] TransactionService | RuleEngine evaluation END | {len(alerts)} alerts triggered | {elapsed_rules}ms")
-
-        if alerts:
-            transaction.transaction_status = "held"
-            TransactionRepository.update(db, transaction)
-            logger.info(f"[TRACE] TransactionService | txn status -> held | alerts={[a.alert_id for a in alerts]}")
-
-            existing_high_risk = HighRiskAccountRepository.get_by_account(db, account.account_number)
-            if not existing_high_risk:
-                high_risk = HighRiskAccount(
-                    account_number=account.account_number,
-                    high_risk_flag=1,
-                    overall_risk_score=80,
-                    risk_source="rules_engine",
-                    risk_reason="Triggered AML rules",
-                    detected_date=utc_now(),
-                )
-                HighRiskAccountRepository.create(db, high_risk)
-
-            # --- Pick highest-priority alert and run agent once ---
-            severity_priority = {"critical": 0, "high": 1, "medium": 2, "low": 3}
-            primary_alert = min(alerts, key=lambda a: severity_priority.get(a.severity, 99))
-            logger.info(
-                f"[TRACE] TransactionService | primary alert selected | "
-                f"alert_id={primary_alert.alert_id} severity={primary_alert.severity} "
-                f"type={primary_alert.alert_type} | skipped {len(alerts) - 1} lower-priority alerts"
-            )
 
-            t_agent_init = time.perf_counter()
-            logger.info(f"[TRACE] TransactionService | MasterAgent init START")
-            master_agent = MasterAgent()
-            elapsed_init = round((time.perf_counter() - t_agent_init) * 1000, 2)
-            logger.info(f"[TRACE] TransactionService | MasterAgent init END | {elapsed_init}ms")
-
-            t_alert = time.perf_counter()
-            logger.info(f"[TRACE] TransactionService | MasterAgent.run_for_alert START | alert_id={primary_alert.alert_id}")
-            master_agent.run_for_alert(db, primary_alert.alert_id)
-            elapsed_alert = round((time.perf_counter() - t_alert) * 1000, 2)
-            logger.info(f"[TRACE] TransactionService | MasterAgent.run_for_alert END | {elapsed_alert}ms")
-
-            elapsed_total = round((time.perf_counter() - t0) * 1000, 2)
-            logger.info(f"[TRACE] TransactionService | create_transaction END (held) | txn={transaction.transaction_id} | {elapsed_total}ms")
-            return transaction
+    @staticmethod
+    def _apply_balance(transaction: Transaction, balance: float) -> float:
+        if transaction.transaction_type in {"deposit", "trade-sell"}:
+            return balance + transaction.transaction_amount
+        return balance - transaction.transaction_amount
 
-        transaction.transaction_status = "completed"
-        TransactionRepository.update(db, transaction)
+    @staticmethod
+    def _high_risk_flag(account_number: str) -> HighRiskAccount:
+        return HighRiskAccount(
+            account_number=account_number,
+            high_risk_flag=1,
+            overall_risk_score=80,
+            risk_source="rules_engine",
+            risk_reason="Triggered AML rules",
+            detected_date=utc_now(),
+        )
 
-        if transaction.transaction_type in {"deposit", "trade-sell"}:
-            account.balance_amount += transaction.transaction_amount
-        else:
-            account.balance_amount -= transaction.transaction_amount
-        AccountRepository.update(db, account)
+    @staticmethod
+    def _primary_alert(alerts: list[Alert]) -> Alert:
+        """The alert the agent analyses: highest severity, first raised on ties."""
+        return min(alerts, key=lambda a: SEVERITY_PRIORITY.get(a.severity, 99))
 
-        elapsed_total = round((time.perf_counter() - t0) * 1000, 2)
-        logger.info(f"[TRACE] TransactionService | create_transaction END (completed) | txn={transaction.transaction_id} | {elapsed_total}ms")
-        return transaction
+    @staticmethod
+    def _rejected(index: int, exc: AMLException) -> TransactionBulkItemOut:
+        return TransactionBulkItemOut(
+            index=index, transaction_status="rejected", error_code=exc.error_code, error_message=exc.message
+        )
 
     @staticmethod
     def list_transactions(
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+
+from loguru import logger
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.config.database import session_scope
+from app.config.settings import settings
+from app.exceptions.error_codes import TRANSACTION_FAILED, TRANSACTION_STREAM_INVALID_RECORD
+from app.schemas.transaction import TransactionBulkItemOut, TransactionCreate
+from app.services.agent_job_service import AgentJobService
+from app.services.transaction_service import TransactionService
+
+_END = object()
+_BACKLOG_POLL_SECONDS = 0.1
+
+# (position in the stream, parsed record or its rejection)
+Record = tuple[int, TransactionCreate | TransactionBulkItemOut]
+
+
+class TransactionStreamService:
+    """Ingests an NDJSON stream of ``TransactionCreate`` records in micro-batches.
+
+    A reader task parses the body line by line into a bounded queue; the batcher takes up
+    to ``TRANSACTION_STREAM_BATCH_SIZE`` records, or whatever arrived within
+    ``TRANSACTION_STREAM_MAX_LATENCY_MS`` of the first, and runs them through
+    ``TransactionService.create_transactions_bulk``. Results are streamed back as NDJSON,
+    one ``TransactionBulkItemOut`` per record with ``index`` set to its position in the
+    stream. Only one batch is held at a time, so memory stays flat however long the stream
+    runs; while a batch is being written, or while more than ``AGENT_QUEUE_MAX_BACKLOG``
+    agent jobs are queued, the request body is not read and the client is slowed down by
+    transport flow control.
+    """
+
+    @staticmethod
+    async def process(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        t0 = time.perf_counter()
+        records: asyncio.Queue = asyncio.Queue(maxsize=settings.TRANSACTION_STREAM_BATCH_SIZE)
+        reader = asyncio.create_task(TransactionStreamService._read(chunks, records))
+        total = batches = 0
+        try:
+            while True:
+                batch, done = await TransactionStreamService._next_batch(records)
+                if batch:
+                    results = await run_in_threadpool(TransactionStreamService._ingest, batch)
+                    total += len(results)
+                    batches += 1
+                    yield b"".join(item.model_dump_json().encode() + b"\n" for item in results)
+                if done:
+                    break
+                await TransactionStreamService._wait_for_agent_backlog()
+            await reader
+        finally:
+            reader.cancel()
+            elapsed = round((time.perf_counter() - t0) * 1000, 2)
+            logger.info(f"[TRACE] TransactionStreamService | stream END | records={total} batches={batches} | {elapsed}ms")
+
+    @staticmethod
+    async def _read(chunks: AsyncIterator[bytes], records: asyncio.Queue) -> None:
+        """Split the body into lines and queue each parsed record; blocks while the queue is full."""
+        max_bytes = settings.TRANSACTION_STREAM_MAX_LINE_BYTES
+        buffer = bytearray()
+        position = 0
+        oversized = False
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                lines = buffer.split(b"\n")
+                buffer = bytearray(lines.pop())
+                for line in lines:
+                    if oversized:
+                        oversized = False  # tail of a record already rejected as too long
+                        continue
+                    if line.strip():
+                        await records.put((position, TransactionStreamService._parse(position, line, max_bytes)))
+                        position += 1
+                if len(buffer) > max_bytes and not oversized:
+                    await records.put((position, _too_long(position, max_bytes)))
+                    position += 1
+                    oversized = True
+                if oversized:
+                    buffer.clear()
+            if buffer.strip() and not oversized:
+                await records.put((position, TransactionStreamService._parse(position, buffer, max_bytes)))
+        except Exception:
+            await records.put(_END)  # wake the batcher; it re-raises when it awaits the reader
+            raise
+        await records.put(_END)
+
+    @staticmethod
+    def _parse(position: int, line: bytes, max_bytes: int) -> TransactionCreate | TransactionBulkItemOut:
+        if len(line) > max_bytes:
+            return _too_long(position, max_bytes)
+        try:
+            return TransactionCreate.model_validate(json.loads(line))
+        except ValidationError as exc:
+            message = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+        except ValueError as exc:
+            message = f"Invalid JSON: {exc}"
+        return _rejected(position, TRANSACTION_STREAM_INVALID_RECORD, message)
+
+    @staticmethod
+    async def _next_batch(records: asyncio.Queue) -> tuple[list[Record], bool]:
+        """The next micro-batch, and whether the stream has ended."""
+        first = await records.get()
+        if first is _END:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.TRANSACTION_STREAM_MAX_LATENCY_MS / 1000
+        while len(batch) < settings.TRANSACTION_STREAM_BATCH_SIZE:
+            try:
+                record = await asyncio.wait_for(records.get(), timeout=max(deadline - loop.time(), 0))
+            except TimeoutError:
+                break
+            if record is _END:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    @staticmethod
+    def _ingest(batch: list[Record]) -> list[TransactionBulkItemOut]:
+        valid = [(position, record) for position, record in batch if isinstance(record, TransactionCreate)]
+        results = [record for _, record in batch if isinstance(record, TransactionBulkItemOut)]
+        if valid:
+            try:
+                with session_scope() as db:
+                    outcome = TransactionService.create_transactions_bulk(db, [record for _, record in valid])
+                for item in outcome.items:
+                    results.append(item.model_copy(update={"index": valid[item.index][0]}))
+            except Exception:
+                # Keep the stream alive; the batch was rolled back, so report each record as failed.
+                # Details stay in the log: the exception text can carry SQL and parameters.
+                logger.exception(f"TransactionStreamService | batch failed | records={len(valid)}")
+                results.extend(
+                    _rejected(position, TRANSACTION_FAILED, "Batch could not be processed") for position, _ in valid
+                )
+        return sorted(results, key=lambda item: item.index)
+
+    @staticmethod
+    async def _wait_for_agent_backlog() -> None:
+        while await run_in_threadpool(TransactionStreamService._agent_backlog) > settings.AGENT_QUEUE_MAX_BACKLOG:
+            await asyncio.sleep(_BACKLOG_POLL_SECONDS)
+
+    @staticmethod
+    def _agent_backlog() -> int:
+        with session_scope() as db:
+            return AgentJobService.pending(db)
+
+
+def _rejected(position: int, error_code: str, message: str) -> TransactionBulkItemOut:
+    return TransactionBulkItemOut(
+        index=position, transaction_status="rejected", error_code=error_code, error_message=message
+    )
+
+
+def _too_long(position: int, max_bytes: int) -> TransactionBulkItemOut:
+    return _rejected(position, TRANSACTION_STREAM_INVALID_RECORD, f"Record exceeds {max_bytes} bytes")
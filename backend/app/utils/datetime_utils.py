@@ -4,3 +4,8 @@ from datetime import UTC, datetime
 def utc_now() -> datetime:
     """Return the current UTC datetime."""
     return datetime.now(UTC)
+
+
+def to_naive(value: datetime) -> datetime:
+    """Drop tzinfo so in-memory comparisons match how SQLite stores DateTime columns."""
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
@@ -9,6 +9,7 @@ def generate_id(prefix: str) -> str:
       - TXN-XXXXXXX                                           → 7 chars
       - ACC-XXXXXXXXX                                          → 9 chars
       - ORG-XXXX, USR-XXXX                                     → 4 chars
+      - JOB-XXXXXXXXXX                                         → 10 chars
     """
     suffix_lengths = {
         "CUST": 6,
@@ -19,6 +20,7 @@ def generate_id(prefix: str) -> str:
         "ACC": 9,
         "ORG": 4,
         "USR": 4,
+        "JOB": 10,
     }
     length = suffix_lengths.get(prefix, 6)
     suffix = uuid.uuid4().hex[:length].upper()
@@ -0,0 +1,65 @@
+"""Agent worker: runs queued agent analyses from the agent_jobs table.
+
+Usage:
+    python scripts/agent_worker.py [--workers N] [--drain]
+    python scripts/agent_worker.py --async [--concurrency N] [--drain]
+
+Runs N worker threads (AGENT_WORKER_COUNT by default) until SIGINT/SIGTERM, then stops
+claiming and waits for the jobs in progress. With --async, one event loop runs up to N
+jobs at once (AGENT_ASYNC_WORKER_CONCURRENCY by default), awaiting the LLM calls instead
+of blocking threads. With --drain it exits once the queue is empty. Set
+AGENT_WORKER_IN_PROCESS=false on the API when running workers this way.
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+# Ensure the backend package root is on sys.path when running this file directly.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.config.database import init_db
+from app.config.settings import setup_logging
+from app.services.agent_worker import AgentWorkerPool, AsyncAgentWorker
+
+_JOIN_POLL_SECONDS = 1.0
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description="Run queued AML agent jobs.")
+    parser.add_argument("--workers", type=int, default=None, help="worker threads (default AGENT_WORKER_COUNT)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="run jobs on one asyncio event loop")
+    parser.add_argument(
+        "--concurrency", type=int, default=None, help="jobs at once with --async (default AGENT_ASYNC_WORKER_CONCURRENCY)"
+    )
+    parser.add_argument("--drain", action="store_true", help="exit when no queued jobs are left")
+    args = parser.parse_args()
+
+    setup_logging()
+    init_db()
+    if args.use_async:
+        asyncio.run(_run_async(args.concurrency, args.drain))
+        return
+    pool = AgentWorkerPool(args.workers)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: pool.request_stop())
+    pool.start(drain=args.drain)
+    # Join in short steps so the main thread keeps handling signals.
+    while not pool.join(_JOIN_POLL_SECONDS):
+        pass
+
+
+async def _run_async(concurrency: int | None, drain: bool) -> None:
+    worker = AsyncAgentWorker(concurrency)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.request_stop)
+    await worker.run(drain=drain)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,80 @@
+"""Threshold sweep report over the stored transaction history.
+
+Usage:
+    python scripts/threshold_sweep.py --range DEPOSIT_THRESHOLD=5000:20000:2500 \
+        --range VELOCITY_TXN_COUNT=3:8 [--json]
+
+Each range is ``NAME=start:stop[:step]`` (stop inclusive, step defaults to 1).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Ensure the backend package root is on sys.path when running this file directly.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.config.database import SessionLocal, init_db
+from app.rules.backtest import RULE_IDS
+from app.schemas.backtest import ThresholdRange, ThresholdSweepOut
+from app.services.threshold_sweep_service import ThresholdSweepService
+
+
+def parse_range(value: str) -> tuple[str, ThresholdRange]:
+    name, _, spec = value.partition("=")
+    parts = spec.split(":")
+    if not name or len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(f"Expected NAME=start:stop[:step], got '{value}'")
+    try:
+        numbers = [float(p) for p in parts]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Non-numeric range '{value}'") from exc
+    return name, ThresholdRange(start=numbers[0], stop=numbers[1], step=numbers[2] if len(numbers) == 3 else 1.0)
+
+
+def format_table(report: ThresholdSweepOut, names: list[str]) -> str:
+    header = [*names, "alerts", "agent_runs", "llm_cost_usd", "accepted_caught", "rejected_caught"]
+    header += [f"{rule_id}_usd" for rule_id in RULE_IDS]
+    lines = [header]
+    for row in report.rows:
+        lines.append(
+            [
+                *(f"{row.thresholds[name]:g}" for name in names),
+                str(row.alert_count),
+                str(row.agent_invocations),
+                f"{row.estimated_llm_cost_usd:.2f}",
+                f"{row.accepted_cases_caught}/{report.accepted_cases}",
+                f"{row.rejected_cases_caught}/{report.rejected_cases}",
+                *(f"{row.rules[rule_id].estimated_llm_cost_usd:.2f}" for rule_id in RULE_IDS),
+            ]
+        )
+    widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(line, widths, strict=True)) for line in lines)
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(description="Sweep AML rule thresholds over historical transactions.")
+    parser.add_argument("--range", dest="ranges", action="append", type=parse_range, default=[])
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        report = ThresholdSweepService.run(db, dict(args.ranges))
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(report.model_dump(), indent=2))
+    else:
+        print(f"transactions={report.transactions} accepted_cases={report.accepted_cases} "
+              f"rejected_cases={report.rejected_cases} cost/call=${report.llm_cost_per_call_usd}")
+        print(format_table(report, [name for name, _ in args.ranges]))
+
+
+if __name__ == "__main__":
+    run()
@@ -1,16 +1,32 @@
-from app.agents.master_agent import MasterAgent
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+from app.agents import llm_cache
+from app.agents.llm_gate import structured_output
+from app.agents.master_agent import MasterAgent, get_master_agent, reload_master_agent
+from app.agents.prompt_format import CUSTOMER_FIELDS, TRANSACTION_FIELDS
+from app.config.settings import settings
 from app.models.account import Account
+from app.models.agent_job import AgentJob
 from app.models.alert import Alert
 from app.models.customer import Customer
 from app.models.transaction import Transaction
 from app.repositories.case_repository import CaseRepository
+from app.schemas.case import CaseDecisionCreate
+from app.services.agent_job_service import AgentJobService
+from app.services.agent_worker import AgentWorker, AgentWorkerPool, AsyncAgentWorker
+from app.services.case_service import CaseService
 from app.utils.datetime_utils import utc_now
 from app.utils.id_generator import generate_id
 
 
-def _seed_account_with_alert(db_session):
+def _seed_account_with_alert(db_session, suffix="1", severity="high"):
     customer = Customer(
-        customer_id="CUST-AGENT-1",
+        customer_id=f"CUST-AGENT-{suffix}",
         customer_type="individual",
         full_name="Agent User",
         date_of_birth="1990-01-01",
@@ -33,7 +49,7 @@ def _seed_account_with_alert(db_session):
         updated_by="test",
     )
     account = Account(
-        account_number="ACC-AGENT-1",
+        account_number=f"ACC-AGENT-{suffix}",
         customer_id=customer.customer_id,
         account_type="trading",
         account_status="active",
@@ -60,7 +76,7 @@ def _seed_account_with_alert(db_session):
         alert_id=generate_id("ALERT"),
         account_number=account.account_number,
         alert_type="High Deposit",
-        severity="high",
+        severity=severity,
         rule_id="RULE-01",
         description="test",
         triggered_date=utc_now(),
@@ -77,3 +93,321 @@ def test_master_agent_creates_case(db_session):
 
     fetched = CaseRepository.get_by_id(db_session, case.case_id)
     assert fetched is not None
+
+
+def test_queued_run_analyses_the_alerts_own_transaction(db_session, monkeypatch):
+    alert_id = _seed_account_with_alert(db_session, suffix="2")
+    alert = db_session.get(Alert, alert_id)
+    flagged = Transaction(
+        transaction_id=generate_id("TXN"),
+        account_number="ACC-AGENT-2",
+        transaction_amount=20000.0,
+        transaction_currency="USD",
+        transaction_date=utc_now() - timedelta(hours=1),
+        transaction_type="deposit",
+        transaction_status="held",
+    )
+    db_session.add(flagged)
+    alert.transaction_id = flagged.transaction_id
+    db_session.commit()
+
+    master = MasterAgent()
+    seen = {}
+    invoke = master.graph.invoke
+
+    def capture(state):
+        seen.update(state)
+        return invoke(state)
+
+    monkeypatch.setattr(master.graph, "invoke", capture)
+    master.run_for_alert(db_session, alert_id)
+
+    # A newer transaction exists for the account; the state must still describe the flagged one.
+    assert seen["transaction_id"] == flagged.transaction_id
+    assert seen["current_transaction"]["transaction_amount"] == 20000.0
+    # Only the serialized columns reach the state: no ORM internals, audit columns or identifiers.
+    assert set(seen["current_transaction"]) == set(TRANSACTION_FIELDS)
+    assert all(set(row) == set(TRANSACTION_FIELDS) for row in seen["transaction_history"])
+    assert set(seen["customer_profile"]) == set(CUSTOMER_FIELDS)
+    # Statistics cover every transaction of the account, not only the recent rows.
+    assert seen["account_features"]["history_count"] == 2
+
+
+def test_triage_closes_clear_false_positives_without_the_graph(db_session, monkeypatch):
+    alert_id = _seed_account_with_alert(db_session, "T1", severity="medium")
+    master = MasterAgent()
+
+    def fail(state):
+        raise AssertionError("graph should not run")
+
+    monkeypatch.setattr(master.graph, "invoke", fail)
+    case = master.run_for_alert(db_session, alert_id)
+
+    assert case.case_summary.startswith("Classification: false_positive. Closed by rules-only triage")
+    assert case.behavoir_agent_score is None
+    assert CaseRepository.get_documents(db_session, case.case_id) == []
+
+
+def test_triage_sends_accounts_with_accepted_cases_through_the_graph(db_session):
+    first = MasterAgent().run_for_alert(db_session, _seed_account_with_alert(db_session, "T2"))
+    CaseService.create_decision(
+        db_session,
+        first.case_id,
+        CaseDecisionCreate(decision="ACCEPT", decision_by="analyst", decision_reason="confirmed"),
+    )
+    medium = _second_alert(db_session, first.alert_id)
+
+    case = MasterAgent().run_for_alert(db_session, medium.alert_id)
+
+    assert case.behavoir_agent_summary.startswith("Local scoring")  # the agents ran, without an LLM
+
+
+def _second_alert(db_session, alert_id):
+    alert = db_session.get(Alert, alert_id)
+    other = Alert(
+        alert_id=generate_id("ALERT"),
+        account_number=alert.account_number,
+        alert_type="Velocity",
+        severity="medium",
+        rule_id="RULE-04",
+        description="test",
+        triggered_date=utc_now(),
+    )
+    db_session.add(other)
+    db_session.commit()
+    return other
+
+
+def test_claims_serialize_jobs_per_account(db_session):
+    AgentWorker(worker_id="cleanup").drain()  # jobs queued by earlier tests
+    first = AgentJobService.enqueue(db_session, db_session.get(Alert, _seed_account_with_alert(db_session, "3")))
+    second = AgentJobService.enqueue(db_session, _second_alert(db_session, first.alert_id))
+    other = AgentJobService.enqueue(db_session, db_session.get(Alert, _seed_account_with_alert(db_session, "4")))
+
+    assert AgentJobService.claim(db_session, "w1").job_id == first.job_id
+    # The account's next job waits for the running one; another account's job does not.
+    assert AgentJobService.claim(db_session, "w2").job_id == other.job_id
+    assert AgentJobService.claim(db_session, "w3") is None
+
+    AgentJobService.complete(db_session, db_session.get(AgentJob, first.job_id), case_id=None)
+    assert AgentJobService.claim(db_session, "w3").job_id == second.job_id
+
+
+def test_worker_pool_runs_accounts_in_parallel_and_jobs_of_one_account_in_order(db_session):
+    jobs = []
+    for suffix in ("5", "6"):
+        alert_id = _seed_account_with_alert(db_session, suffix)
+        jobs.append(AgentJobService.enqueue(db_session, db_session.get(Alert, alert_id)))
+        for _ in range(2):
+            jobs.append(AgentJobService.enqueue(db_session, _second_alert(db_session, alert_id)))
+    job_ids = [job.job_id for job in jobs]
+    accounts = {job.alert_id: job.account_number for job in jobs}
+
+    master = MasterAgent()
+    run_for_alert = master.run_for_alert
+    events = []
+
+    def recorded(db, alert_id, context=None):
+        # Recorded by the workers themselves: claim timestamps are taken before the claim
+        # waits for the database write lock, so they cannot show the order runs happened in.
+        events.append(("start", alert_id))
+        case = run_for_alert(db, alert_id, context)
+        events.append(("end", alert_id))
+        return case
+
+    master.run_for_alert = recorded
+    AgentWorkerPool(count=3, master_agent=master).drain()
+
+    db_session.expire_all()
+    finished = [AgentJobService.get_job(db_session, job_id) for job_id in job_ids]
+    assert {job.job_status for job in finished} == {"completed"}
+    for account_number in ("ACC-AGENT-5", "ACC-AGENT-6"):
+        runs = [event for event in events if accounts[event[1]] == account_number]
+        queued = [job.alert_id for job in jobs if job.account_number == account_number]
+        assert runs == [(kind, alert_id) for alert_id in queued for kind in ("start", "end")]
+
+
+def test_shared_master_agent_is_reused_until_provider_settings_change(monkeypatch):
+    shared = get_master_agent()
+    assert get_master_agent() is shared
+
+    monkeypatch.setattr(settings, "OPENAI_MODEL", "another-model")
+    changed = get_master_agent()
+    assert changed is not shared
+    assert get_master_agent() is changed
+    assert reload_master_agent() is not changed
+
+
+def test_structured_output_runnables_are_cached_per_model_and_schema():
+    class FakeLLM:
+        built = 0
+
+        def with_structured_output(self, schema):
+            FakeLLM.built += 1
+            return (self, schema)
+
+    llm, other = FakeLLM(), FakeLLM()
+    assert structured_output(llm, dict) is structured_output(llm, dict)
+    assert structured_output(llm, list) != structured_output(other, list)
+    assert FakeLLM.built == 3
+
+
+class _ConcurrencyLLM:
+    """Fake chat model whose structured calls take a while and record how many overlap."""
+
+    def __init__(self, score=60.0):
+        self.score = score
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+        self.calls = []
+
+    def with_structured_output(self, schema):
+        return _ConcurrencyRunnable(self, schema)
+
+
+class _ConcurrencyRunnable:
+    def __init__(self, llm, schema):
+        self.llm, self.schema = llm, schema
+
+    def _enter(self):
+        with self.llm.lock:
+            self.llm.active += 1
+            self.llm.peak = max(self.llm.peak, self.llm.active)
+            self.llm.calls.append(self.schema.__name__)
+
+    def _exit(self):
+        with self.llm.lock:
+            self.llm.active -= 1
+        fields = self.schema.model_fields.items()
+        values = {name: self.llm.score if field.annotation is float else "fake" for name, field in fields}
+        return self.schema(**values)
+
+    def invoke(self, prompt):
+        self._enter()
+        time.sleep(0.1)
+        return self._exit()
+
+    async def ainvoke(self, prompt):
+        self._enter()
+        await asyncio.sleep(0.1)
+        return self._exit()
+
+
+def _graph_state():
+    return {
+        "alert_id": "ALERT-X",
+        "account_number": "ACC-X",
+        "transaction_id": "TXN-X",
+        "customer_profile": {},
+        "account_info": {},
+        "transaction_history": [],
+        "current_transaction": {},
+        "existing_alerts": [],
+        "high_risk_info": None,
+        "account_features": {"history_count": 0},
+    }
+
+
+def test_analysts_fan_out_and_join_before_evidence():
+    master = MasterAgent()
+    master.llm = _ConcurrencyLLM()
+
+    with llm_cache.bypass():
+        result = master.graph.invoke(_graph_state())
+
+    assert master.llm.peak == 3
+    assert set(master.llm.calls[:3]) == {"BehavioralOutput", "NetworkOutput", "ContextualOutput"}
+    assert master.llm.calls[3:] == ["EvidenceOutput", "FalsePositiveOutput", "DocumentOutput"]
+    assert result["case_score_percentage"] == 60.0
+
+
+def test_false_positive_classification_skips_the_document():
+    master = MasterAgent()
+    master.llm = _ConcurrencyLLM(score=10.0)
+
+    with llm_cache.bypass():
+        result = master.graph.invoke(_graph_state())
+
+    assert result["case_classification"] == "false_positive"
+    assert "DocumentOutput" not in master.llm.calls
+    assert "document_content" not in result
+
+
+def test_async_graph_awaits_the_analysts_concurrently():
+    master = MasterAgent()
+    master.llm = _ConcurrencyLLM()
+
+    with llm_cache.bypass():
+        result = asyncio.run(master.graph.ainvoke(_graph_state()))
+
+    assert master.llm.peak == 3
+    assert result["behavioral_score"] == result["network_score"] == result["contextual_score"] == 60.0
+    assert result["document_content"] == "fake"
+
+
+class _FailingLLM(_ConcurrencyLLM):
+    """Fake chat model whose network calls raise and whose contextual calls never return."""
+
+    def with_structured_output(self, schema):
+        if schema.__name__ == "NetworkOutput":
+            return _Raising()
+        if schema.__name__ == "ContextualOutput":
+            return _Hanging()
+        return super().with_structured_output(schema)
+
+
+class _Raising:
+    def invoke(self, prompt):
+        raise RuntimeError("provider unavailable")
+
+    async def ainvoke(self, prompt):
+        self.invoke(prompt)
+
+
+class _Hanging:
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(60)
+
+
+def test_failed_or_timed_out_agents_fall_back_to_local_scoring(monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_LLM_TIMEOUT_SECONDS", 0.3)
+    master = MasterAgent()
+    master.llm = _FailingLLM()
+
+    with llm_cache.bypass():
+        result = asyncio.run(master.graph.ainvoke(_graph_state()))
+
+    assert result["behavioral_score"] == 60.0  # the LLM answered this one
+    assert result["network_summary"].startswith("Local scoring")
+    assert result["contextual_summary"].startswith("Local scoring")
+    assert result["document_content"] == "fake"
+
+    monkeypatch.setattr(settings, "AGENT_LOCAL_FALLBACK_ENABLED", False)
+    with llm_cache.bypass(), pytest.raises(RuntimeError):
+        master.graph.invoke(_graph_state())
+
+
+def test_arun_for_alert_creates_case(db_session):
+    alert_id = _seed_account_with_alert(db_session, "7")
+
+    case = asyncio.run(MasterAgent().arun_for_alert(db_session, alert_id))
+
+    assert case.alert_id == alert_id
+    assert CaseRepository.get_by_id(db_session, case.case_id) is not None
+
+
+def test_async_worker_runs_jobs_of_different_accounts_concurrently(db_session):
+    AgentWorker(worker_id="cleanup").drain()  # jobs queued by earlier tests
+    job_ids = [
+        AgentJobService.enqueue(db_session, db_session.get(Alert, _seed_account_with_alert(db_session, suffix))).job_id
+        for suffix in ("8", "9")
+    ]
+    master = MasterAgent()
+    master.llm = _ConcurrencyLLM()
+
+    ran = asyncio.run(AsyncAgentWorker(concurrency=4, master_agent=master).drain())
+
+    assert ran == 2
+    assert master.llm.peak == 6  # both jobs' analysts were awaiting the LLM together
+    db_session.expire_all()
+    assert {AgentJobService.get_job(db_session, job_id).job_status for job_id in job_ids} == {"completed"}
@@ -0,0 +1,163 @@
+from datetime import timedelta
+
+import pytest
+
+from app.config.settings import settings
+from app.exceptions.base_exception import ValidationException
+from app.models.account import Account
+from app.models.alert import Alert
+from app.models.case import Case
+from app.models.case_decision import CaseDecision
+from app.models.customer import Customer
+from app.models.transaction import Transaction
+from app.rules.backtest import BacktestEngine, TransactionColumns
+from app.rules.rule_engine import RuleEngine
+from app.schemas.backtest import ThresholdRange
+from app.services.threshold_sweep_service import ThresholdSweepService
+from app.utils.datetime_utils import utc_now
+from app.utils.id_generator import generate_id
+
+
+def _seed_account(db_session, suffix="1"):
+    customer = Customer(
+        customer_id=f"CUST-BT-{suffix}",
+        customer_type="individual",
+        full_name="Backtest User",
+        date_of_birth="1990-01-01",
+        nationality="US",
+        residency_country="US",
+        id_type="SSN",
+        id_number=f"666-66-666{suffix}",
+        phone="+1-555-0106",
+        email="backtest@example.com",
+        address_line1="66 Backtest St",
+        address_city="Austin",
+        address_country="US",
+        kyc_status="verified",
+        kyc_verified_date="2025-01-01",
+        kyc_expired_date=None,
+        risk_rating="low",
+        created_date=utc_now(),
+        updated_date=utc_now(),
+        created_by="test",
+        updated_by="test",
+    )
+    account = Account(
+        account_number=f"ACC-BT-{suffix}",
+        customer_id=customer.customer_id,
+        account_type="trading",
+        account_status="active",
+        opened_date="2024-01-01",
+        branch_code="AUS",
+        balance_amount=1000.0,
+        balance_currency="USD",
+        created_date=utc_now(),
+        updated_date=utc_now(),
+        created_by="test",
+        updated_by="test",
+    )
+    db_session.add_all([customer, account])
+    db_session.commit()
+
+
+def _txn(txn_type, amount, when, country=None, account_number="ACC-BT-1"):
+    return Transaction(
+        transaction_id=generate_id("TXN"),
+        account_number=account_number,
+        transaction_amount=amount,
+        transaction_currency="USD",
+        transaction_date=when,
+        transaction_type=txn_type,
+        transaction_status="completed",
+        deposit_source_country=country,
+    )
+
+
+def test_backtest_matches_rule_engine(db_session, monkeypatch):
+    _seed_account(db_session)
+    t0 = utc_now() - timedelta(days=5)
+    txns = [
+        _txn("trade-buy", 700.0, t0),
+        _txn("trade-sell", 700.4, t0 + timedelta(days=2)),
+        _txn("deposit", 20000.0, t0 + timedelta(days=3), "US"),
+        *[_txn("deposit", 50.0, t0 + timedelta(days=3, minutes=i + 1), "GB") for i in range(5)],
+        _txn("withdrawal", 100.0, t0 + timedelta(days=3, hours=5)),
+        _txn("withdrawal", 100.0, t0 + timedelta(days=4, hours=6)),
+    ]
+    db_session.add_all(txns)
+    db_session.commit()
+    ids = {t.transaction_id for t in txns}
+
+    expected: dict[str, set[str]] = {}
+    for txn_id, alerts in RuleEngine().evaluate_batch(db_session, txns).items():
+        for alert in alerts:
+            expected.setdefault(alert.rule_id, set()).add(txn_id)
+
+    engine = BacktestEngine(TransactionColumns.load(db_session))
+    result = engine.evaluate()
+    actual = {
+        rule_id: {t for t in txn_ids if t in ids}
+        for rule_id, txn_ids in result.alert_transaction_ids.items()
+        if any(t in ids for t in txn_ids)
+    }
+    assert actual == expected
+
+    low, high = engine.run_grid({"DEPOSIT_THRESHOLD": [40.0, 50000.0]})
+    assert low.hits["RULE-01"] > high.hits["RULE-01"]
+    assert low.thresholds["DEPOSIT_THRESHOLD"] == 40.0
+
+    # Primary alerts follow the rules' current severities.
+    monkeypatch.setattr(settings, "CROSS_BORDER_ALERT_SEVERITY", "low")
+    demoted = engine.evaluate()
+    assert demoted.primary_hits["RULE-04"] == result.hits["RULE-04"] > result.primary_hits["RULE-04"]
+    assert demoted.primary_hits["RULE-05"] == result.primary_hits["RULE-05"] - result.hits["RULE-04"]
+
+
+def test_threshold_sweep_reports_cost_and_accepted_cases(db_session):
+    _seed_account(db_session, suffix="2")
+    deposit = _txn("deposit", 30000.0, utc_now() - timedelta(days=30), "US", account_number="ACC-BT-2")
+    alert = Alert(
+        alert_id=generate_id("ALERT"),
+        account_number="ACC-BT-2",
+        transaction_id=deposit.transaction_id,
+        alert_type="High Value Deposit",
+        severity="high",
+        rule_id="RULE-01",
+        description="test",
+        triggered_date=utc_now(),
+    )
+    case = Case(
+        case_id=generate_id("CASE"),
+        alert_id=alert.alert_id,
+        account_number="ACC-BT-2",
+        transaction_id=deposit.transaction_id,
+        case_opened_date=utc_now(),
+        case_summary="test",
+    )
+    decision = CaseDecision(
+        case_id=case.case_id,
+        decision="ACCEPT",
+        decision_by="tester",
+        decision_date=utc_now(),
+        decision_reason="confirmed",
+        next_action="file SAR",
+    )
+    db_session.add(deposit)
+    db_session.commit()
+    db_session.add_all([alert, case])
+    db_session.commit()
+    db_session.add(decision)
+    db_session.commit()
+
+    report = ThresholdSweepService.run(
+        db_session, {"DEPOSIT_THRESHOLD": ThresholdRange(start=20000, stop=40000, step=20000)}, refresh=True
+    )
+    low, high = report.rows
+    assert [row.thresholds["DEPOSIT_THRESHOLD"] for row in report.rows] == [20000, 40000]
+    assert low.accepted_cases_caught == high.accepted_cases_caught + 1
+    assert low.rules["RULE-01"].alerts > high.rules["RULE-01"].alerts
+    assert low.agent_invocations == sum(rule.agent_invocations for rule in low.rules.values())
+    assert low.estimated_llm_calls == low.agent_invocations * report.llm_calls_per_case
+
+    with pytest.raises(ValidationException):
+        ThresholdSweepService.run(db_session, {"UNKNOWN": ThresholdRange(start=1, stop=2)})
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.agents.features import account_features
+
+START = datetime(2025, 1, 6, 9, 0)
+
+
+def _rows():
+    return [
+        (100.0, START, "deposit", "US"),
+        (300.0, START + timedelta(hours=1), "deposit", "GB"),
+        (200.0, START + timedelta(hours=3), "withdrawal", None),
+        (400.0, START + timedelta(days=1), "trade-buy", "US"),
+    ]
+
+
+def test_account_features_summarise_the_history():
+    features = account_features(_rows(), {"transaction_amount": 700.0})
+
+    assert features["history_count"] == 4
+    assert features["amount_mean"] == 250.0
+    assert features["amount_std"] == pytest.approx(111.8, abs=0.01)
+    assert (features["amount_p50"], features["amount_max"]) == (250.0, 400.0)
+    assert (features["deposit_count"], features["withdrawal_count"]) == (2, 1)
+    assert features["deposit_withdrawal_ratio"] == 2.0
+    assert features["interarrival_min_seconds"] == 3600.0
+    assert features["interarrival_median_seconds"] == 7200.0
+    assert features["hour_histogram"][9] == 2 and features["hour_histogram"][10] == 1
+    assert sum(features["hour_histogram"]) == 4
+    assert features["distinct_source_countries"] == ["GB", "US"]
+    assert features["current_amount_zscore"] == pytest.approx(4.02, abs=0.01)
+
+
+def test_account_features_handle_sparse_history():
+    assert account_features([], None) == {"history_count": 0}
+
+    single = account_features([(50.0, START, "deposit", None)], {"transaction_amount": 50.0})
+    assert single["history_count"] == 1
+    assert single["deposit_withdrawal_ratio"] is None
+    assert single["interarrival_min_seconds"] is None
+    assert single["current_amount_zscore"] is None
@@ -2,6 +2,7 @@ from app.models.account import Account
 from app.models.customer import Customer
 from app.repositories.case_repository import CaseRepository
 from app.repositories.transaction_repository import TransactionRepository
+from app.services.agent_worker import AgentWorker
 from app.utils.datetime_utils import utc_now
 
 
@@ -64,6 +65,10 @@ def test_full_pipeline(client, standard_headers, db_session):
     txn_id = create_resp.json()["data"]["transaction_id"]
     txn = TransactionRepository.get_by_id(db_session, txn_id)
     assert txn.transaction_status == "held"
+    assert create_resp.json()["data"]["agent_job_id"]
+
+    # Agent analysis runs in a worker, not in the request.
+    AgentWorker(worker_id="e2e-worker").drain()
 
     cases = CaseRepository.list(db_session, offset=0, limit=10)
     assert len(cases) >= 1
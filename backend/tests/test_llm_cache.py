@@ -0,0 +1,136 @@
+import asyncio
+from datetime import timedelta
+
+from pydantic import BaseModel
+
+from app.agents import llm_cache
+from app.agents.llm_gate import ainvoke_structured, invoke_structured
+from app.agents.master_agent import MasterAgent
+from app.config.database import session_scope
+from app.config.settings import settings
+from app.models.llm_cache_entry import LlmCacheEntry
+from app.repositories.llm_cache_repository import LlmCacheRepository
+from app.utils.datetime_utils import utc_now
+
+
+class Verdict(BaseModel):
+    score: float
+    summary: str
+
+
+class CountingLLM:
+    """Fake chat model that answers every structured call and counts them."""
+
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        return _Answer(self, schema)
+
+
+class _Answer:
+    def __init__(self, llm, schema):
+        self.llm, self.schema = llm, schema
+
+    def invoke(self, prompt):
+        self.llm.calls += 1
+        fields = self.schema.model_fields
+        # Scores high enough for the graph to draft a document (false positives get none).
+        return self.schema(**{name: 50.0 + self.llm.calls if fields[name].annotation is float else "fresh" for name in fields})
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+
+def _graph_state(account_number):
+    return {
+        "alert_id": "ALERT-CACHE",
+        "account_number": account_number,
+        "transaction_id": "TXN-CACHE",
+        "customer_profile": {},
+        "account_info": {"account_number": account_number},
+        "transaction_history": [],
+        "current_transaction": {},
+        "existing_alerts": [],
+        "high_risk_info": None,
+        "account_features": {"history_count": 0},
+    }
+
+
+def test_identical_prompts_are_answered_from_the_cache(db_session):
+    llm = CountingLLM()
+    first = invoke_structured(llm, Verdict, "cache-test", "prompt A")
+    again = invoke_structured(llm, Verdict, "cache-test", "prompt A")
+    async_again = asyncio.run(ainvoke_structured(llm, Verdict, "cache-test", "prompt A"))
+
+    assert llm.calls == 1
+    assert again == async_again == first
+    entry = db_session.get(LlmCacheEntry, llm_cache.cache_key(llm, "cache-test", Verdict, "prompt A"))
+    assert (entry.model, entry.agent, entry.hit_count) == ("fake-model", "cache-test", 2)
+
+    invoke_structured(llm, Verdict, "cache-test", "prompt B")
+    invoke_structured(llm, Verdict, "other-agent", "prompt A")
+    assert llm.calls == 3
+
+
+def test_bypass_forces_a_fresh_call_and_replaces_the_entry():
+    llm = CountingLLM()
+    invoke_structured(llm, Verdict, "bypass-test", "prompt")
+    with llm_cache.bypass():
+        fresh = invoke_structured(llm, Verdict, "bypass-test", "prompt")
+    assert llm.calls == 2
+    assert invoke_structured(llm, Verdict, "bypass-test", "prompt") == fresh
+
+
+def test_graph_rerun_reuses_responses_unless_refreshed():
+    master = MasterAgent()
+    master.llm = CountingLLM()
+    state = _graph_state("ACC-CACHE-GRAPH")
+
+    master.graph.invoke(state)
+    assert master.llm.calls == 6
+    master.graph.invoke(state)
+    asyncio.run(master.graph.ainvoke(state))
+    assert master.llm.calls == 6
+    with llm_cache.bypass():
+        master.graph.invoke(state)
+    assert master.llm.calls == 12
+
+
+def test_expired_entries_are_ignored_and_pruned(db_session, monkeypatch):
+    llm = CountingLLM()
+    invoke_structured(llm, Verdict, "ttl-test", "prompt")
+    monkeypatch.setattr(settings, "LLM_CACHE_TTL_SECONDS", 0)
+
+    invoke_structured(llm, Verdict, "ttl-test", "prompt")
+    assert llm.calls == 2
+    with session_scope() as db:
+        assert llm_cache.prune(db) >= 1
+    assert db_session.query(LlmCacheEntry).filter(LlmCacheEntry.agent == "ttl-test").count() == 0
+
+
+def test_prune_keeps_the_most_recently_used_entries(db_session, monkeypatch):
+    db_session.query(LlmCacheEntry).delete()
+    now = utc_now()
+    for index in range(3):
+        db_session.add(
+            LlmCacheEntry(
+                cache_key=f"lru-{index}",
+                provider="gemini",
+                model="fake-model",
+                agent="lru-test",
+                response="{}",
+                created_date=now,
+                last_used_date=now - timedelta(minutes=10 - index),
+            )
+        )
+    db_session.commit()
+    LlmCacheRepository.touch(db_session, "lru-0", now)
+    monkeypatch.setattr(settings, "LLM_CACHE_MAX_ENTRIES", 2)
+
+    with session_scope() as db:
+        assert llm_cache.prune(db) == 1
+    db_session.expire_all()
+    assert {entry.cache_key for entry in db_session.query(LlmCacheEntry)} == {"lru-0", "lru-2"}
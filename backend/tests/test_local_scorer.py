@@ -0,0 +1,57 @@
+from app.agents import local_scorer
+
+
+def _state(**overrides):
+    state = {
+        "alert_id": "ALERT-LOCAL",
+        "account_number": "ACC-LOCAL",
+        "transaction_id": "TXN-LOCAL",
+        "customer_profile": {"risk_rating": "low", "kyc_status": "verified", "residency_country": "US"},
+        "account_info": {},
+        "transaction_history": [],
+        "current_transaction": {"transaction_amount": 100.0, "deposit_source_country": "US"},
+        "existing_alerts": [],
+        "high_risk_info": None,
+        "account_features": {"history_count": 0},
+    }
+    state.update(overrides)
+    return state
+
+
+def test_behavioral_scores_the_amount_against_the_full_history():
+    usual = {"history_count": 40, "current_amount_zscore": 0.2, "amount_p99": 500.0}
+    outlier = {"history_count": 40, "current_amount_zscore": 6.0, "amount_p99": 500.0, "interarrival_min_seconds": 60.0}
+
+    calm = local_scorer.behavioral(_state(account_features=usual))
+    anomalous = local_scorer.behavioral(
+        _state(account_features=outlier, current_transaction={"transaction_amount": 9000.0})
+    )
+
+    assert calm["behavioral_score"] == 3.0
+    assert anomalous["behavioral_score"] == 90.0
+    assert anomalous["behavioral_summary"].startswith("Local scoring: amount z-score 6.0")
+
+
+def test_contextual_and_evidence_follow_kyc_risk_and_rule_hits():
+    risky_customer = {"risk_rating": "high", "kyc_status": "expired", "residency_country": "US"}
+    alerts = [
+        {"transaction_id": "TXN-LOCAL", "severity": "high", "rule_id": "RULE-01"},
+        {"transaction_id": "TXN-OLD", "severity": "medium", "rule_id": "RULE-04"},
+    ]
+
+    assert local_scorer.contextual(_state())["contextual_score"] == 10.0
+    assert local_scorer.contextual(_state(customer_profile=risky_customer, high_risk_info={"x": 1}))[
+        "contextual_score"
+    ] == 100.0
+    evidence = local_scorer.evidence(_state(existing_alerts=alerts))
+    assert evidence["evidence_score"] == 37.5
+    assert "rules RULE-01 on this transaction" in evidence["evidence_summary"]
+
+
+def test_network_counts_funding_sources_countries_and_alerts():
+    history = [{"deposit_source_value": f"IBAN-{i % 3}"} for i in range(9)]
+    features = {"history_count": 9, "distinct_source_countries": ["GB", "US", "SG"]}
+
+    result = local_scorer.network(_state(transaction_history=history, account_features=features, existing_alerts=[{}, {}]))
+
+    assert result["network_score"] == 30.0 + 20.0 + 10.0
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from app.agents import behavioral_analyst
+from app.agents.prompt_format import estimate_tokens, format_record, format_table
+from app.config.settings import settings
+
+COLUMNS = ("transaction_date", "transaction_type", "transaction_amount")
+
+
+def _history(count):
+    start = datetime(2025, 1, 1)
+    # Newest first, like get_transaction_history; one outlier deep in the history.
+    return [
+        {
+            "transaction_id": f"TXN-{index:03d}",
+            "transaction_date": start - timedelta(days=index),
+            "transaction_type": "deposit",
+            "transaction_amount": 99000.0 if index == 40 else 100.0 + index,
+        }
+        for index in range(count)
+    ]
+
+
+def test_format_record_is_dense_and_skips_empty_values():
+    record = {"transaction_amount": 2500.5, "transaction_date": datetime(2025, 3, 1, 9, 30), "purpose": None}
+    assert format_record(record) == "transaction_amount=2500.5; transaction_date=2025-03-01 09:30:00"
+    assert format_record(None) == "none"
+
+
+def test_format_table_keeps_everything_that_fits():
+    table = format_table(_history(3), COLUMNS, max_tokens=500)
+    assert table.splitlines() == [
+        "transaction_date,transaction_type,transaction_amount",
+        "2025-01-01 00:00:00,deposit,100",
+        "2024-12-31 00:00:00,deposit,101",
+        "2024-12-30 00:00:00,deposit,102",
+    ]
+
+
+def test_format_table_trims_to_budget_keeping_recent_rows_and_outliers():
+    rows = _history(50)
+    table = format_table(rows, COLUMNS, max_tokens=200, weight="transaction_amount")
+    lines = table.splitlines()
+
+    assert estimate_tokens(table) <= 200
+    assert lines[1] == "2025-01-01 00:00:00,deposit,100"  # the newest row
+    assert "2024-11-22 00:00:00,deposit,99000" in lines  # the largest amount, far back
+    assert lines[-1].startswith(f"... {50 - (len(lines) - 2)} of 50 rows omitted (total transaction_amount ")
+
+
+def test_agent_prompt_respects_its_token_budget(monkeypatch):
+    state = {
+        "customer_profile": {"customer_type": "individual", "risk_rating": "low"},
+        "account_info": {"account_type": "trading"},
+        "current_transaction": _history(1)[0],
+        "transaction_history": _history(50),
+        "account_features": {"history_count": 50, "hour_histogram": [0] * 23 + [50]},
+    }
+    full = behavioral_analyst._prompt(state)
+    monkeypatch.setattr(settings, "AGENT_PROMPT_TOKEN_BUDGETS", {"behavioral": 300})
+
+    trimmed = behavioral_analyst._prompt(state)
+    assert estimate_tokens(trimmed) <= 300 < estimate_tokens(full)
+    assert "rows omitted" in trimmed
@@ -1,15 +1,32 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.config.database import engine
+from app.config.settings import settings
+from app.exceptions.base_exception import ValidationException
 from app.models.account import Account
 from app.models.customer import Customer
+from app.models.high_risk_account import HighRiskAccount
 from app.models.transaction import Transaction
+from app.repositories.account_repository import AccountRepository
 from app.repositories.alert_repository import AlertRepository
+from app.rules.declarative_rule import DeclarativeRule
+from app.rules.rule_context import RuleContext
+from app.rules.rule_dsl import BUILTIN_DEFINITIONS_PATH, load_rule_specs, parse_rule_spec
+from app.rules.rule_engine import RuleEngine
+from app.rules.rule_sql import RuleSetQuery
+from app.rules.rule_stats import rule_stats
 from app.services.transaction_service import TransactionService
 from app.schemas.transaction import TransactionCreate
 from app.utils.datetime_utils import utc_now
+from app.utils.id_generator import generate_id
 
 
-def _seed_customer_account(db_session):
+def _seed_customer_account(db_session, suffix: str = "1"):
     customer = Customer(
-        customer_id="CUST-RULE-1",
+        customer_id=f"CUST-RULE-{suffix}",
         customer_type="individual",
         full_name="Rule User",
         date_of_birth="1990-01-01",
@@ -32,7 +49,7 @@ def _seed_customer_account(db_session):
         updated_by="test",
     )
     account = Account(
-        account_number="ACC-RULE-1",
+        account_number=f"ACC-RULE-{suffix}",
         customer_id=customer.customer_id,
         account_type="trading",
         account_status="active",
@@ -67,3 +84,227 @@ def test_high_deposit_triggers_alert(db_session):
 
     alerts = AlertRepository.list(db_session, offset=0, limit=10, account_number="ACC-RULE-1")
     assert len(alerts) >= 1
+
+
+def _txn(account_number, txn_type, amount, when, country=None):
+    return Transaction(
+        transaction_id=generate_id("TXN"),
+        account_number=account_number,
+        transaction_amount=amount,
+        transaction_currency="USD",
+        transaction_date=when,
+        transaction_type=txn_type,
+        transaction_status="completed",
+        deposit_source_country=country,
+    )
+
+
+def test_evaluate_batch_matches_rules(db_session):
+    _seed_customer_account(db_session, suffix="2")
+    start = utc_now() - timedelta(hours=2)
+    deposits = [_txn("ACC-RULE-2", "deposit", 100.0, start + timedelta(minutes=i), "US") for i in range(5)]
+    withdrawal = _txn("ACC-RULE-2", "withdrawal", 50.0, start + timedelta(hours=1, minutes=30))
+    buy = _txn("ACC-RULE-2", "trade-buy", 500.0, start + timedelta(hours=1, minutes=31))
+    sell = _txn("ACC-RULE-2", "trade-sell", 500.5, start + timedelta(hours=1, minutes=32))
+    cross_border = _txn("ACC-RULE-2", "deposit", 100.0, start + timedelta(hours=1, minutes=40), "GB")
+    batch = [*deposits, withdrawal, buy, sell, cross_border]
+    db_session.add_all(batch)
+    db_session.commit()
+    ids = [t.transaction_id for t in batch]
+
+    results = RuleEngine().evaluate_batch(db_session, list(reversed(batch)))
+
+    rule_ids = {txn_id: sorted(a.rule_id for a in alerts) for txn_id, alerts in results.items()}
+    assert rule_ids[ids[3]] == []
+    assert rule_ids[ids[4]] == ["RULE-04"]
+    assert rule_ids[ids[5]] == ["RULE-03"]
+    assert rule_ids[ids[6]] == []
+    assert rule_ids[ids[7]] == ["RULE-02"]
+    assert rule_ids[ids[8]] == ["RULE-05"]
+    persisted = AlertRepository.count(db_session, account_number="ACC-RULE-2")
+    assert persisted == sum(len(alerts) for alerts in results.values())
+
+
+def test_rules_read_prefetched_context(db_session):
+    _seed_customer_account(db_session, suffix="3")
+    txn = _txn("ACC-RULE-3", "deposit", 100.0, utc_now(), "US")
+    db_session.add(txn)
+    db_session.commit()
+
+    engine = RuleEngine()
+    account = db_session.get(Account, "ACC-RULE-3")
+    context = engine.load_context(db_session, txn, account)
+    assert context.customer.customer_id == "CUST-RULE-3"
+    assert context.high_risk is None
+    assert txn.transaction_id in context.history
+
+    context.high_risk = HighRiskAccount(
+        account_number="ACC-RULE-3",
+        high_risk_flag=1,
+        overall_risk_score=90,
+        risk_source="test",
+        risk_reason="watchlist",
+        detected_date=utc_now(),
+    )
+    alerts = engine.evaluate_transaction(db_session, txn, account, context)
+    assert [a.rule_id for a in alerts] == ["RULE-06"]
+    assert "rule_id" in alerts[0].__dict__  # committed without being expired
+    assert AlertRepository.get_by_id(db_session, alerts[0].alert_id) is alerts[0]
+
+
+def test_declarative_rules_match_builtin_rules(db_session):
+    _seed_customer_account(db_session, suffix="4")
+    start = utc_now() - timedelta(hours=3)
+    batch = [
+        *[_txn("ACC-RULE-4", "deposit", 100.0, start + timedelta(minutes=i, seconds=7)) for i in range(5)],
+        _txn("ACC-RULE-4", "deposit", 25000.0, start + timedelta(minutes=10), "GB"),
+        _txn("ACC-RULE-4", "withdrawal", 50.0, start + timedelta(hours=1, minutes=30)),
+        _txn("ACC-RULE-4", "trade-buy", 500.0, start + timedelta(hours=1, minutes=31)),
+        _txn("ACC-RULE-4", "trade-sell", 500.5, start + timedelta(hours=1, minutes=32)),
+        _txn("ACC-RULE-4", "trade-sell", 900.0, start + timedelta(hours=1, minutes=33)),
+    ]
+    db_session.add_all(batch)
+    db_session.commit()
+    ids = {t.transaction_id for t in batch}
+
+    engine = RuleEngine()
+    specs = load_rule_specs(BUILTIN_DEFINITIONS_PATH)
+    declarative = [DeclarativeRule(spec) for spec in specs]
+    assert [r.rule_id for r in declarative] == [r.rule_id for r in engine.rules]
+    assert max(r.lookback() for r in declarative) == engine.lookback()
+
+    account = db_session.get(Account, "ACC-RULE-4")
+    expected: dict[str, list[str]] = {}
+    for txn in batch:
+        context = RuleContext.load(db_session, txn, account, engine.lookback())
+        for builtin, rule in zip(engine.rules, declarative, strict=True):
+            assert rule.applies_to == builtin.applies_to
+            if builtin.applies_to is not None and txn.transaction_type not in builtin.applies_to:
+                continue
+            assert rule.evaluate(txn, context) == builtin.evaluate(txn, context)
+            if builtin.evaluate(txn, context).triggered:
+                expected.setdefault(txn.transaction_id, []).append(builtin.rule_id)
+    assert len(expected) >= 4
+
+    flagged = RuleSetQuery(specs).evaluate(db_session, start=start, end=utc_now())
+    assert {txn_id: rules for txn_id, rules in flagged.items() if txn_id in ids} == expected
+
+
+def test_rule_definition_rejects_unknown_settings():
+    with pytest.raises(ValidationException):
+        parse_rule_spec(
+            {
+                "rule_id": "RULE-X",
+                "rule_name": "Leaky",
+                "when": {"cmp": "==", "left": {"setting": "JWT_SECRET"}, "right": {"const": ""}},
+            }
+        )
+
+
+def test_rule_stats_skip_rules_that_cannot_match(db_session):
+    _seed_customer_account(db_session, suffix="5")
+    txn = _txn("ACC-RULE-5", "trade-buy", 100.0, utc_now())
+    db_session.add(txn)
+    db_session.commit()
+
+    rule_stats.reset()
+    engine = RuleEngine()
+    assert [rule.rule_id for _, rule in engine._rules_for("trade-buy")] == ["RULE-04", "RULE-06"]
+    assert [rule.rule_id for _, rule in engine._rules_for("deposit")][:2] == ["RULE-01", "RULE-05"]
+    rule_stats.reset()
+    engine.evaluate_transaction(db_session, txn, db_session.get(Account, "ACC-RULE-5"))
+
+    stats = {s["rule_id"]: s for s in rule_stats.snapshot()}
+    for rule_id in ("RULE-01", "RULE-02", "RULE-03", "RULE-05"):
+        assert stats[rule_id]["calls"] == 0
+        assert stats[rule_id]["skipped"] == 1
+    assert stats["RULE-04"]["calls"] == 1
+    assert stats["RULE-04"]["rows_scanned"] == 1
+    assert stats["RULE-06"]["trigger_rate"] == 0.0
+    assert stats["RULE-04"]["p99_ms"] >= stats["RULE-04"]["p50_ms"] >= 0
+
+
+def test_concurrent_prefetch_matches_serial(db_session, monkeypatch):
+    _seed_customer_account(db_session, suffix="6")
+    start = utc_now() - timedelta(minutes=30)
+    batch = [_txn("ACC-RULE-6", "deposit", 100.0, start + timedelta(minutes=i)) for i in range(3)]
+    db_session.add_all(batch)
+    db_session.add(
+        HighRiskAccount(
+            account_number="ACC-RULE-6",
+            high_risk_flag=1,
+            overall_risk_score=80,
+            risk_source="test",
+            risk_reason="watchlist",
+            detected_date=utc_now(),
+        )
+    )
+    db_session.commit()
+    account = db_session.get(Account, "ACC-RULE-6")
+    txn = _txn("ACC-RULE-6", "withdrawal", 10.0, utc_now())
+
+    serial = RuleContext.load(db_session, txn, account, RuleEngine().lookback())
+    monkeypatch.setattr(settings, "RULE_PREFETCH_WORKERS", 3)
+    concurrent = RuleContext.load(db_session, txn, account, RuleEngine().lookback())
+
+    assert concurrent.history.same_as(serial.history)
+    assert concurrent.customer is serial.customer
+    assert concurrent.high_risk is serial.high_risk
+    assert concurrent.high_risk in db_session
+
+
+def test_create_transaction_rolls_back_as_one_unit(db_session, monkeypatch):
+    _seed_customer_account(db_session, suffix="7")
+
+    def fail_update(db, account, commit=True):
+        raise RuntimeError("balance update failed")
+
+    monkeypatch.setattr(AccountRepository, "update", staticmethod(fail_update))
+    payload = TransactionCreate(
+        account_number="ACC-RULE-7",
+        transaction_amount=100.0,
+        transaction_currency="USD",
+        transaction_type="deposit",
+        transaction_date=utc_now(),
+        deposit_source_country="US",
+    )
+
+    with pytest.raises(RuntimeError):
+        TransactionService.create_transaction(db_session, payload)
+
+    assert db_session.query(Transaction).filter_by(account_number="ACC-RULE-7").count() == 0
+    assert db_session.get(Account, "ACC-RULE-7").balance_amount == 1000.0
+
+
+def test_create_transaction_inserts_once_with_final_status(db_session):
+    _seed_customer_account(db_session, suffix="8")
+    start = utc_now() - timedelta(minutes=10)
+    prior = settings.VELOCITY_TXN_COUNT - 1
+    db_session.add_all([_txn("ACC-RULE-8", "deposit", 10.0, start + timedelta(minutes=i), "US") for i in range(prior)])
+    db_session.commit()
+
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        payload = TransactionCreate(
+            account_number="ACC-RULE-8",
+            transaction_amount=10.0,
+            transaction_currency="USD",
+            transaction_type="deposit",
+            transaction_date=utc_now(),
+            deposit_source_country="US",
+        )
+        txn = TransactionService.create_transaction(db_session, payload)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    # The velocity rule counts the transaction being evaluated before it is written.
+    assert txn.transaction_status == "held"
+    alerts = AlertRepository.list(db_session, offset=0, limit=10, account_number="ACC-RULE-8")
+    assert [a.rule_id for a in alerts] == ["RULE-04"]
+    assert sum(s.startswith("INSERT INTO transactions") for s in statements) == 1
+    assert not any(s.startswith("UPDATE transactions") for s in statements)
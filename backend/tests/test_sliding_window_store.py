@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from app.config.settings import settings
+from app.models.account import Account
+from app.models.customer import Customer
+from app.models.transaction import Transaction
+from app.repositories.alert_repository import AlertRepository
+from app.rules.account_window import AccountWindow
+from app.rules.sliding_window_store import SlidingWindowStore, window_store
+from app.schemas.transaction import TransactionCreate
+from app.services.transaction_service import TransactionService
+from app.utils.datetime_utils import utc_now
+from app.utils.id_generator import generate_id
+
+
+def _seed_account(db_session, suffix="1"):
+    customer = Customer(
+        customer_id=f"CUST-WIN-{suffix}",
+        customer_type="individual",
+        full_name="Window User",
+        date_of_birth="1990-01-01",
+        nationality="US",
+        residency_country="US",
+        id_type="SSN",
+        id_number="555-55-5555",
+        phone="+1-555-0105",
+        email="window@example.com",
+        address_line1="55 Window St",
+        address_city="Austin",
+        address_country="US",
+        kyc_status="verified",
+        kyc_verified_date="2025-01-01",
+        kyc_expired_date=None,
+        risk_rating="low",
+        created_date=utc_now(),
+        updated_date=utc_now(),
+        created_by="test",
+        updated_by="test",
+    )
+    account = Account(
+        account_number=f"ACC-WIN-{suffix}",
+        customer_id=customer.customer_id,
+        account_type="trading",
+        account_status="active",
+        opened_date="2024-01-01",
+        branch_code="AUS",
+        balance_amount=1000.0,
+        balance_currency="USD",
+        created_date=utc_now(),
+        updated_date=utc_now(),
+        created_by="test",
+        updated_by="test",
+    )
+    db_session.add_all([customer, account])
+    db_session.commit()
+
+
+def _txn(txn_type, when):
+    return Transaction(
+        transaction_id=generate_id("TXN"),
+        account_number="ACC-WIN-1",
+        transaction_amount=100.0,
+        transaction_currency="USD",
+        transaction_date=when,
+        transaction_type=txn_type,
+        transaction_status="completed",
+    )
+
+
+def test_store_matches_database_and_evicts(db_session, monkeypatch):
+    _seed_account(db_session)
+    monkeypatch.setattr(settings, "RULE_WINDOW_STORE_VERIFY", True)
+    horizon = timedelta(hours=24)
+    t0 = utc_now() - timedelta(days=3)
+    db_session.add_all([_txn("trade-buy", t0), _txn("deposit", t0 + timedelta(days=2))])
+    db_session.commit()
+
+    store = SlidingWindowStore()
+    now = t0 + timedelta(days=2, hours=1)
+    window = store.snapshot(db_session, "ACC-WIN-1", now - horizon, now, horizon)
+    assert window is not None and len(window) == 1
+    assert window.latest_before("trade-buy", now) is not None
+
+    for offset in (2, 3, 30):
+        txn = _txn("withdrawal", t0 + timedelta(days=2, hours=offset))
+        db_session.add(txn)
+        db_session.commit()
+        store.record(txn)
+
+    latest = t0 + timedelta(days=2, hours=30)
+    window = store.snapshot(db_session, "ACC-WIN-1", latest - horizon, latest, horizon)
+    assert window.same_as(AccountWindow.load(db_session, "ACC-WIN-1", latest - horizon, latest))
+    assert window.count_between(latest - horizon, latest) == 1
+    assert store.mismatches == 0
+
+    # Older than the buffer's floor after eviction: callers must fall back to SQL.
+    assert store.snapshot(db_session, "ACC-WIN-1", t0, t0 + timedelta(days=2), horizon) is None
+
+
+def test_backdated_trade_buy_does_not_hide_newer_anchor(db_session, monkeypatch):
+    _seed_account(db_session, suffix="2")
+    monkeypatch.setattr(settings, "RULE_WINDOW_STORE_ENABLED", True)
+    monkeypatch.setattr(settings, "RULE_WINDOW_STORE_VERIFY", True)
+    window_store.invalidate()
+    mismatches = window_store.mismatches
+    t0 = utc_now() - timedelta(days=3)
+
+    def ingest(txn_type, amount, when):
+        payload = TransactionCreate(
+            account_number="ACC-WIN-2",
+            transaction_amount=amount,
+            transaction_currency="USD",
+            transaction_type=txn_type,
+            transaction_date=when,
+        )
+        return TransactionService.create_transaction(db_session, payload)
+
+    try:
+        ingest("trade-buy", 100.0, t0)
+        ingest("deposit", 100.0, t0 + timedelta(hours=48))
+        ingest("trade-buy", 500.0, t0 - timedelta(days=5))  # backdated below the buffer's floor
+        sell = ingest("trade-sell", 100.5, t0 + timedelta(hours=49))
+    finally:
+        window_store.invalidate()
+
+    # The prior buy is the 100.0 one at t0, so the 0.5 profit is negligible.
+    alerts = AlertRepository.list(db_session, offset=0, limit=10, account_number="ACC-WIN-2")
+    assert "RULE-02" in {a.rule_id for a in alerts if a.transaction_id == sell.transaction_id}
+    assert window_store.mismatches == mismatches
+
+
+def test_window_anchor_is_latest_of_backdated_entries_and_anchor():
+    t0 = utc_now() - timedelta(days=3)
+    anchor, backdated = _txn("trade-buy", t0), _txn("trade-buy", t0 - timedelta(days=5))
+    window = AccountWindow("ACC-WIN-1", [_txn("deposit", t0 + timedelta(hours=48))], anchors={"trade-buy": anchor})
+    window.add(backdated)
+
+    end = t0 + timedelta(hours=49)
+    assert window.latest_before("trade-buy", end).transaction_id == anchor.transaction_id
+    sliced = window.slice(t0 + timedelta(hours=24), end)
+    assert sliced.anchors["trade-buy"].transaction_id == anchor.transaction_id
+    window.evict_before(t0 + timedelta(hours=24))
+    assert window.anchors["trade-buy"].transaction_id == anchor.transaction_id
@@ -0,0 +1,146 @@
+import csv
+from datetime import timedelta
+
+import pytest
+
+from app.exceptions.base_exception import ValidationException
+from app.models.account import Account
+from app.models.alert import Alert
+from app.models.customer import Customer
+from app.models.transaction import Transaction
+from app.repositories.transaction_repository import TransactionRepository
+from app.services.transaction_import_service import TransactionImportService
+from app.utils.datetime_utils import utc_now
+
+HEADER = [
+    "transaction_id",
+    "account_number",
+    "transaction_amount",
+    "transaction_currency",
+    "transaction_date",
+    "transaction_type",
+    "transaction_status",
+    "deposit_source_country",
+]
+
+
+def _seed_account(db_session, suffix="1"):
+    customer = Customer(
+        customer_id=f"CUST-IMP-{suffix}",
+        customer_type="individual",
+        full_name="Import User",
+        date_of_birth="1990-01-01",
+        nationality="US",
+        residency_country="US",
+        id_type="SSN",
+        id_number=f"777-77-777{suffix}",
+        phone="+1-555-0107",
+        email="import@example.com",
+        address_line1="77 Import St",
+        address_city="Austin",
+        address_country="US",
+        kyc_status="verified",
+        kyc_verified_date="2025-01-01",
+        kyc_expired_date=None,
+        risk_rating="low",
+        created_date=utc_now(),
+        updated_date=utc_now(),
+        created_by="test",
+        updated_by="test",
+    )
+    account = Account(
+        account_number=f"ACC-IMP-{suffix}",
+        customer_id=customer.customer_id,
+        account_type="trading",
+        account_status="active",
+        opened_date="2024-01-01",
+        branch_code="AUS",
+        balance_amount=1000.0,
+        balance_currency="USD",
+        created_date=utc_now(),
+        updated_date=utc_now(),
+        created_by="test",
+        updated_by="test",
+    )
+    db_session.add_all([customer, account])
+    db_session.commit()
+    return account.account_number
+
+
+def _write_csv(path, account_number, suffix, count=4):
+    t0 = utc_now() - timedelta(days=10)
+    with path.open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(HEADER)
+        for i in range(count):
+            amount = 25000.0 if i == 0 else 100.0
+            when = (t0 + timedelta(days=i)).isoformat()
+            writer.writerow([f"TXN-IMP{suffix}{i}", account_number, amount, "USD", when, "deposit", "completed", "US"])
+        writer.writerow([f"TXN-IMP{suffix}X", account_number, 10.0, "USD", t0.isoformat(), "gift", "completed", ""])
+        writer.writerow([f"TXN-IMP{suffix}Y", "ACC-MISSING", 10.0, "USD", t0.isoformat(), "deposit", "completed", ""])
+    return path
+
+
+def _alerts(db_session, account_number):
+    return db_session.query(Alert).filter(Alert.account_number == account_number).all()
+
+
+def test_import_csv_with_inline_rules(db_session, tmp_path):
+    account_number = _seed_account(db_session)
+    path = _write_csv(tmp_path / "history.csv", account_number, "A")
+
+    report = TransactionImportService.run(db_session, path, chunk_size=2)
+    assert report.import_status == "completed"
+    assert (report.rows_read, report.rows_inserted, report.rows_rejected) == (6, 4, 2)
+    assert report.rows_per_second > 0
+    assert db_session.query(Transaction).filter(Transaction.account_number == account_number).count() == 4
+    assert {alert.transaction_id for alert in _alerts(db_session, account_number)} == {"TXN-IMPA0"}
+
+    # Running the finished import again is a no-op.
+    again = TransactionImportService.run(db_session, path, chunk_size=2)
+    assert again.rows_processed == 0 and again.rows_inserted == 4
+
+
+def test_import_resumes_from_checkpoint(db_session, tmp_path, monkeypatch):
+    account_number = _seed_account(db_session, suffix="2")
+    path = _write_csv(tmp_path / "history.csv", account_number, "B")
+    insert_rows = TransactionRepository.insert_rows
+    calls = []
+
+    def interrupted(db, rows, commit=True):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("killed")
+        return insert_rows(db, rows, commit)
+
+    monkeypatch.setattr(TransactionRepository, "insert_rows", interrupted)
+    with pytest.raises(RuntimeError):
+        TransactionImportService.run(db_session, path, import_id="IMP-RESUME", rule_mode="off", chunk_size=2)
+    monkeypatch.undo()
+
+    report = TransactionImportService.run(db_session, path, import_id="IMP-RESUME", rule_mode="off", chunk_size=2)
+    assert report.rows_processed == 4  # the first chunk was already committed
+    assert (report.rows_read, report.rows_inserted, report.rows_rejected) == (6, 4, 2)
+    assert db_session.query(Transaction).filter(Transaction.account_number == account_number).count() == 4
+    assert _alerts(db_session, account_number) == []
+
+
+def test_deferred_rules_run_in_backfill(db_session, tmp_path):
+    account_number = _seed_account(db_session, suffix="3")
+    path = _write_csv(tmp_path / "history.csv", account_number, "C")
+
+    loaded = TransactionImportService.run(db_session, path, import_id="IMP-DEFER", rule_mode="defer")
+    assert loaded.import_status == "loaded"
+    assert _alerts(db_session, account_number) == []
+
+    report = TransactionImportService.backfill(db_session, "IMP-DEFER", chunk_size=3)
+    assert report.import_status == "completed"
+    assert report.rows_processed == 4
+    assert {alert.transaction_id for alert in _alerts(db_session, account_number)} == {"TXN-IMPC0"}
+
+
+def test_import_rejects_columns_outside_the_model(db_session, tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("transaction_id,account_number,amount\nTXN-1,ACC-1,5\n")
+    with pytest.raises(ValidationException, match="missing=.*unknown=\\['amount'\\]"):
+        TransactionImportService.run(db_session, path, import_id="IMP-BAD")
@@ -1,12 +1,21 @@
+import json
+import threading
+from datetime import timedelta
+
+from app.config.settings import settings
 from app.models.account import Account
+from app.models.agent_job import AgentJob
+from app.models.alert import Alert
+from app.models.case import Case
 from app.models.customer import Customer
 from app.models.transaction import Transaction
+from app.services.agent_worker import AgentWorker
 from app.utils.datetime_utils import utc_now
 
 
-def _seed_customer_account(db_session):
+def _seed_customer_account(db_session, suffix="1"):
     customer = Customer(
-        customer_id="CUST-TXN-1",
+        customer_id=f"CUST-TXN-{suffix}",
         customer_type="individual",
         full_name="Txn User",
         date_of_birth="1990-01-01",
@@ -29,7 +38,7 @@ def _seed_customer_account(db_session):
         updated_by="test",
     )
     account = Account(
-        account_number="ACC-TXN-1",
+        account_number=f"ACC-TXN-{suffix}",
         customer_id=customer.customer_id,
         account_type="trading",
         account_status="active",
@@ -65,3 +74,111 @@ def test_create_transaction(client, standard_headers, db_session):
 
     txn = db_session.query(Transaction).filter(Transaction.transaction_id == data["transaction_id"]).first()
     assert txn is not None
+
+
+def test_held_transaction_queues_agent_job(client, standard_headers, db_session):
+    _seed_customer_account(db_session, suffix="4")
+    payload = {
+        "account_number": "ACC-TXN-4",
+        "transaction_amount": 50000.0,
+        "transaction_currency": "USD",
+        "transaction_type": "deposit",
+        "transaction_date": utc_now().isoformat(),
+        "deposit_source_country": "US",
+    }
+    resp = client.post("/api/v1/transactions/", json=payload, headers=standard_headers)
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert data["transaction_status"] == "held"
+    assert not db_session.query(Case).filter_by(transaction_id=data["transaction_id"]).count()
+
+    job_url = f"/api/v1/agent-jobs/{data['agent_job_id']}"
+    assert client.get(job_url, headers=standard_headers).json()["data"]["job_status"] == "queued"
+
+    assert AgentWorker(worker_id="test-worker").drain() >= 1
+    job = client.get(job_url, headers=standard_headers).json()["data"]
+    assert (job["job_status"], job["attempts"]) == ("completed", 1)
+    assert db_session.query(Case).filter_by(case_id=job["case_id"], transaction_id=data["transaction_id"]).count() == 1
+
+    assert client.get("/api/v1/agent-jobs/JOB-MISSING", headers=standard_headers).status_code == 404
+
+
+def test_bulk_create_transactions(client, standard_headers, db_session):
+    _seed_customer_account(db_session, suffix="2")
+
+    start = utc_now() - timedelta(minutes=10)
+
+    def item(minute, txn_type, amount, account_number="ACC-TXN-2"):
+        return {
+            "account_number": account_number,
+            "transaction_amount": amount,
+            "transaction_currency": "USD",
+            "transaction_type": txn_type,
+            "transaction_date": (start + timedelta(minutes=minute)).isoformat(),
+            "deposit_source_country": "US",
+        }
+
+    payload = {
+        "transactions": [
+            item(3, "deposit", 50000.0),
+            item(0, "deposit", 100.0),
+            item(1, "withdrawal", 5000.0),
+            item(2, "deposit", 100.0, account_number="ACC-TXN-MISSING"),
+            item(4, "deposit", -1.0),
+        ]
+    }
+    resp = client.post("/api/v1/transactions/bulk", json=payload, headers=standard_headers)
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+
+    assert (data["completed"], data["held"], data["rejected"]) == (1, 1, 3)
+    items = data["items"]
+    assert [i["transaction_status"] for i in items] == ["held", "completed", "rejected", "rejected", "rejected"]
+    assert [i["error_code"] for i in items[2:]] == ["AML0204", "AML0200", "AML0304"]
+    job = db_session.get(AgentJob, items[0]["agent_job_id"])
+    assert (job.alert_id, job.job_status) == (items[0]["alert_ids"][0], "queued")
+
+    assert db_session.query(Transaction).filter_by(account_number="ACC-TXN-2").count() == 2
+    assert db_session.query(Alert).filter_by(transaction_id=items[0]["transaction_id"]).count() == 1
+    assert db_session.get(Account, "ACC-TXN-2").balance_amount == 1100.0
+
+
+def test_stream_transactions_ndjson(client, standard_headers, db_session, monkeypatch):
+    _seed_customer_account(db_session, suffix="3")
+    monkeypatch.setattr(settings, "TRANSACTION_STREAM_BATCH_SIZE", 2)
+    start = utc_now() - timedelta(minutes=10)
+    records = [
+        {
+            "account_number": "ACC-TXN-3",
+            "transaction_amount": 10.0,
+            "transaction_currency": "USD",
+            "transaction_type": "deposit",
+            "transaction_date": (start + timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(3)
+    ]
+    oversized = json.dumps({**records[0], "purpose": "x" * settings.TRANSACTION_STREAM_MAX_LINE_BYTES})
+    lines = [json.dumps(records[0]), "{not json", json.dumps(records[1]), "", '{"account_number": "ACC-TXN-3"}', oversized]
+    body = "\n".join(lines) + "\n" + json.dumps(records[2])
+
+    # Bounded so a deadlock between the body reader and the response fails instead of hanging.
+    responses = []
+    request = threading.Thread(
+        target=lambda: responses.append(
+            client.post("/api/v1/transactions/stream", content=body, headers=standard_headers)
+        ),
+        daemon=True,
+    )
+    request.start()
+    request.join(timeout=30)
+    assert responses, "stream request did not complete"
+    resp = responses[0]
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    results = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4, 5]
+    statuses = ["completed", "rejected", "completed", "rejected", "rejected", "completed"]
+    assert [r["transaction_status"] for r in results] == statuses
+    assert results[1]["error_code"] == results[3]["error_code"] == results[4]["error_code"] == "AML0306"
+    assert db_session.get(Account, "ACC-TXN-3").balance_amount == 1030.0
@@ -0,0 +1,47 @@
+import pytest
+
+from app.agents.triage import triage
+from app.config.settings import settings
+from app.models.alert import Alert
+from app.models.customer import Customer
+from app.models.high_risk_account import HighRiskAccount
+
+
+def _alert(severity="medium"):
+    return Alert(alert_id="ALERT-TRIAGE", account_number="ACC-TRIAGE", severity=severity)
+
+
+def _customer(risk_rating="low", kyc_status="verified"):
+    return Customer(customer_id="CUST-TRIAGE", risk_rating=risk_rating, kyc_status=kyc_status)
+
+
+def test_low_risk_verified_customer_with_a_medium_alert_is_a_false_positive():
+    result = triage(_alert(), _customer(), None, [])
+
+    assert result.false_positive
+    assert result.score == 10.0
+    assert "severity medium (+10)" in result.summary()
+
+
+@pytest.mark.parametrize(
+    ("alert", "customer", "high_risk", "decisions"),
+    [
+        (_alert("high"), _customer(), None, []),
+        (_alert(), _customer(risk_rating="medium"), None, []),
+        (_alert(), _customer(kyc_status="pending"), None, []),
+        (_alert(), None, None, []),
+        (_alert(), _customer(), HighRiskAccount(account_number="ACC-TRIAGE"), []),
+        (_alert(), _customer(), None, ["REJECT", "ACCEPT"]),
+    ],
+)
+def test_any_escalating_factor_sends_the_alert_to_the_agents(alert, customer, high_risk, decisions):
+    assert not triage(alert, customer, high_risk, decisions).false_positive
+
+
+def test_rejected_cases_lower_the_score_and_the_switch_disables_triage(monkeypatch):
+    result = triage(_alert(), _customer(risk_rating="medium"), None, ["REJECT", "REJECT", "REJECT"])
+    assert result.false_positive
+    assert result.score == 10.0  # at most two rejected cases count
+
+    monkeypatch.setattr(settings, "AGENT_TRIAGE_ENABLED", False)
+    assert not triage(_alert(), _customer(), None, []).false_positive